@@ -1,235 +1,95 @@
+import json
+
 import frappe
-from frappe.utils import nowdate, add_days # Add add_days here
+from frappe.utils import cint, getdate, nowdate, add_days # Add add_days here
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity import (
+    get_company_activity,
+    get_upcoming_meeting_filters,
+)
+from nirmaan_crm.utils.encoding import is_columnar, to_columnar
+
+COMPANY_FIELDS = [
+    "name",
+    "company_name",
+    "company_nick",
+    "company_city",
+    "assigned_sales",
+    "priority",
+    "last_meeting",
+    "company_type",
+]
+
+MAX_PAGE_SIZE = 500
+
+# Stand-in for NULL dates in the keyset sort key, so NULLs sort last in descending order.
+NULL_DATE_SENTINEL = "0001-01-01"
 
 @frappe.whitelist(allow_guest=False)
-def get_modified_crm_companies():
+def get_modified_crm_companies(
+    page_size=None,
+    cursor=None,
+    assigned_sales=None,
+    priority=None,
+    company_type=None,
+    city=None,
+    format=None,
+):
     """
-    Fetches all CRM Company documents, modifies their data with additional fields
+    Fetches CRM Company documents, modifies their data with additional fields
     from Task and CRM BOQ documents, and returns the list.
+
+    Task/BOQ enrichment is read from the CRM Company Activity summary table
+    (kept current by CRM Task / CRM BOQ doc events and rebuilt nightly) plus two
+    permission-filtered meeting queries, so the query count does not grow with
+    the number of companies.
+
+    Args:
+        page_size: When set, returns one keyset page instead of the full list:
+            {"companies": [...], "next_cursor": "<token>" | None}
+        cursor: next_cursor from the previous page
+        assigned_sales, priority, company_type, city: Optional equality filters
+        format: 'columnar' returns the companies as {"fields", "rows", "dictionaries"}
+            (see nirmaan_crm.utils.encoding) instead of a list of dicts.
+
+    Companies are ordered by next_meeting_date desc, then last_meeting desc
+    (NULLs last), then name desc. In paged mode only the companies of the
+    requested page are enriched.
     """
     try:
-        # 1. Print before the main frappe.get_list call
-          # --- 1. Define Date Ranges (REQUIRED FOR NEW LOGIC) ---
-        today = nowdate() # datetime.date object
-        date_7_days_ago = add_days(today, -7) # datetime.date object
-        date_14_days_ahead = add_days(today, 14) # datetime.date object
+        today = nowdate()
         print("--- Starting get_modified_crm_companies ---")
-        
+
+        filters = _get_company_filters(assigned_sales, priority, company_type, city)
+
+        if page_size:
+            page_size = min(max(cint(page_size), 1), MAX_PAGE_SIZE)
+            companies = _get_company_page(filters, page_size + 1, cursor)
+
+            has_more = len(companies) > page_size
+            companies = companies[:page_size]
+            print(f"Fetched page of {len(companies)} CRM companies.")
+
+            modified_companies = _enrich_companies(companies, today)
+            next_cursor = _make_cursor(companies[-1]) if has_more else None
+
+            print("--- Finished processing company page ---")
+            if is_columnar(format):
+                modified_companies = to_columnar(modified_companies)
+            return {"companies": modified_companies, "next_cursor": next_cursor}
+
         companies = frappe.get_list(
             "CRM Company",
-            fields=[
-                "name",
-                "company_name",
-                "company_nick",
-                "company_city",
-                "assigned_sales",
-                "priority",
-                "last_meeting",
-                "company_type",
-            ],
-            filters={},
-            order_by="last_meeting desc"
-        )
-        
-        # 2. Print after the main frappe.get_list call to see how many companies were fetched
-        company_names = [c.name for c in companies]
-        print(f"Fetched {len(companies)} CRM companies.")
-                # 2a. Query for Last Meeting (Completed, Last 7 Days)
-        last7_past_tasks = frappe.get_list(
-            "CRM Task",
-            filters=[
-            ["type", "=", "In Person Meeting"],
-            ["status", "=", "Completed"],
-            ["start_date", ">=", date_7_days_ago],
-            ["start_date", "<=", today], # Only up to today
-            ["company", "in", company_names] 
-        ],
-            fields=["company", "start_date", "remarks"], # Get remarks for the task remarks section
-            limit=0,
-            order_by="start_date desc" # Sort by newest first
-        )
-
-        # 2b. Query for Next Meeting (Pending/Scheduled, From Today to Next 14 Days)
-        all_upcoming2week_tasks = frappe.get_list(
-            "CRM Task",
-            filters=[
-            ["type", "=", "In Person Meeting"],
-            ["status", "in", ["Pending", "Scheduled"]],
-            ["start_date", ">=", today], # From today onwards
-            ["start_date", "<=", date_14_days_ahead],
-            ["company", "in", company_names] 
-        ],
-            fields=["company", "start_date"],
+            fields=COMPANY_FIELDS,
+            filters=filters,
+            order_by="last_meeting desc",
             limit=0,
-            order_by="start_date asc" # Sort by oldest first
         )
 
+        # 2. Print after the main frappe.get_list call to see how many companies were fetched
+        print(f"Fetched {len(companies)} CRM companies.")
 
-        modified_companies = []
-
-        for company in companies:
-            modified_company = company.copy()
-            
-            # 3. Print for each company to trace the loop
-            print(f"Processing company: {company.name}")
-                        # --- A. NEW LOGIC: LAST MEETING IN 7 DAYS ---
-            # Filter the global list by the current company name
-            past_tasks_for_company = [t for t in last7_past_tasks if t.company == company.name]
-            
-            # The list is already sorted by start_date desc (newest first) from the query.
-            if past_tasks_for_company:
-                # The first item is the most recent completed meeting in the last 7 days
-                modified_company["last_meeting_in_7_days"] = past_tasks_for_company[0].start_date.strftime('%Y-%m-%d')
-            else:
-                modified_company["last_meeting_in_7_days"] = None
-
-            upcoming_tasks_for_company = [t for t in all_upcoming2week_tasks if t.company == company.name]
-
-            # The list is already sorted by start_date asc (oldest first) from the query.
-            if upcoming_tasks_for_company:
-                # The first item is the next scheduled meeting in the next 14 days
-                modified_company["next_meeting_in_14_days"] = upcoming_tasks_for_company[0].start_date.strftime('%Y-%m-%d')
-                
-                # Use this for next meeting date field, as it's more accurate than the previous query
-                # Note: The original logic fetched ALL statuses, this is filtered for In Person Meeting
-            else:
-                modified_company["next_meeting_in_14_days"] = None
-                
-
-
-            # Get next meeting date and ID
-            next_meeting_task = frappe.get_list(
-                "CRM Task",
-                filters={
-                    "company": company.name,
-                    "type": "In Person Meeting",
-                    "status": ("not in", ["Completed", "Incomplete"]),
-                    "start_date": (">=", nowdate())
-                },
-                fields=["name", "start_date"],
-                order_by="start_date asc",
-                limit=1
-            )
-            # 4. Print the result of the Task query
-            print(f"  Next meeting task query result: {next_meeting_task}")
-            
-            if next_meeting_task:
-                modified_company["next_meeting_date"] = next_meeting_task[0].start_date
-                modified_company["next_meeting_id"] = next_meeting_task[0].name
-            else:
-                modified_company["next_meeting_date"] = None
-                modified_company["next_meeting_id"] = None
-
-            # Get last three completed task remarks
-            completed_tasks = frappe.get_list(
-                "CRM Task",
-                filters={
-                    "company": company.name,
-                    "status": "Completed"
-                },
-                fields=["*"],
-                order_by="modified desc",
-                limit=3
-            )
-            # 5. Print the completed tasks result
-            print(f"  Completed tasks query result: {completed_tasks}")
-
-            modified_company["last_three_remarks_from_tasks"] = [
-                {
-                    "remarks": task.remarks,
-                    "modified": task.modified.strftime('%Y-%m-%d') if task.modified else None
-                }
-                for task in completed_tasks if task.remarks
-            ]
-
-            # # Get counts of active and hot BOQs
-            # active_boq_count = frappe.db.count(
-            #     "CRM BOQ",
-            #     filters={
-            #         "company": company.name,
-            #         "boq_status": ("not in", ["Won", "Lost", "Dropped"])
-            #     }
-            # )
-            # hot_boq_count = frappe.db.count(
-            #     "CRM BOQ",
-            #     filters={
-            #         "company": company.name,
-            #         "deal_status": "Hot" # Corrected filter key to 'deal_status'
-            #     }
-            # )
-            active_boqs_list = frappe.get_list(
-                "CRM BOQ",
-                filters={
-                    "company": company.name,
-                    "boq_status": ("not in", ["Won", "Lost", "Dropped"])
-                },
-                fields=[
-                    "name", 
-                    "boq_name",          # Requested field
-                    "boq_status", 
-                    "boq_sub_status",
-                    "boq_value", 
-                    "boq_submission_date", 
-                    "remarks",
-                    "creation"           # Requested field (creation date)
-                ],
-                limit=5 # Limit to a reasonable number for hover display
-            )
-            
-            # --- CRITICAL CHANGE: Get actual list of hot BOQs, not just count ---
-            hot_boqs_list = frappe.get_list(
-                "CRM BOQ",
-                filters={
-                    "company": company.name,
-                    "deal_status": "Hot"
-                },
-                fields=[
-                    "name", 
-                    "boq_name",          # Requested field
-                    "boq_status", 
-                    "boq_sub_status",
-                    "boq_value", 
-                    "boq_submission_date", 
-                    "remarks",
-                    "creation"           # Requested field (creation date)
-                ],
-                limit=5 # Limit to a reasonable number for hover display
-            )
-            # 6. Print the BOQ counts
-            print(f"  Active BOQs: {active_boqs_list}, Hot BOQs: {hot_boqs_list}")
-            today = frappe.utils.get_datetime(nowdate()) # Get current date as datetime object
-            thirty_days_ago = add_days(today, -30) # Calculate date 30 days ago
-
-            last_30_days_boqs_list = frappe.get_list(
-                "CRM BOQ",
-                filters={
-                "company": company.name,
-                "creation": (">=", thirty_days_ago.strftime('%Y-%m-%d')) # Filter by creation date
-                },
-                fields=[
-                "name",
-                "boq_name",
-                "boq_status",
-                "boq_sub_status",
-                "boq_value",
-                "boq_submission_date",
-                "remarks",
-                "creation"
-                ],
-                limit=0 # Limit to a reasonable number for hover display
-            )
-            print(f"  Last 30 days BOQs for {company.name}: {last_30_days_boqs_list}")
-
-        # Add the new list to the modified_company dictionary
-            modified_company["last_30_days_boqs"] = last_30_days_boqs_list
-            
-            # Add the counts to the modified_company dictionary
-            # modified_company["active_boq"] = active_boq_count
-            # modified_company["hot_boq"] = hot_boq_count
-            modified_company["active_boq"] = active_boqs_list
-            modified_company["hot_boq"] = hot_boqs_list
-
-            modified_companies.append(modified_company)
+        modified_companies = _enrich_companies(companies, today)
 
         modified_companies.sort(
             key=lambda company: (
@@ -239,13 +99,17 @@ def get_modified_crm_companies():
               (company.get("next_meeting_date") is not None, company.get("next_meeting_date") or ""),
         # Secondary sort: last_meeting (descending, None last)
         # Applied only if primary sort elements are equal
-             (company.get("last_meeting") is not None, company.get("last_meeting") or "")
+             (company.get("last_meeting") is not None, company.get("last_meeting") or ""),
+        # Tiebreak: name (descending), the same order as the keyset pages
+             company.get("name"),
             ),
             reverse=True # Apply descending sort to the entire tuple key
         )
 
         # 7. Print at the end of the function
         print("--- Finished processing all companies ---")
+        if is_columnar(format):
+            return to_columnar(modified_companies)
         return modified_companies
 
     except Exception as e:
@@ -254,6 +118,152 @@ def get_modified_crm_companies():
       frappe.throw(f"An unexpected error occurred: {e}") # Provide the actual error message
 
 
+def _get_company_filters(assigned_sales=None, priority=None, company_type=None, city=None):
+    filters = {}
+    if assigned_sales:
+        filters["assigned_sales"] = assigned_sales
+    if priority:
+        filters["priority"] = priority
+    if company_type:
+        filters["company_type"] = company_type
+    if city:
+        filters["company_city"] = city
+    return filters
+
+
+def _get_company_page(filters, limit, cursor):
+    """
+    Returns up to `limit` companies after `cursor`, ordered by the same key the
+    full list is sorted by. next_meeting_date is the earliest upcoming meeting the
+    session user may see (as in get_company_meetings), joined in so the sort and
+    the cursor comparison happen in the database.
+    """
+    company_query = frappe.get_list(
+        "CRM Company", fields=COMPANY_FIELDS, filters=filters, order_by="", limit=0, run=0
+    )
+    meeting_query = frappe.get_list(
+        "CRM Task",
+        filters=get_upcoming_meeting_filters(),
+        fields=["company", "start_date"],
+        order_by="",
+        limit=0,
+        run=0,
+    )
+
+    values = {"null_date": NULL_DATE_SENTINEL, "limit": limit}
+    # Byte-wise name order on Postgres, matching the Python string sort of the full list
+    name_column = 'company.name COLLATE "C"' if frappe.db.db_type == "postgres" else "company.name"
+    cursor_condition = ""
+    if cursor:
+        cursor = _parse_cursor(cursor)
+        cursor_condition = f"""
+            WHERE (
+                COALESCE(next_meeting.next_meeting_date, %(null_date)s),
+                COALESCE(company.last_meeting, %(null_date)s),
+                {name_column}
+            ) < (%(cursor_next_meeting)s, %(cursor_last_meeting)s, %(cursor_name)s)
+        """
+        values.update(cursor)
+
+    columns = ", ".join(f"company.`{field}`" for field in COMPANY_FIELDS)
+    return frappe.db.sql(
+        f"""
+        SELECT {columns}, next_meeting.next_meeting_date AS sort_next_meeting_date
+        FROM ({company_query.replace("%", "%%")}) company
+        LEFT JOIN (
+            SELECT meeting.company, MIN(meeting.start_date) AS next_meeting_date
+            FROM ({meeting_query.replace("%", "%%")}) meeting
+            GROUP BY meeting.company
+        ) next_meeting
+            ON next_meeting.company = company.name
+        {cursor_condition}
+        ORDER BY
+            COALESCE(next_meeting.next_meeting_date, %(null_date)s) DESC,
+            COALESCE(company.last_meeting, %(null_date)s) DESC,
+            {name_column} DESC
+        LIMIT %(limit)s
+        """,
+        values,
+        as_dict=True,
+    )
+
+
+def _make_cursor(company):
+    return json.dumps(
+        [
+            str(company.get("sort_next_meeting_date") or NULL_DATE_SENTINEL),
+            str(company.get("last_meeting") or NULL_DATE_SENTINEL),
+            company.get("name"),
+        ]
+    )
+
+
+def _parse_cursor(cursor):
+    try:
+        next_meeting, last_meeting, name = json.loads(cursor)
+    except Exception:
+        frappe.throw("Invalid cursor.")
+    return {
+        "cursor_next_meeting": next_meeting,
+        "cursor_last_meeting": last_meeting,
+        "cursor_name": name,
+    }
+
+
+def _enrich_companies(companies, today):
+    """
+    Adds meeting, remarks and BOQ fields to each company row from the
+    CRM Company Activity summary (one indexed read for the whole list).
+    Date windows relative to today are applied here.
+    """
+    if not companies:
+        return []
+
+    date_7_days_ago = getdate(add_days(today, -7))
+    date_14_days_ahead = getdate(add_days(today, 14))
+    thirty_days_ago = getdate(add_days(today, -30))
+    today = getdate(today)
+
+    activity_by_company = get_company_activity([c.name for c in companies])
+
+    modified_companies = []
+
+    for company in companies:
+        modified_company = company.copy()
+        modified_company.pop("sort_next_meeting_date", None)
+        activity = activity_by_company[company.name]
+
+        # --- A. LAST MEETING IN 7 DAYS (Completed) ---
+        last_completed = activity.last_completed_meeting_date
+        if last_completed and date_7_days_ago <= getdate(last_completed) <= today:
+            modified_company["last_meeting_in_7_days"] = getdate(last_completed).strftime('%Y-%m-%d')
+        else:
+            modified_company["last_meeting_in_7_days"] = None
+
+        # --- B. NEXT MEETING IN 14 DAYS (Pending/Scheduled) ---
+        next_scheduled = activity.next_scheduled_meeting_date
+        if next_scheduled and today <= getdate(next_scheduled) <= date_14_days_ahead:
+            modified_company["next_meeting_in_14_days"] = getdate(next_scheduled).strftime('%Y-%m-%d')
+        else:
+            modified_company["next_meeting_in_14_days"] = None
+
+        # Next meeting date and ID
+        modified_company["next_meeting_date"] = getdate(activity.next_meeting_date) if activity.next_meeting_date else None
+        modified_company["next_meeting_id"] = activity.next_meeting_id
+
+        modified_company["last_three_remarks_from_tasks"] = activity.last_three_remarks
+
+        modified_company["last_30_days_boqs"] = [
+            boq for boq in activity.recent_boqs
+            if boq.get("creation") and getdate(boq["creation"]) >= thirty_days_ago
+        ]
+        modified_company["active_boq"] = activity.active_boqs
+        modified_company["hot_boq"] = activity.hot_boqs
+
+        modified_companies.append(modified_company)
+
+    return modified_companies
+
 
 
 
@@ -2,12 +2,67 @@
 # Backend API for Sales Tasks - Single endpoint replacing multiple frontend API calls
 # Pattern: Similar to get_sales_performance.py - server-side data processing
 
+import json
+
 import frappe
-from frappe.utils import cstr
+from frappe.utils import add_to_date, cint, cstr, get_datetime, now_datetime
+
+from nirmaan_crm.utils.encoding import is_columnar, to_columnar
+
+TASK_FIELDS = [
+    "name",
+    "type",
+    "start_date",
+    "status",
+    "contact",
+    "company",
+    "boq",
+    "task_profile",
+    "assigned_sales",
+    "remarks",
+    "creation",
+    "modified",
+    "owner",
+    # Joined fields using dot notation
+    "contact.first_name",
+    "contact.last_name",
+    "company.company_name",
+]
+
+INACTIVE_STATUSES = ["Won", "Lost", "Dropped"]
+
+# Max changed tasks returned per delta call; clients keep calling while has_more is set
+DELTA_BATCH_SIZE = 2000
+
+# Sync tokens restart this far before the call, so tasks saved by transactions that
+# were still open when the token was issued (modified earlier, committed later) are
+# picked up by the next delta. Deltas can therefore repeat tasks; clients upsert by name.
+SYNC_SAFETY_WINDOW_SECONDS = 300
+
+# Paged mode: filterable columns (value or list of values) and sortable columns
+FILTERABLE_FIELDS = ("company", "status", "type", "task_profile", "assigned_sales")
+SORTABLE_FIELDS = ("start_date", "creation", "modified", "status", "type", "company")
+MAX_PAGE_LENGTH = 500
+
+# Redis key prefix of the facet counts per (task profiles, user); the version in the
+# key changes after every CRM Task write. The TTL bounds how long renamed companies /
+# salespersons keep old labels.
+FACETS_CACHE_KEY = "crm_sales_task_facets"
+FACETS_VERSION_KEY = "crm_sales_task_facets_version"
+FACETS_CACHE_TTL = 600
 
 
 @frappe.whitelist(allow_guest=False)
-def get_sales_tasks(task_profiles="all"):
+def get_sales_tasks(
+    task_profiles="all",
+    since=None,
+    filters=None,
+    sort_by=None,
+    sort_order="desc",
+    start=0,
+    page_length=None,
+    format=None,
+):
     """
     Single endpoint that returns pre-processed sales tasks data.
 
@@ -18,23 +73,34 @@ def get_sales_tasks(task_profiles="all"):
 
     Args:
         task_profiles: 'all', 'Sales', or 'Estimates'
+        since: sync_token from a previous response. When given, only changes
+            since that call are returned (see _get_sales_tasks_delta).
+        filters, sort_by, sort_order, start, page_length: Server-side paging.
+            When page_length is given only one page of tasks is returned
+            (see _get_sales_tasks_page).
+        format: 'columnar' returns "tasks" as {"fields", "rows", "dictionaries"}
+            (see nirmaan_crm.utils.encoding) instead of a list of dicts.
 
     Returns:
         {
             "tasks": [...],           # Tasks with joined company/contact data
             "boq_data": {...},        # Pre-computed BOQ info grouped by company
             "filter_options": {...},  # Pre-computed filter dropdown options
-            "salesperson_map": {...}  # Pre-resolved email -> full_name mapping
+            "salesperson_map": {...}, # Pre-resolved email -> full_name mapping
+            "sync_token": "..."       # Pass back as `since` for the next refresh
         }
     """
     try:
-        # Determine task profile filter
-        if task_profiles == "all":
-            profile_filter = ["Sales", "Estimates"]
-        elif task_profiles == "Sales":
-            profile_filter = ["Sales"]
-        else:
-            profile_filter = ["Estimates"]
+        profile_filter = _get_profile_filter(task_profiles)
+        sync_started_at = now_datetime()
+
+        if since:
+            return _encode_tasks(_get_sales_tasks_delta(profile_filter, since, sync_started_at), format)
+
+        if page_length:
+            return _encode_tasks(
+                _get_sales_tasks_page(profile_filter, filters, sort_by, sort_order, start, page_length), format
+            )
 
         # ─────────────────────────────────────────────────────────────────────
         # 1. Fetch Tasks with Joined Data (Single Query)
@@ -42,25 +108,7 @@ def get_sales_tasks(task_profiles="all"):
         tasks = frappe.get_list(
             "CRM Task",
             filters=[["task_profile", "in", profile_filter]],
-            fields=[
-                "name",
-                "type",
-                "start_date",
-                "status",
-                "contact",
-                "company",
-                "boq",
-                "task_profile",
-                "assigned_sales",
-                "remarks",
-                "creation",
-                "modified",
-                "owner",
-                # Joined fields using dot notation
-                "contact.first_name",
-                "contact.last_name",
-                "company.company_name",
-            ],
+            fields=TASK_FIELDS,
             order_by="start_date desc",
             limit=0,  # Fetch all
         )
@@ -68,26 +116,7 @@ def get_sales_tasks(task_profiles="all"):
         # ─────────────────────────────────────────────────────────────────────
         # 2. Fetch Active BOQs and Group by Company (Pre-computed)
         # ─────────────────────────────────────────────────────────────────────
-        INACTIVE_STATUSES = ["Won", "Lost", "Dropped"]
-
-        active_boqs = frappe.get_list(
-            "CRM BOQ",
-            filters=[["boq_status", "not in", INACTIVE_STATUSES]],
-            fields=["name", "company", "boq_status"],
-            limit=0,
-        )
-
-        # Group BOQs by company - O(n) operation done once on server
-        boq_data = {}
-        for boq in active_boqs:
-            company = boq.get("company")
-            if company:
-                if company not in boq_data:
-                    boq_data[company] = []
-                boq_data[company].append({
-                    "name": boq.get("name"),
-                    "boq_status": boq.get("boq_status"),
-                })
+        boq_data = _get_active_boqs_by_company()
 
         # ─────────────────────────────────────────────────────────────────────
         # 3. Fetch Salesperson Names (Pre-resolved)
@@ -98,15 +127,7 @@ def get_sales_tasks(task_profiles="all"):
             if task.get("assigned_sales"):
                 unique_emails.add(task.get("assigned_sales"))
 
-        salesperson_map = {}
-        if unique_emails:
-            users = frappe.get_list(
-                "CRM Users",
-                filters=[["email", "in", list(unique_emails)]],
-                fields=["email", "full_name"],
-            )
-            for user in users:
-                salesperson_map[user.get("email")] = user.get("full_name")
+        salesperson_map = _get_salesperson_map(unique_emails)
 
         # ─────────────────────────────────────────────────────────────────────
         # 4. Compute Filter Options (Single Pass)
@@ -160,13 +181,349 @@ def get_sales_tasks(task_profiles="all"):
         # ─────────────────────────────────────────────────────────────────────
         # 5. Return Pre-processed Data
         # ─────────────────────────────────────────────────────────────────────
-        return {
-            "tasks": tasks,
-            "boq_data": boq_data,
-            "filter_options": filter_options,
-            "salesperson_map": salesperson_map,
-        }
+        return _encode_tasks(
+            {
+                "tasks": tasks,
+                "boq_data": boq_data,
+                "filter_options": filter_options,
+                "salesperson_map": salesperson_map,
+                "sync_token": _make_caught_up_sync_token(sync_started_at),
+            },
+            format,
+        )
 
     except Exception as e:
         frappe.log_error(f"Error in get_sales_tasks: {str(e)}", "Sales Tasks API")
         frappe.throw(f"An error occurred while fetching sales tasks: {str(e)}")
+
+
+def _get_sales_tasks_page(profile_filter, filters, sort_by, sort_order, start, page_length):
+    """
+    One page of tasks matching `filters`, with facet counts for the filter dropdowns:
+
+        {
+            "tasks": [...],            # Page of tasks with joined company/contact data
+            "total": n,                # Tasks matching the filters
+            "boq_data": {...},         # Active BOQs of the companies on this page
+            "filter_options": {...},   # Facets of all the user's tasks, not narrowed by `filters`
+            "salesperson_map": {...},  # Names for every salesperson in the facets
+        }
+
+    filters: dict (or JSON) with any of FILTERABLE_FIELDS (value or list of values)
+        plus date_from/date_to on start_date.
+    """
+    filters = frappe.parse_json(filters) if filters else {}
+    if not isinstance(filters, dict):
+        frappe.throw("filters must be an object.")
+
+    task_filters = [["task_profile", "in", profile_filter]]
+    for field in FILTERABLE_FIELDS:
+        value = filters.get(field)
+        if value in (None, "", []):
+            continue
+        task_filters.append([field, "in" if isinstance(value, list) else "=", value])
+    if filters.get("date_from"):
+        task_filters.append(["start_date", ">=", filters.get("date_from")])
+    if filters.get("date_to"):
+        task_filters.append(["start_date", "<=", filters.get("date_to")])
+
+    sort_by = sort_by or "start_date"
+    if sort_by not in SORTABLE_FIELDS:
+        frappe.throw(f"sort_by must be one of: {', '.join(SORTABLE_FIELDS)}.")
+    sort_order = "asc" if cstr(sort_order).lower() == "asc" else "desc"
+
+    start = max(cint(start), 0)
+    page_length = min(max(cint(page_length), 1), MAX_PAGE_LENGTH)
+
+    tasks = frappe.get_list(
+        "CRM Task",
+        filters=task_filters,
+        fields=TASK_FIELDS,
+        # name keeps the order stable across pages on ties
+        order_by=f"{sort_by} {sort_order}, name {sort_order}",
+        limit_start=start,
+        limit_page_length=page_length,
+    )
+    total = frappe.get_list("CRM Task", filters=task_filters, fields=["count(name) as total"])[0].total
+
+    page_companies = list({task.get("company") for task in tasks if task.get("company")})
+    boq_data = _get_active_boqs_by_company(page_companies) if page_companies else {}
+
+    filter_options, salesperson_map = _get_task_facets(profile_filter)
+
+    return {
+        "tasks": tasks,
+        "total": total,
+        "boq_data": boq_data,
+        "filter_options": filter_options,
+        "salesperson_map": salesperson_map,
+    }
+
+
+def _get_task_facets(profile_filter):
+    """
+    Returns (filter_options, salesperson_map) for the tasks of `profile_filter`
+    visible to the session user, computed with GROUP BY counts.
+
+    Facets are global to the view: they ignore the active paging filters, so the
+    dropdowns keep listing every value (and its total count) while filtering.
+    Cached per task profile and user (facets follow the user's permission
+    query) for FACETS_CACHE_TTL, and dropped by clear_task_facets_cache on
+    CRM Task writes (the facet version is part of the key).
+    """
+    cache_key = f"{FACETS_CACHE_KEY}:{_get_facets_version()}:{'|'.join(profile_filter)}:{frappe.session.user}"
+    cached = frappe.cache().get_value(cache_key)
+    if cached:
+        return cached["filter_options"], cached["salesperson_map"]
+
+    profile_filters = [["task_profile", "in", profile_filter]]
+
+    def counts_by(field):
+        rows = frappe.get_list(
+            "CRM Task",
+            filters=profile_filters + [[field, "is", "set"]],
+            fields=[field, "count(name) as count"],
+            group_by=field,
+            order_by=f"{field} asc",
+            limit=0,
+        )
+        return {row.get(field): row.get("count") for row in rows}
+
+    company_counts = counts_by("company")
+    status_counts = counts_by("status")
+    type_counts = counts_by("type")
+    profile_counts = counts_by("task_profile")
+    salesperson_counts = counts_by("assigned_sales")
+
+    company_names = {}
+    if company_counts:
+        company_names = dict(
+            frappe.get_all(
+                "CRM Company",
+                filters=[["name", "in", list(company_counts)]],
+                fields=["name", "company_name"],
+                as_list=True,
+            )
+        )
+    salesperson_map = _get_salesperson_map(set(salesperson_counts))
+
+    def options(counts):
+        return [{"value": v, "label": v, "count": c} for v, c in sorted(counts.items())]
+
+    filter_options = {
+        "companies": [
+            {"value": k, "label": label, "id": k, "count": company_counts[k]}
+            for k, label in sorted(
+                ((k, company_names.get(k) or k) for k in company_counts), key=lambda x: x[1]
+            )
+        ],
+        "statuses": options(status_counts),
+        "types": options(type_counts),
+        "profiles": options(profile_counts),
+        "salespersons": [
+            {"value": email, "label": name, "id": email, "count": salesperson_counts.get(email, 0)}
+            for email, name in sorted(salesperson_map.items(), key=lambda x: cstr(x[1]))
+        ],
+    }
+
+    frappe.cache().set_value(
+        cache_key,
+        {"filter_options": filter_options, "salesperson_map": salesperson_map},
+        expires_in_sec=FACETS_CACHE_TTL,
+    )
+    return filter_options, salesperson_map
+
+
+def clear_task_facets_cache(doc=None, method=None):
+    """
+    CRM Task on_update / after_delete: facet counts are stale for every profile and user.
+    The version changes after the commit; bumped earlier, a request could cache counts
+    of the not yet committed data under the new version.
+    """
+    frappe.db.after_commit.add(_bump_facets_version)
+
+
+def _get_facets_version():
+    version = frappe.cache().get_value(FACETS_VERSION_KEY)
+    if version is None:
+        version = _bump_facets_version()
+    return version
+
+
+def _bump_facets_version():
+    version = frappe.generate_hash(length=10)
+    frappe.cache().set_value(FACETS_VERSION_KEY, version)
+    return version
+
+
+def _encode_tasks(response, format):
+    if is_columnar(format):
+        response["tasks"] = to_columnar(response["tasks"])
+    return response
+
+
+def _get_profile_filter(task_profiles):
+    # Determine task profile filter
+    if task_profiles == "all":
+        return ["Sales", "Estimates"]
+    elif task_profiles == "Sales":
+        return ["Sales"]
+    else:
+        return ["Estimates"]
+
+
+def _get_sales_tasks_delta(profile_filter, since, sync_started_at):
+    """
+    Returns the changes since the `since` sync token:
+
+        {
+            "tasks": [...],            # Tasks created/modified since, visible to the user
+            "removed_tasks": [...],    # Deleted tasks, or tasks that left this view (profile/permissions)
+            "boq_data": {...},         # Active BOQs of every company whose BOQs changed ([] = none left)
+            "salesperson_map": {...},  # Changed salesperson names / names for new assignees
+            "has_more": bool,          # More task changes pending - call again with sync_token
+            "sync_token": "..."
+        }
+
+    Tasks are read in (modified, name) order so batches never skip or repeat
+    a task on timestamp ties. Once caught up, the token goes back
+    SYNC_SAFETY_WINDOW_SECONDS, so the next delta repeats the latest changes:
+    clients apply "tasks" as upserts and "removed_tasks" as idempotent deletes.
+    filter_options is only returned by a full sync; clients update their
+    options from the changed tasks.
+    """
+    since_modified, since_name = _parse_sync_token(since)
+
+    # Narrow read of every changed task (regardless of permissions/profile) to detect removals
+    changed = frappe.get_all(
+        "CRM Task",
+        filters=[["modified", ">=", since_modified]],
+        or_filters=[["modified", ">", since_modified], ["name", ">", since_name]],
+        fields=["name", "modified"],
+        order_by="modified asc, name asc",
+        limit=DELTA_BATCH_SIZE + 1,
+    )
+    has_more = len(changed) > DELTA_BATCH_SIZE
+    changed = changed[:DELTA_BATCH_SIZE]
+    changed_names = [task.name for task in changed]
+
+    tasks = []
+    if changed_names:
+        tasks = frappe.get_list(
+            "CRM Task",
+            filters=[["name", "in", changed_names], ["task_profile", "in", profile_filter]],
+            fields=TASK_FIELDS,
+            order_by="start_date desc",
+            limit=0,
+        )
+    visible_names = {task.name for task in tasks}
+    removed_tasks = [name for name in changed_names if name not in visible_names]
+
+    deleted_docs = frappe.get_all(
+        "Deleted Document",
+        filters=[
+            ["deleted_doctype", "in", ["CRM Task", "CRM BOQ"]],
+            ["creation", ">=", since_modified],
+        ],
+        fields=["deleted_doctype", "deleted_name", "data"],
+        limit=0,
+    )
+    removed_tasks.extend(
+        d.deleted_name
+        for d in deleted_docs
+        if d.deleted_doctype == "CRM Task" and d.deleted_name not in removed_tasks
+    )
+
+    # Companies whose active BOQ list may have changed
+    boq_companies = set(
+        frappe.get_all("CRM BOQ", filters=[["modified", ">=", since_modified]], pluck="company", limit=0)
+    )
+    for deleted in deleted_docs:
+        if deleted.deleted_doctype == "CRM BOQ":
+            boq_companies.add(frappe.parse_json(deleted.data or "{}").get("company"))
+    boq_companies.discard(None)
+    boq_companies.discard("")
+
+    boq_data = {}
+    if boq_companies:
+        boq_data = {company: [] for company in boq_companies}
+        boq_data.update(_get_active_boqs_by_company(list(boq_companies)))
+
+    new_emails = {task.get("assigned_sales") for task in tasks if task.get("assigned_sales")}
+    salesperson_map = _get_salesperson_map(new_emails, modified_since=since_modified)
+
+    if has_more:
+        sync_token = _make_sync_token(changed[-1].modified, changed[-1].name)
+    else:
+        sync_token = _make_caught_up_sync_token(sync_started_at)
+
+    return {
+        "tasks": tasks,
+        "removed_tasks": removed_tasks,
+        "boq_data": boq_data,
+        "salesperson_map": salesperson_map,
+        "has_more": has_more,
+        "sync_token": sync_token,
+    }
+
+
+def _get_active_boqs_by_company(companies=None):
+    filters = [["boq_status", "not in", INACTIVE_STATUSES]]
+    if companies is not None:
+        filters.append(["company", "in", companies])
+
+    active_boqs = frappe.get_list(
+        "CRM BOQ",
+        filters=filters,
+        fields=["name", "company", "boq_status"],
+        limit=0,
+    )
+
+    # Group BOQs by company - O(n) operation done once on server
+    boq_data = {}
+    for boq in active_boqs:
+        company = boq.get("company")
+        if company:
+            if company not in boq_data:
+                boq_data[company] = []
+            boq_data[company].append({
+                "name": boq.get("name"),
+                "boq_status": boq.get("boq_status"),
+            })
+    return boq_data
+
+
+def _get_salesperson_map(emails, modified_since=None):
+    """email -> full_name for `emails` (plus, with modified_since, any CRM User changed since)."""
+    or_filters = []
+    if emails:
+        or_filters.append(["email", "in", list(emails)])
+    if modified_since:
+        or_filters.append(["modified", ">=", modified_since])
+    if not or_filters:
+        return {}
+
+    users = frappe.get_list(
+        "CRM Users",
+        or_filters=or_filters,
+        fields=["email", "full_name"],
+        limit=0,
+    )
+    return {user.get("email"): user.get("full_name") for user in users}
+
+
+def _make_sync_token(modified, name):
+    return json.dumps([cstr(modified), name])
+
+
+def _make_caught_up_sync_token(sync_started_at):
+    """Token of a call that returned every change: restarts SYNC_SAFETY_WINDOW_SECONDS back."""
+    return _make_sync_token(add_to_date(sync_started_at, seconds=-SYNC_SAFETY_WINDOW_SECONDS), "")
+
+
+def _parse_sync_token(token):
+    try:
+        modified, name = json.loads(token)
+        return get_datetime(modified), name
+    except Exception:
+        frappe.throw("Invalid sync token.")
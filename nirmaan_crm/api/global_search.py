@@ -4,9 +4,44 @@ import frappe
 from frappe.utils import cint
 from html import escape
 import re # Import regex for case-insensitive highlighting
+import json
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index import (
+    get_result_path,
+    get_search_version,
+    get_title,
+    search_index,
+)
+from nirmaan_crm.nirmaan_crm.permissions import get_policy_user_field
+from nirmaan_crm.utils.normalize import is_email_term, is_phone_term, normalize_email, normalize_mobile
+from nirmaan_crm.utils.queries import count_search_matches, fuzzy_search_list, lookup_list, search_branches, search_page
+from nirmaan_crm.utils.roles import get_role_profile
+from nirmaan_crm.utils.schema import has_column
+from nirmaan_crm.utils.settings import get_crm_settings
+
+# Assignment columns stored on CRM Search Index rows (search_index scopes can filter on these)
+INDEX_ASSIGNMENT_FIELDS = ("assigned_sales", "assigned_estimations")
+
+# Results returned from the CRM Search Index (the per-doctype path returns up to 10 per doctype)
+INDEX_SEARCH_LIMIT = 40
+
+# Results are cached per (user, role, term) for this long, and dropped as soon as
+# any searchable record changes (the search version is part of the key)
+SEARCH_RESULT_CACHE_TTL = 120
+
+# global_search_doctype: max page size, and matches counted before the total is reported as an estimate
+SEARCH_PAGE_MAX_SIZE = 100
+SEARCH_COUNT_LIMIT = 1000
+
+# fuzzy=1: phonetic matches per doctype, ranked on these name fields
+FUZZY_SEARCH_LIMIT = 5
+FUZZY_RANK_FIELDS = {
+    "CRM Contacts": ["first_name", "last_name"],
+    "CRM Company": ["company_name", "company_nick"],
+}
 
 @frappe.whitelist(allow_guest=False)
-def global_search(search_term="", user_role=""):
+def global_search(search_term="", user_role="", fuzzy=0):
     """
     Performs a global search across multiple CRM DocTypes based on user role.
     Filters results by 'assigned_sales'/'assigned_estimations'/'assigned_to'
@@ -14,8 +49,12 @@ def global_search(search_term="", user_role=""):
     Results are structured for a frontend command menu with highlighting.
     Leverages Frappe ORM for better integration and permissions.
     Includes Python print statements for debugging output to the console.
+    With fuzzy=1, contacts and companies whose names sound like the term
+    ("Srivastava" for "Shrivastava") are appended after the regular matches.
+    The role is resolved from the session user (see get_search_role); the
+    user_role argument is only kept for API compatibility.
     """
-    print(f"global_search called with search_term: '{search_term}', user_role: '{user_role}'")
+    print(f"global_search called with search_term: '{search_term}', user_role: '{user_role}', fuzzy: '{fuzzy}'")
 
     if not search_term or len(search_term) < 2:
         print("Search term too short or empty, returning empty list.")
@@ -23,33 +62,262 @@ def global_search(search_term="", user_role=""):
 
     search_pattern = f"%{search_term.strip()}%"
     user_email = frappe.session.user # Current logged-in user
+    user_role = get_search_role(user_email)
     
-    print(f"Processed search_pattern: '{search_pattern}', current user_email: '{user_email}'")
+    print(f"Processed search_pattern: '{search_pattern}', current user_email: '{user_email}', resolved user_role: '{user_role}'")
+
+    # Settings come from the shared cache (see _make_highlighter for the highlight pattern)
+    highlight_enabled = cint(get_crm_settings().get("highlight_search_results"))
+
+    fuzzy = cint(fuzzy)
+    cache_key = _get_result_cache_key(user_email, user_role, search_term, highlight_enabled, fuzzy)
+    cached_results = frappe.cache().get_value(cache_key)
+    if cached_results is not None:
+        print(f"global_search served from cache. Total results: {len(cached_results)}")
+        return cached_results
+
+    results = _search(search_term, user_role, user_email, highlight_enabled)
+    if fuzzy:
+        results += _fuzzy_search(search_term, user_role, user_email, highlight_enabled, results)
+    frappe.cache().set_value(cache_key, results, expires_in_sec=SEARCH_RESULT_CACHE_TTL)
+    return results
 
-    results = []
 
-    def add_highlight(text, term_to_highlight_original):
+@frappe.whitelist(allow_guest=False)
+def global_search_doctype(search_term="", doctype="", user_role="", cursor=None, page_size=20):
+    """
+    "See all results" for one doctype of global_search: keyset pages of matches,
+    newest first, with the same role filters.
+
+    Args:
+        search_term: Same input as global_search
+        doctype: CRM Contacts, CRM Company, CRM BOQ or CRM Task
+        user_role: Ignored, the role comes from the session user (see get_search_role)
+        cursor: next_cursor of the previous page
+        page_size: Rows per page (max SEARCH_PAGE_MAX_SIZE)
+
+    Returns:
+        {
+            "results": [...],          # Same format as global_search
+            "next_cursor": "..." | None,
+            "total_estimate": n,       # First page only: exact up to SEARCH_COUNT_LIMIT, else the limit
+            "total_is_exact": bool
+        }
+    """
+    print(f"global_search_doctype called with search_term: '{search_term}', doctype: '{doctype}', user_role: '{user_role}'")
+
+    empty = {"results": [], "next_cursor": None, "total_estimate": 0, "total_is_exact": True}
+    if not search_term or len(search_term) < 2:
+        return empty
+
+    user_role = get_search_role(frappe.session.user)
+
+    branch = next(
+        (b for b in _get_search_branches(user_role, frappe.session.user) if b["doctype"] == doctype), None
+    )
+    if not branch:
+        print(f"{doctype} is not searchable for user_role: {user_role}")
+        return empty
+
+    page_size = min(max(cint(page_size), 1), SEARCH_PAGE_MAX_SIZE)
+    rows = search_page(
+        doctype,
+        branch["search_fields"],
+        search_term,
+        filters=branch["filters"],
+        fields=branch["fields"],
+        cursor=_parse_search_cursor(cursor) if cursor else None,
+        limit=page_size + 1,
+    )
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    add_highlight = _make_highlighter(search_term, cint(get_crm_settings().get("highlight_search_results")))
+    results = []
+    for row in rows:
+        results.append({
+            "doctype": doctype,
+            "name": row.name,
+            "title": add_highlight(get_title(doctype, row), search_term),
+            "path": get_result_path(doctype, row.name)
+        })
+
+    response = {
+        "results": results,
+        "next_cursor": json.dumps([str(rows[-1].modified), rows[-1].name]) if has_more else None,
+        "total_estimate": None,
+        "total_is_exact": None,
+    }
+    if not cursor:
+        total = count_search_matches(
+            doctype,
+            branch["search_fields"],
+            search_term,
+            filters=branch["filters"],
+            max_count=SEARCH_COUNT_LIMIT + 1,
+        )
+        response["total_estimate"] = min(total, SEARCH_COUNT_LIMIT)
+        response["total_is_exact"] = total <= SEARCH_COUNT_LIMIT
+
+    print(f"global_search_doctype completed. Page results: {len(results)}, has_more: {has_more}")
+    return response
+
+
+def _make_highlighter(search_term, highlight_enabled):
+    """Returns add_highlight(text, term) with the highlight pattern compiled once, not per row."""
+    highlight_pattern = re.compile(re.escape(search_term.strip('%')), flags=re.IGNORECASE) if highlight_enabled else None
+
+    def add_highlight(text, term_to_highlight_original=None):
         if not text:
             return ""
         
         escaped_text = escape(str(text)) 
-        term_cleaned = term_to_highlight_original.strip('%')
-        escaped_term_for_regex = re.escape(term_cleaned)
-        
-        highlight_enabled = False
+
+        if highlight_pattern:
+            return highlight_pattern.sub(r'<span class="search-highlight">\g<0></span>', escaped_text)
+        return escaped_text
+
+    return add_highlight
+
+
+def _parse_search_cursor(cursor):
+    try:
+        modified, name = json.loads(cursor)
+    except Exception:
+        frappe.throw("Invalid cursor.")
+    return modified, name
+
+
+def _search(search_term, user_role, user_email, highlight_enabled):
+    add_highlight = _make_highlighter(search_term, highlight_enabled)
+
+    # --- Phone number / email terms: indexed lookup on the normalized contact columns ---
+    results = _lookup_contacts(search_term, user_role, user_email, add_highlight)
+    if results:
+        print(f"global_search completed from contact lookup. Total results: {len(results)}")
+        return results
+
+    # --- Search the CRM Search Index (one ranked query, Postgres) ---
+    scopes = None
+    if frappe.db.db_type == "postgres" and has_column("CRM Search Index", "search_vector"):
+        scopes = _get_search_scopes(user_role, user_email)
+    if scopes is not None:
+        frappe.db.savepoint("crm_search_index")
         try:
-            if frappe.db.exists('DocType', 'CRM Settings') and frappe.db.exists('CRM Settings', 'CRM Settings'):
-                highlight_enabled = cint(frappe.get_single_value('CRM Settings', 'highlight_search_results', False))
-            else:
-                print("CRM Settings or highlight_search_results field not found. Highlighting disabled.")
+            rows = search_index(search_term, scopes, limit=INDEX_SEARCH_LIMIT)
+            frappe.db.release_savepoint("crm_search_index")
+            print(f"CRM Search Index: Found {len(rows)} results. Scopes used: {scopes}")
+            for row in rows:
+                results.append({
+                    "doctype": row.ref_doctype,
+                    "name": row.ref_name,
+                    "title": add_highlight(row.title, search_term),
+                    "path": get_result_path(row.ref_doctype, row.ref_name)
+                })
+            print(f"global_search completed. Total results: {len(results)}")
+            return results
         except Exception as e:
-            print(f"Error checking CRM Settings for highlighting: {e}. Highlighting disabled.")
-            pass 
+            # Fall back to the per-doctype searches below; rolling back to the savepoint
+            # clears the aborted statement without discarding the request's earlier writes
+            print(f"Error searching CRM Search Index: {e}")
+            frappe.db.rollback(save_point="crm_search_index")
+            results = []
+
+    # Per-doctype searches, run together (see search_branches) once all branches are known
+    branches = _get_search_branches(user_role, user_email)
+
+    rows_by_doctype = search_branches(branches, search_term, limit=10)
+    for branch in branches:
+        doctype = branch["doctype"]
+        rows = rows_by_doctype.get(doctype, [])
+        print(f"{doctype}: Found {len(rows)} results. Filters used: {branch['filters']}, Search fields: {branch['search_fields']}")
+        for row in rows:
+            results.append({
+                "doctype": doctype,
+                "name": row.name,
+                "title": add_highlight(get_title(doctype, row), search_term),
+                "path": get_result_path(doctype, row.name)
+            })
 
-        if highlight_enabled:
-            return re.sub(escaped_term_for_regex, r'<span class="search-highlight">\g<0></span>', escaped_text, flags=re.IGNORECASE)
-        return escaped_text
+    # --- Search CRM Users (Admin Only) ---
+    # print(f"Attempting to search CRM Users for user_role: {user_role}")
+    # if user_role == "Nirmaan Admin User Profile": # This block is explicitly for Admin only
+    #     base_filters = {} # For AND conditions (none specific for global user search)
+
+    #     user_or_filters = [ # For OR conditions
+    #         ["full_name", "like", search_pattern],
+    #         ["email", "like", search_pattern]
+    #     ]
+    #     try:
+    #         users = frappe.get_list(
+    #             "CRM Users",
+    #             filters=base_filters,
+    #             or_filters=user_or_filters,
+    #             fields=["name", "full_name", "nirmaan_role_name"],
+    #             limit_page_length=10, # Re-enabled limit
+    #             order_by="modified desc"
+    #         )
+    #         print(f"CRM Users: Found {len(users)} results. Filters used: {base_filters}, OR Filters used: {user_or_filters}")
+    #         for user in users:
+    #             display_text = f"{user.full_name} ({user.nirmaan_role_name or 'N/A'})"
+    #             title = add_highlight(display_text, search_term)
+    #             results.append({
+    #                 "doctype": "CRM Users",
+    #                 "name": user.name,
+    #                 "title": title,
+    #                 "path": f"/team/details?memberId={user.name}"
+    #             })
+    #     except Exception as e:
+    #         print(f"Error searching CRM Users: {e}")
+
+    print(f"global_search completed. Total results: {len(results)}")
+    return results
+
+
+def _lookup_contacts(search_term, user_role, user_email, add_highlight):
+    """
+    Contacts whose normalized mobile ends with a phone number term, or whose
+    normalized email equals an email term (ends with it for "@domain" terms).
+    Returns [] for other terms, and when nothing matches (the regular search runs then).
+    """
+    if is_phone_term(search_term):
+        field, value, suffix = "mobile_normalized", normalize_mobile(search_term), True
+    elif is_email_term(search_term):
+        value = normalize_email(search_term)
+        field, suffix = "email_normalized", value.startswith("@")
+    else:
+        return []
+
+    branch = next(
+        (b for b in _get_search_branches(user_role, user_email) if b["doctype"] == "CRM Contacts"), None
+    )
+    if not branch or not has_column("CRM Contacts", field):
+        return []
 
+    rows = lookup_list(
+        "CRM Contacts",
+        field,
+        value,
+        suffix=suffix,
+        filters=branch["filters"],
+        fields=branch["fields"],
+        limit=10,
+    )
+    print(f"CRM Contacts lookup on {field}: Found {len(rows)} results. Filters used: {branch['filters']}")
+    return [
+        {
+            "doctype": "CRM Contacts",
+            "name": row.name,
+            "title": add_highlight(get_title("CRM Contacts", row), search_term),
+            "path": get_result_path("CRM Contacts", row.name)
+        }
+        for row in rows
+    ]
+
+
+def _get_search_branches(user_role, user_email):
+    """Per-doctype search branches (doctype, search fields, role filters, fields) for search_branches/search_page."""
+    branches = []
 
     # --- Search CRM Contacts ---
     print(f"Attempting to search CRM Contacts for user_role: {user_role}")
@@ -60,36 +328,14 @@ def global_search(search_term="", user_role=""):
             base_filters["assigned_sales"] = user_email
             print(f"CRM Contacts: Added assigned_sales filter for {user_email}")
         
-        contact_or_filters = [ # For OR conditions
-            ["first_name", "like", search_pattern],
-            ["last_name", "like", search_pattern],
-            ["email", "like", search_pattern],
-            ["mobile", "like", search_pattern]
-        ]
+        contact_search_fields = ["first_name", "last_name", "email", "mobile"] # Matched with OR
 
-        try:
-            contacts = frappe.get_list(
-                "CRM Contacts",
-                filters=base_filters, # Pass AND conditions
-                or_filters=contact_or_filters, # Pass OR conditions separately
-                fields=["name", "first_name", "last_name", "email", "mobile"],
-                limit_page_length=10, # Re-enabled limit
-                order_by="modified desc"
-            )
-            print(f"CRM Contacts: Found {len(contacts)} results. Filters used: {base_filters}, OR Filters used: {contact_or_filters}")
-            for contact in contacts:
-                full_name = f"{contact.first_name or ''} {contact.last_name or ''}".strip()
-                contact_info = contact.mobile or contact.email or 'N/A'
-                display_text = f"{full_name} ({contact_info})"
-                title = add_highlight(display_text, search_term)
-                results.append({
-                    "doctype": "CRM Contacts",
-                    "name": contact.name,
-                    "title": title,
-                    "path": f"/contacts/contact?id={contact.name}"
-                })
-        except Exception as e:
-            print(f"Error searching CRM Contacts: {e}")
+        branches.append({
+            "doctype": "CRM Contacts",
+            "search_fields": contact_search_fields,
+            "filters": base_filters,
+            "fields": ["name", "first_name", "last_name", "email", "mobile"],
+        })
 
     # --- Search CRM Company ---
     print(f"Attempting to search CRM Company for user_role: {user_role}")
@@ -100,33 +346,14 @@ def global_search(search_term="", user_role=""):
             base_filters["assigned_sales"] = user_email
             print(f"CRM Company: Added assigned_sales filter for {user_email}")
 
-        company_or_filters = [ # For OR conditions
-            ["company_name", "like", search_pattern],
-            ["company_nick", "like", search_pattern],
-            ["company_city", "like", search_pattern]
-        ]
+        company_search_fields = ["company_name", "company_nick", "company_city"] # Matched with OR
     
-        try:
-            companies = frappe.get_list(
-                "CRM Company",
-                filters=base_filters,
-                or_filters=company_or_filters,
-                fields=["name", "company_name", "company_city"],
-                limit_page_length=10, # Re-enabled limit
-                order_by="modified desc"
-            )
-            print(f"CRM Company: Found {len(companies)} results. Filters used: {base_filters}, OR Filters used: {company_or_filters}")
-            for company in companies:
-                display_text = f"{company.company_name} ({company.company_city or 'N/A'})"
-                title = add_highlight(display_text, search_term)
-                results.append({
-                    "doctype": "CRM Company",
-                    "name": company.name,
-                    "title": title,
-                    "path": f"/companies/company?id={company.name}"
-                })
-        except Exception as e:
-            print(f"Error searching CRM Company: {e}")
+        branches.append({
+            "doctype": "CRM Company",
+            "search_fields": company_search_fields,
+            "filters": base_filters,
+            "fields": ["name", "company_name", "company_city"],
+        })
 
     # --- Search CRM BOQ ---
     print(f"Attempting to search CRM BOQ for user_role: {user_role}")
@@ -139,35 +366,14 @@ def global_search(search_term="", user_role=""):
             base_filters["assigned_estimations"] = user_email
             print(f"CRM BOQ: Added assigned_estimations filter for {user_email}")
         
-        boq_or_filters = [ # For OR conditions
-            ["name", "like", search_pattern],
-            ["boq_name", "like", search_pattern],
-            ["boq_type", "like", search_pattern],
-            ["city", "like", search_pattern],
-            ["boq_status", "like", search_pattern]
-        ]
+        boq_search_fields = ["name", "boq_name", "boq_type", "city", "boq_status"] # Matched with OR
     
-        try:
-            boqs = frappe.get_list(
-                "CRM BOQ",
-                filters=base_filters,
-                or_filters=boq_or_filters,
-                fields=["name", "boq_name", "boq_status"],
-                limit_page_length=10, # Re-enabled limit
-                order_by="modified desc"
-            )
-            print(f"CRM BOQ: Found {len(boqs)} results. Filters used: {base_filters}, OR Filters used: {boq_or_filters}")
-            for boq in boqs:
-                display_text = f"{boq.boq_name} ({boq.boq_status or 'N/A'})"
-                title = add_highlight(display_text, search_term)
-                results.append({
-                    "doctype": "CRM BOQ",
-                    "name": boq.name,
-                    "title": title,
-                    "path": f"/boqs/boq?id={boq.name}"
-                })
-        except Exception as e:
-            print(f"Error searching CRM BOQ: {e}")
+        branches.append({
+            "doctype": "CRM BOQ",
+            "search_fields": boq_search_fields,
+            "filters": base_filters,
+            "fields": ["name", "boq_name", "boq_status"],
+        })
 
     # --- Search CRM Task ---
     print(f"Attempting to search CRM Task for user_role: {user_role}")
@@ -175,82 +381,115 @@ def global_search(search_term="", user_role=""):
         base_filters = {} # For AND conditions
         # Conditional assignment for Tasks
         if user_role == "Nirmaan Sales User Profile":
-            if frappe.db.has_column("CRM Task", "assigned_sales"):
+            if has_column("CRM Task", "assigned_sales"):
                 base_filters["assigned_sales"] = user_email
                 print(f"CRM Task: Added assigned_sales filter for Sales User {user_email}")
-            elif frappe.db.has_column("CRM Task", "assigned_to"): # Fallback to assigned_to if assigned_sales doesn't exist
+            elif has_column("CRM Task", "assigned_to"): # Fallback to assigned_to if assigned_sales doesn't exist
                 base_filters["assigned_to"] = user_email
                 print(f"CRM Task: Added assigned_to filter for Sales User {user_email} (assigned_sales not found)")
         elif user_role in ["Nirmaan Estimations User Profile", "Nirmaan Estimations Lead Profile"]:
-            if frappe.db.has_column("CRM Task", "assigned_estimations"):
+            if has_column("CRM Task", "assigned_estimations"):
                 base_filters["assigned_estimations"] = user_email
                 print(f"CRM Task: Added assigned_estimations filter for Estimations User {user_email}")
-            elif frappe.db.has_column("CRM Task", "assigned_to"): # Fallback to assigned_to
+            elif has_column("CRM Task", "assigned_to"): # Fallback to assigned_to
                 base_filters["assigned_to"] = user_email
                 print(f"CRM Task: Added assigned_to filter for Estimations User {user_email} (assigned_estimations not found)")
 
-        task_or_filters = [ # For OR conditions
-            ["name", "like", search_pattern],
-            ["type", "like", search_pattern],
-        
-        ]
+        task_search_fields = ["name", "type"] # Matched with OR
 
-        try:
-            tasks = frappe.get_list(
-                "CRM Task",
-                filters=base_filters,
-                or_filters=task_or_filters,
-                fields=["name", "type", "status", "company", "boq"], # Added description field
-                limit_page_length=10, # Re-enabled limit
-                order_by="modified desc"
-            )
-            print(f"CRM Task: Found {len(tasks)} results. Filters used: {base_filters}, OR Filters used: {task_or_filters}")
-            for task in tasks:
-                # Use description or company in display_text
-                display_text = f"{task.type} - {task.boq or task.company or 'N/A'} ({task.status or 'N/A'})"
-                title = add_highlight(display_text, search_term)
-                results.append({
-                    "doctype": "CRM Task",
-                    "name": task.name,
-                    "title": title,
-                    "path": f"/tasks/task?id={task.name}"
-                })
-        except Exception as e:
-            print(f"Error searching CRM Task: {e}")
+        branches.append({
+            "doctype": "CRM Task",
+            "search_fields": task_search_fields,
+            "filters": base_filters,
+            "fields": ["name", "type", "status", "company", "boq"],
+        })
 
-    # --- Search CRM Users (Admin Only) ---
-    # print(f"Attempting to search CRM Users for user_role: {user_role}")
-    # if user_role == "Nirmaan Admin User Profile": # This block is explicitly for Admin only
-    #     base_filters = {} # For AND conditions (none specific for global user search)
+    return branches
 
-    #     user_or_filters = [ # For OR conditions
-    #         ["full_name", "like", search_pattern],
-    #         ["email", "like", search_pattern]
-    #     ]
-    #     try:
-    #         users = frappe.get_list(
-    #             "CRM Users",
-    #             filters=base_filters,
-    #             or_filters=user_or_filters,
-    #             fields=["name", "full_name", "nirmaan_role_name"],
-    #             limit_page_length=10, # Re-enabled limit
-    #             order_by="modified desc"
-    #         )
-    #         print(f"CRM Users: Found {len(users)} results. Filters used: {base_filters}, OR Filters used: {user_or_filters}")
-    #         for user in users:
-    #             display_text = f"{user.full_name} ({user.nirmaan_role_name or 'N/A'})"
-    #             title = add_highlight(display_text, search_term)
-    #             results.append({
-    #                 "doctype": "CRM Users",
-    #                 "name": user.name,
-    #                 "title": title,
-    #                 "path": f"/team/details?memberId={user.name}"
-    #             })
-    #     except Exception as e:
-    #         print(f"Error searching CRM Users: {e}")
 
-    print(f"global_search completed. Total results: {len(results)}")
-    return results
+def _fuzzy_search(search_term, user_role, user_email, highlight_enabled, results):
+    """Phonetic matches (see fuzzy_search_list) of Contacts / Company not already in `results`."""
+    found = {(result["doctype"], result["name"]) for result in results}
+    add_highlight = _make_highlighter(search_term, highlight_enabled)
+    fuzzy_results = []
+
+    for branch in _get_search_branches(user_role, user_email):
+        rank_fields = FUZZY_RANK_FIELDS.get(branch["doctype"])
+        if not rank_fields:
+            continue
+        doctype = branch["doctype"]
+        frappe.db.savepoint("crm_fuzzy_search")
+        try:
+            rows = fuzzy_search_list(
+                doctype,
+                "search_phonetic_key",
+                search_term,
+                rank_fields,
+                filters=branch["filters"],
+                fields=branch["fields"],
+                limit=FUZZY_SEARCH_LIMIT,
+            )
+            frappe.db.release_savepoint("crm_fuzzy_search")
+        except Exception as e:
+            # e.g. search_phonetic_key not migrated yet; fuzzy matches are a best-effort extra
+            print(f"Error in fuzzy search of {doctype}: {e}")
+            frappe.db.rollback(save_point="crm_fuzzy_search")
+            continue
+
+        print(f"{doctype}: Found {len(rows)} fuzzy results.")
+        for row in rows:
+            if (doctype, row.name) in found:
+                continue
+            fuzzy_results.append({
+                "doctype": doctype,
+                "name": row.name,
+                "title": add_highlight(get_title(doctype, row), search_term),
+                "path": get_result_path(doctype, row.name),
+                "fuzzy": 1
+            })
+    return fuzzy_results
+
+
+def _get_result_cache_key(user_email, user_role, search_term, highlight_enabled, fuzzy=0):
+    normalized_term = " ".join(search_term.lower().split())
+    return (
+        f"crm_global_search:{get_search_version()}:{user_email}:{user_role}:"
+        f"{cint(highlight_enabled)}:{cint(fuzzy)}:{normalized_term}"
+    )
+
+
+def _get_search_scopes(user_role, user_email):
+    """
+    (doctype, assignment) pairs a role may search in the CRM Search Index: the role
+    filters of _get_search_branches plus the column the doctype's CRM Permission
+    Policy limits the user to (search_index is raw SQL, so the permission query
+    conditions the get_list path relies on do not apply to it).
+    Returns None when an assignment column is not stored in the index; the caller
+    then uses the per-doctype path.
+    """
+    scopes = []
+    for branch in _get_search_branches(user_role, user_email):
+        assignment = dict(branch["filters"])
+        user_field = get_policy_user_field(branch["doctype"], user_email)
+        if user_field:
+            assignment[user_field] = user_email
+        if any(field not in INDEX_ASSIGNMENT_FIELDS for field in assignment):
+            return None
+        scopes.append((branch["doctype"], assignment))
+    return scopes
+
+
+def get_search_role(user):
+    """
+    Role profile searches run with, resolved from the session user. The user_role
+    argument of the endpoints comes from the client and is not trusted.
+    """
+    if user == "Administrator" or "System Manager" in frappe.get_roles(user):
+        return "Nirmaan Admin User Profile"
+    try:
+        return get_role_profile(user)
+    except frappe.DoesNotExistError:
+        return ""
 
 
 # Before Adding Sales Users Validation
@@ -0,0 +1,102 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+from nirmaan_crm.api.get_modified_crm_company import get_modified_crm_companies
+from nirmaan_crm.tests.utils import count_queries
+
+
+class TestGetModifiedCRMCompanies(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+
+	def make_companies(self, count, prefix):
+		for i in range(count):
+			company = frappe.get_doc(
+				{"doctype": "CRM Company", "company_name": f"{prefix} Company {i}", "company_city": "Pune"}
+			).insert(ignore_permissions=True)
+			frappe.get_doc(
+				{
+					"doctype": "CRM Task",
+					"company": company.name,
+					"type": "In Person Meeting",
+					"status": "Scheduled",
+					"start_date": add_days(nowdate(), 2),
+				}
+			).insert(ignore_permissions=True)
+			frappe.get_doc(
+				{
+					"doctype": "CRM Task",
+					"company": company.name,
+					"type": "In Person Meeting",
+					"status": "Completed",
+					"start_date": add_days(nowdate(), -2),
+					"remarks": "Met the purchase team",
+				}
+			).insert(ignore_permissions=True)
+			frappe.get_doc(
+				{
+					"doctype": "CRM BOQ",
+					"boq_name": f"{prefix} BOQ {i}",
+					"company": company.name,
+					"city": "Pune",
+					"boq_status": "New",
+					"deal_status": "Hot",
+				}
+			).insert(ignore_permissions=True)
+
+	def test_query_count_is_constant(self):
+		self.make_companies(3, "Small")
+		with count_queries() as small_run:
+			small_result = get_modified_crm_companies()
+
+		self.make_companies(15, "Large")
+		with count_queries() as large_run:
+			large_result = get_modified_crm_companies()
+
+		self.assertGreater(len(large_result), len(small_result))
+		self.assertEqual(len(small_run), len(large_run))
+
+	def test_payload_is_enriched_per_company(self):
+		self.make_companies(2, "Payload")
+		result = {row["company_name"]: row for row in get_modified_crm_companies()}
+		row = result["Payload Company 0"]
+
+		self.assertEqual(row["next_meeting_in_14_days"], add_days(nowdate(), 2))
+		self.assertEqual(row["last_meeting_in_7_days"], add_days(nowdate(), -2))
+		self.assertTrue(row["next_meeting_id"])
+		self.assertEqual([r["remarks"] for r in row["last_three_remarks_from_tasks"]], ["Met the purchase team"])
+		self.assertEqual([b["boq_name"] for b in row["active_boq"]], ["Payload BOQ 0"])
+		self.assertEqual([b["boq_name"] for b in row["hot_boq"]], ["Payload BOQ 0"])
+		self.assertEqual([b["boq_name"] for b in row["last_30_days_boqs"]], ["Payload BOQ 0"])
+
+	def test_keyset_pages_cover_full_list(self):
+		self.make_companies(5, "Paged")
+		full_list = [row["name"] for row in get_modified_crm_companies(city="Pune")]
+
+		paged, cursor = [], None
+		while True:
+			page = get_modified_crm_companies(page_size=2, cursor=cursor, city="Pune")
+			self.assertLessEqual(len(page["companies"]), 2)
+			paged.extend(row["name"] for row in page["companies"])
+			cursor = page["next_cursor"]
+			if not cursor:
+				break
+
+		# Same order, including the name tiebreak between companies with equal meeting dates
+		self.assertEqual(paged, full_list)
+
+	def test_page_only_enriches_requested_companies(self):
+		self.make_companies(3, "Scoped")
+		with count_queries() as queries:
+			page = get_modified_crm_companies(page_size=1, city="Pune")
+
+		self.assertEqual(len(page["companies"]), 1)
+		company_name = page["companies"][0]["name"]
+		activity_reads = [q for q in queries if q and "tabCRM Company Activity" in q and "LEFT JOIN" not in q]
+		self.assertEqual(len(activity_reads), 1)
+		self.assertIn(company_name, activity_reads[0])
+		self.assertFalse([q for q in queries if q and "tabCRM BOQ" in q])
@@ -0,0 +1,151 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_to_date, now_datetime, nowdate
+
+from nirmaan_crm.api import get_sales_tasks as sales_tasks_api
+from nirmaan_crm.api.get_sales_tasks import get_sales_tasks
+
+
+class TestGetSalesTasks(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.company = frappe.get_doc(
+			{"doctype": "CRM Company", "company_name": "Sales Tasks Test Company", "company_city": "Pune"}
+		).insert(ignore_permissions=True)
+		self.tasks = [self.make_task(days=i) for i in range(3)]
+
+	def make_task(self, days=0, **values):
+		return frappe.get_doc(
+			{
+				"doctype": "CRM Task",
+				"company": self.company.name,
+				"type": "Call",
+				"status": "Scheduled",
+				"task_profile": "Sales",
+				"start_date": add_days(nowdate(), days),
+				**values,
+			}
+		).insert(ignore_permissions=True)
+
+	def sync_all(self, since):
+		"""Follows has_more until caught up; returns (responses, sync_token)."""
+		responses = []
+		while True:
+			response = get_sales_tasks(since=since)
+			responses.append(response)
+			since = response["sync_token"]
+			if not response["has_more"]:
+				return responses, since
+
+	def test_delta_returns_changed_tasks(self):
+		token = get_sales_tasks()["sync_token"]
+
+		task = self.tasks[0]
+		task.remarks = "Changed after the full sync"
+		task.save(ignore_permissions=True)
+
+		responses, _ = self.sync_all(token)
+		changed = {t.name: t for r in responses for t in r["tasks"]}
+		self.assertEqual(changed[task.name].remarks, "Changed after the full sync")
+
+	def test_token_covers_late_commits(self):
+		token = get_sales_tasks()["sync_token"]
+
+		# Saved by a transaction that was still open when the token was issued
+		late = self.make_task()
+		frappe.db.set_value(
+			"CRM Task", late.name, "modified", add_to_date(now_datetime(), seconds=-60), update_modified=False
+		)
+
+		responses, _ = self.sync_all(token)
+		self.assertIn(late.name, {t.name for r in responses for t in r["tasks"]})
+
+	def test_delta_reports_removed_tasks(self):
+		token = get_sales_tasks(task_profiles="Sales")["sync_token"]
+
+		deleted, moved = self.tasks[0], self.tasks[1]
+		deleted.delete(ignore_permissions=True)
+		moved.task_profile = "Estimates"
+		moved.save(ignore_permissions=True)
+
+		response = get_sales_tasks(task_profiles="Sales", since=token)
+		self.assertIn(deleted.name, response["removed_tasks"])
+		self.assertIn(moved.name, response["removed_tasks"])
+		self.assertEqual(len(response["removed_tasks"]), len(set(response["removed_tasks"])))
+		self.assertNotIn(moved.name, {t.name for t in response["tasks"]})
+
+	def test_delta_batches_follow_has_more(self):
+		token = get_sales_tasks()["sync_token"]
+		for task in self.tasks:
+			task.remarks = "Batched"
+			task.save(ignore_permissions=True)
+
+		with patch.object(sales_tasks_api, "DELTA_BATCH_SIZE", 1):
+			responses, _ = self.sync_all(token)
+
+		self.assertTrue(responses[0]["has_more"])
+		self.assertTrue(all(len(r["tasks"]) <= 1 for r in responses))
+		synced = [t.name for r in responses for t in r["tasks"]]
+		self.assertTrue({task.name for task in self.tasks} <= set(synced))
+		self.assertEqual(len(synced), len(set(synced)))
+
+	def get_page(self, **kwargs):
+		filters = {"company": self.company.name, **kwargs.pop("filters", {})}
+		return get_sales_tasks(task_profiles="Sales", filters=filters, **kwargs)
+
+	def test_pages_cover_filtered_tasks_in_order(self):
+		names, start = [], 0
+		while True:
+			page = self.get_page(sort_by="start_date", sort_order="asc", start=start, page_length=2)
+			self.assertEqual(page["total"], 3)
+			names.extend(task.name for task in page["tasks"])
+			start += 2
+			if start >= page["total"]:
+				break
+
+		self.assertEqual(names, [task.name for task in self.tasks])
+
+		page = self.get_page(sort_by="start_date", sort_order="desc", page_length=10)
+		self.assertEqual([task.name for task in page["tasks"]], [task.name for task in reversed(self.tasks)])
+
+	def test_page_filters(self):
+		self.tasks[0].status = "Completed"
+		self.tasks[0].save(ignore_permissions=True)
+		frappe.db.after_commit.run()
+
+		page = self.get_page(filters={"status": "Completed"}, page_length=10)
+		self.assertEqual([task.name for task in page["tasks"]], [self.tasks[0].name])
+		self.assertEqual(page["total"], 1)
+
+		page = self.get_page(filters={"status": ["Scheduled", "Pending"]}, page_length=10)
+		self.assertEqual(page["total"], 2)
+
+		page = self.get_page(filters={"date_from": add_days(nowdate(), 1)}, page_length=10)
+		self.assertEqual({task.name for task in page["tasks"]}, {task.name for task in self.tasks[1:]})
+
+		# Facets list every status of the view, whatever the active filters
+		page = self.get_page(filters={"status": "Completed"}, page_length=10)
+		statuses = {option["value"] for option in page["filter_options"]["statuses"]}
+		self.assertTrue({"Completed", "Scheduled"} <= statuses)
+
+	def test_page_rejects_unknown_sort(self):
+		self.assertRaises(frappe.ValidationError, self.get_page, sort_by="remarks", page_length=10)
+
+	def test_facets_refresh_after_task_writes_commit(self):
+		def types():
+			page = self.get_page(page_length=10)
+			return {option["value"] for option in page["filter_options"]["types"]}
+
+		frappe.db.after_commit.run()
+		self.assertNotIn("Facet Check", types())
+
+		self.make_task(type="Facet Check")
+		# Cached counts stay until the write commits and bumps the facet version
+		self.assertNotIn("Facet Check", types())
+		frappe.db.after_commit.run()
+		self.assertIn("Facet Check", types())
@@ -0,0 +1,251 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_crm.api import global_search as global_search_api
+from nirmaan_crm.api.global_search import global_search, global_search_doctype
+from nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index import bump_search_version
+from nirmaan_crm.tests.utils import count_queries
+from nirmaan_crm.utils.queries import lookup_list, search_branches, search_list
+from nirmaan_crm.utils.schema import has_column
+
+BRANCHES = [
+	{
+		"doctype": "CRM Contacts",
+		"search_fields": ["first_name", "last_name", "email", "mobile"],
+		"filters": {},
+		"fields": ["name", "first_name", "last_name", "email", "mobile"],
+	},
+	{
+		"doctype": "CRM Company",
+		"search_fields": ["company_name", "company_nick", "company_city"],
+		"filters": {},
+		"fields": ["name", "company_name", "company_city"],
+	},
+	{
+		"doctype": "CRM BOQ",
+		"search_fields": ["name", "boq_name", "boq_type", "city", "boq_status"],
+		"filters": {},
+		"fields": ["name", "boq_name", "boq_status"],
+	},
+]
+
+
+class TestGlobalSearch(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		for i in range(3):
+			company = frappe.get_doc(
+				{"doctype": "CRM Company", "company_name": f"Unionsearch Company {i}", "company_city": "Pune"}
+			).insert(ignore_permissions=True)
+			frappe.get_doc(
+				{
+					"doctype": "CRM BOQ",
+					"boq_name": f"Unionsearch BOQ {i}",
+					"company": company.name,
+					"city": "Pune",
+				}
+			).insert(ignore_permissions=True)
+
+	def test_branches_run_as_one_statement(self):
+		with count_queries() as queries:
+			rows_by_doctype = search_branches(BRANCHES, "unionsearch", limit=2)
+
+		self.assertEqual(len([q for q in queries if q and "UNION ALL" in q]), 1)
+		self.assertEqual(list(rows_by_doctype), ["CRM Contacts", "CRM Company", "CRM BOQ"])
+
+		for branch in BRANCHES:
+			expected = search_list(
+				branch["doctype"],
+				branch["search_fields"],
+				"unionsearch",
+				fields=branch["fields"],
+				order_by="modified desc, name desc",
+				limit=2,
+			)
+			self.assertEqual(
+				[row.name for row in rows_by_doctype[branch["doctype"]]], [row.name for row in expected]
+			)
+
+	def test_doctype_pages_cover_all_matches(self):
+		names, cursor, first_page = [], None, None
+		while True:
+			page = global_search_doctype(
+				"unionsearch", "CRM BOQ", "Nirmaan Admin User Profile", cursor=cursor, page_size=2
+			)
+			first_page = first_page or page
+			names.extend(row["name"] for row in page["results"])
+			cursor = page["next_cursor"]
+			if not cursor:
+				break
+
+		self.assertEqual(first_page["total_estimate"], 3)
+		self.assertTrue(first_page["total_is_exact"])
+		self.assertEqual(len(names), 3)
+		self.assertEqual(len(set(names)), 3)
+
+	def test_doctype_outside_role_returns_nothing(self):
+		email = "search.estimations@crm.test"
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": "Search Estimations",
+				"email": email,
+				"nirmaan_role_name": "Nirmaan Estimations User Profile",
+			}
+		).insert(ignore_permissions=True)
+		frappe.local.request_cache.clear()
+		frappe.set_user(email)
+
+		# The role comes from the session user, not from the client's user_role
+		page = global_search_doctype("unionsearch", "CRM Company", "Nirmaan Admin User Profile")
+		self.assertEqual(page["results"], [])
+
+	def test_contact_lookup_on_normalized_columns(self):
+		contact = frappe.get_doc(
+			{
+				"doctype": "CRM Contacts",
+				"first_name": "Lookup",
+				"last_name": "Contact",
+				"mobile": "+91 98450-77123",
+				"email": " Lookup.Contact@Acme-Test.IN",
+			}
+		).insert(ignore_permissions=True)
+		self.assertEqual(contact.mobile_normalized, "9845077123")
+		self.assertEqual(contact.email_normalized, "lookup.contact@acme-test.in")
+
+		def lookup(field, value, suffix=False):
+			return [row.name for row in lookup_list("CRM Contacts", field, value, suffix=suffix)]
+
+		self.assertIn(contact.name, lookup("mobile_normalized", "77123", suffix=True))
+		self.assertIn(contact.name, lookup("email_normalized", "lookup.contact@acme-test.in"))
+		self.assertIn(contact.name, lookup("email_normalized", "@acme-test.in", suffix=True))
+		self.assertNotIn(contact.name, lookup("mobile_normalized", "98450", suffix=True))
+
+	def make_sales_user(self, email):
+		"""Sales user that can log in, with one company assigned to them."""
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": email.split("@")[0],
+				"email": email,
+				"nirmaan_role_name": "Nirmaan Sales User Profile",
+			}
+		).insert(ignore_permissions=True)
+		frappe.get_doc(
+			{
+				"doctype": "User",
+				"email": email,
+				"first_name": email.split("@")[0],
+				"send_welcome_email": 0,
+				"role_profile_name": "Nirmaan Sales User Profile",
+				"roles": [{"role": "Nirmaan Sales User"}],
+			}
+		).insert(ignore_permissions=True)
+		frappe.local.request_cache.clear()
+		return frappe.get_doc(
+			{
+				"doctype": "CRM Company",
+				"company_name": f"Cachesearch {email.split('@')[0]}",
+				"company_city": "Pune",
+				"assigned_sales": email,
+			}
+		).insert(ignore_permissions=True)
+
+	def test_repeated_search_is_served_from_cache(self):
+		first = global_search("unionsearch")
+		self.assertTrue(first)
+
+		with count_queries() as queries:
+			second = global_search("Unionsearch ")
+
+		self.assertEqual(second, first)
+		self.assertEqual(queries, [])
+
+	def test_company_save_invalidates_cached_results(self):
+		global_search("unionsearch")
+
+		company = frappe.get_doc("CRM Company", {"company_name": "Unionsearch Company 0"})
+		company.company_name = "Unionsearch Renamed"
+		company.save(ignore_permissions=True)
+		# The search version is bumped once the write commits
+		frappe.db.after_commit.run()
+
+		titles = [result["title"] for result in global_search("unionsearch") if result["name"] == company.name]
+		self.assertEqual(len(titles), 1)
+		self.assertIn("Renamed", titles[0])
+
+	def test_cached_results_are_per_user(self):
+		first_company = self.make_sales_user("cache.sales1@crm.test")
+		second_company = self.make_sales_user("cache.sales2@crm.test")
+
+		frappe.set_user("cache.sales1@crm.test")
+		self.assertEqual([r["name"] for r in global_search("cachesearch")], [first_company.name])
+
+		# Same role and term: the second user must not get the first user's cached results
+		frappe.set_user("cache.sales2@crm.test")
+		self.assertEqual([r["name"] for r in global_search("cachesearch")], [second_company.name])
+
+	def test_fuzzy_matches_are_appended_once(self):
+		exact, similar = (
+			frappe.get_doc(
+				{
+					"doctype": "CRM Contacts",
+					"first_name": "Fuzzysearch",
+					"last_name": last_name,
+					"email": f"fuzzysearch.{last_name.lower()}@crm.test",
+				}
+			).insert(ignore_permissions=True)
+			for last_name in ("Srivastava", "Shrivastava")
+		)
+
+		results = global_search("srivastava")
+		self.assertIn(exact.name, [r["name"] for r in results])
+		self.assertNotIn(similar.name, [r["name"] for r in results])
+
+		results = global_search("srivastava", fuzzy=1)
+		names = [r["name"] for r in results]
+		self.assertEqual(names.count(exact.name), 1)
+		self.assertEqual(names.count(similar.name), 1)
+		# Fuzzy matches follow the regular ones and are flagged
+		self.assertGreater(names.index(similar.name), names.index(exact.name))
+		self.assertEqual(results[names.index(similar.name)].get("fuzzy"), 1)
+		self.assertIsNone(results[names.index(exact.name)].get("fuzzy"))
+
+	def test_index_search_is_limited_to_the_sales_users_rows(self):
+		if frappe.db.db_type != "postgres":
+			self.skipTest("The CRM Search Index query targets Postgres")
+		own_company = self.make_sales_user("index.sales1@crm.test")
+		self.make_sales_user("index.sales2@crm.test")
+
+		frappe.set_user("index.sales1@crm.test")
+		with patch.object(global_search_api, "search_branches", side_effect=AssertionError("index path not used")):
+			results = global_search("cachesearch")
+
+		self.assertEqual([r["name"] for r in results], [own_company.name])
+
+	def test_missing_index_table_falls_back_to_branches(self):
+		if frappe.db.db_type != "postgres":
+			self.skipTest("The CRM Search Index query targets Postgres")
+		# Memoized before the table goes away, so the index query itself fails
+		self.assertTrue(has_column("CRM Search Index", "search_vector"))
+		bump_search_version()
+
+		frappe.db.savepoint("missing_search_index")
+		try:
+			frappe.db.sql('ALTER TABLE "tabCRM Search Index" RENAME TO "tabCRM Search Index Gone"')
+			with patch.object(global_search_api, "search_branches", wraps=search_branches) as branches:
+				results = global_search("unionsearch")
+			branches.assert_called_once()
+			# Rolled back to the search's savepoint, not aborted: the transaction is still usable
+			self.assertTrue(frappe.db.exists("CRM Company", {"company_name": "Unionsearch Company 0"}))
+		finally:
+			frappe.db.rollback(save_point="missing_search_index")
+
+		doctypes = [r["doctype"] for r in results]
+		self.assertEqual(doctypes.count("CRM Company"), 3)
+		self.assertEqual(doctypes.count("CRM BOQ"), 3)
@@ -0,0 +1,115 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_crm.patches.v0_0.add_filter_indexes import FILTER_INDEXES
+
+
+class TestQueryPlans(FrappeTestCase):
+	"""The hot endpoint filters are served by the add_filter_indexes composite indexes (Postgres)."""
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		if frappe.db.db_type != "postgres":
+			return
+
+		# Same definitions as the patch, created in the test transaction (DDL is
+		# transactional on Postgres) so they roll back with it; the patch commits
+		for doctype, indexes in FILTER_INDEXES.items():
+			for index_name, fields in indexes.items():
+				if all(frappe.db.has_column(doctype, field) for field in fields):
+					columns = ", ".join(f"`{field}`" for field in fields)
+					frappe.db.sql(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON `tab{doctype}` ({columns})')
+
+	def setUp(self):
+		if frappe.db.db_type != "postgres":
+			self.skipTest("Query plan checks target Postgres")
+		frappe.set_user("Administrator")
+
+	def get_index_columns(self, index_name):
+		return [
+			row[0]
+			for row in frappe.db.sql(
+				"""
+				SELECT a.attname
+				FROM pg_index x
+				JOIN pg_class i ON i.oid = x.indexrelid
+				JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = ANY(x.indkey)
+				WHERE i.relname = %s
+				ORDER BY array_position(x.indkey::int2[], a.attnum)
+				""",
+				index_name,
+			)
+		]
+
+	def get_other_indexes(self, doctype, index_name):
+		"""Indexes of the table that could compete with `index_name` (not backing a constraint)."""
+		return [
+			row[0]
+			for row in frappe.db.sql(
+				"""
+				SELECT i.relname
+				FROM pg_index x
+				JOIN pg_class i ON i.oid = x.indexrelid
+				JOIN pg_class t ON t.oid = x.indrelid
+				WHERE t.relname = %s AND i.relname != %s
+					AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+				""",
+				(f"tab{doctype}", index_name),
+			)
+		]
+
+	def assertUsesIndex(self, doctype, filters, index_name):
+		# Definition: equality columns first, the range column last
+		self.assertEqual(self.get_index_columns(index_name), FILTER_INDEXES[doctype][index_name])
+
+		# Usable for the filter: with sequential scans and every other candidate index
+		# out of the way the planner's choice no longer depends on table size or statistics
+		query = frappe.get_list(doctype, filters=filters, fields=["name"], order_by="", limit=0, run=0)
+		frappe.db.savepoint("query_plan")
+		try:
+			for other_index in self.get_other_indexes(doctype, index_name):
+				frappe.db.sql(f'DROP INDEX "{other_index}"')
+			frappe.db.sql("SET LOCAL enable_seqscan = off")
+			plan = "\n".join(row[0] for row in frappe.db.sql(f"EXPLAIN {query}"))
+		finally:
+			frappe.db.rollback(save_point="query_plan")
+
+		self.assertIn(index_name, plan, plan)
+		self.assertIn("Index Cond", plan, plan)
+
+	def test_company_meetings(self):
+		# CRM Company Activity / last meeting lookups
+		self.assertUsesIndex(
+			"CRM Task",
+			[
+				["company", "=", "PLAN-COMPANY-00007"],
+				["type", "=", "In Person Meeting"],
+				["status", "=", "Completed"],
+				["start_date", "<=", "2026-06-30"],
+			],
+			"crm_task_company_type_status_date",
+		)
+
+	def test_sales_performance_meetings(self):
+		self.assertUsesIndex(
+			"CRM Task",
+			[
+				["assigned_sales", "=", "plan-sales7@nirmaan.test"],
+				["type", "=", "In Person Meeting"],
+				["status", "=", "Completed"],
+				["start_date", ">=", "2026-03-01"],
+				["start_date", "<=", "2026-03-31"],
+			],
+			"crm_task_sales_type_status_date",
+		)
+
+	def test_active_boqs_of_company(self):
+		self.assertUsesIndex(
+			"CRM BOQ",
+			[["company", "=", "PLAN-COMPANY-00007"], ["boq_status", "not in", ["Won", "Lost", "Dropped"]]],
+			"crm_boq_company_status",
+		)
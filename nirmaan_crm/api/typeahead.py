@@ -0,0 +1,110 @@
+# nirmaan_crm/api/typeahead.py
+# Prefix autocomplete for the command menu, served from a per-worker in-memory index
+
+import frappe
+
+from nirmaan_crm.api.global_search import get_search_role, global_search
+from nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index import get_result_path, get_title
+from nirmaan_crm.utils.prefix_index import ALL_PARTITION, PrefixIndex
+
+# Redis key holding the current index version; bumped on CRM Company / CRM Contacts writes
+TYPEAHEAD_VERSION_KEY = "crm_typeahead_version"
+
+TYPEAHEAD_SOURCES = {
+    "CRM Company": {
+        "fields": ["name", "company_name", "company_nick", "company_city", "assigned_sales"],
+    },
+    "CRM Contacts": {
+        "fields": ["name", "first_name", "last_name", "email", "mobile", "assigned_sales"],
+    },
+}
+
+# site -> (version, PrefixIndex, {(doctype, name): title}); one per worker process
+_indexes = {}
+
+
+@frappe.whitelist(allow_guest=False)
+def typeahead(prefix="", user_role="", limit=10):
+    """
+    Prefix matches on company names/nicks and contact names/emails, in the
+    global_search result format.
+
+    Admins search every record; Sales users only records assigned to them. The
+    role comes from the session user (see get_search_role); user_role is ignored.
+    The index is built lazily per worker and rebuilt when the version in redis changes.
+    Falls back to global_search when the prefix index has no match (or the role
+    has no typeahead scope).
+    """
+    if not prefix or len(prefix.strip()) < 2:
+        return []
+
+    limit = min(max(frappe.utils.cint(limit), 1), 50)
+    user_role = get_search_role(frappe.session.user)
+    if user_role == "Nirmaan Admin User Profile":
+        partition = ALL_PARTITION
+    elif user_role == "Nirmaan Sales User Profile":
+        partition = frappe.session.user
+    else:
+        return global_search(prefix, user_role)
+
+    index, titles = _get_prefix_index()
+    matches = index.search(prefix, partition, limit=limit)
+    if not matches:
+        return global_search(prefix, user_role)
+
+    return [
+        {
+            "doctype": doctype,
+            "name": name,
+            "title": titles[(doctype, name)],
+            "path": get_result_path(doctype, name),
+        }
+        for doctype, name in matches
+    ]
+
+
+def bump_typeahead_version(doc=None, method=None, *args):
+    """
+    CRM Company / CRM Contacts on_update, after_delete, after_rename: workers rebuild lazily.
+    The version changes after the commit; bumped earlier, a worker could rebuild from the
+    not yet committed data and keep that index under the new version.
+    """
+    frappe.db.after_commit.add(_set_typeahead_version)
+
+
+def _set_typeahead_version():
+    frappe.cache().set_value(TYPEAHEAD_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def _get_prefix_index():
+    version = frappe.cache().get_value(TYPEAHEAD_VERSION_KEY)
+    if version is None:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(TYPEAHEAD_VERSION_KEY, version)
+
+    cached = _indexes.get(frappe.local.site)
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+
+    index, titles = _build_prefix_index()
+    _indexes[frappe.local.site] = (version, index, titles)
+    return index, titles
+
+
+def _build_prefix_index():
+    index = PrefixIndex()
+    titles = {}
+    for doctype, source in TYPEAHEAD_SOURCES.items():
+        for row in frappe.get_all(doctype, fields=source["fields"]):
+            item = (doctype, row.name)
+            titles[item] = get_title(doctype, row)
+            for text in _get_prefix_texts(doctype, row):
+                index.add(text, item, partitions=[row.get("assigned_sales")])
+    return index.build(), titles
+
+
+def _get_prefix_texts(doctype, row):
+    if doctype == "CRM Company":
+        return [row.company_name, row.company_nick]
+    # Full name, so "ravi ku" matches as well as "kumar"
+    return [f"{row.first_name or ''} {row.last_name or ''}".strip(), row.email]
@@ -1,7 +1,9 @@
 
 
 import frappe
-from frappe.utils import nowdate, add_days
+from frappe.utils import nowdate, add_days, getdate
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity import get_company_activity
 
 @frappe.whitelist()
 def get_company_exception_report():
@@ -9,8 +11,8 @@ def get_company_exception_report():
     Generates a report based on assigned_sales in CRM Company:
     1. Gets all active Sales Users (CRM Users).
     2. Gets all CRM Companies assigned to these users.
-    3. Fetches completed tasks (last 7 days) and pending/scheduled tasks (next 14 days)
-       using two separate, targeted database queries.
+    3. Reads each company's last completed meeting (last 7 days) and next
+       pending/scheduled meeting (next 14 days) from the CRM Company Activity summary.
     4. Groups the final report by Sales User.
     """
     
@@ -58,45 +60,29 @@ def get_company_exception_report():
     if not assigned_companies:
         return []
 
-    # --- 4. Get Relevant Tasks (Split Query: Past vs. Upcoming) ---
-
-    # 4a. Query for Last Meeting (Completed, Last 7 Days)
-    past_tasks = frappe.get_list(
-        "CRM Task",
-        filters=[
-            ["type", "=", "In Person Meeting"],
-            ["status", "=", "Completed"],
-            ["start_date", ">=", date_7_days_ago],
-            ["start_date", "<=", today], # Only up to today
-            ["company", "in", company_names] 
-        ],
-        fields=["company", "start_date", "status"],
-        limit=0,
-    )
-
-    # 4b. Query for Next Meeting (Pending/Scheduled, From Today to Next 14 Days)
-    upcoming_tasks = frappe.get_list(
-        "CRM Task",
-        filters=[
-            ["type", "=", "In Person Meeting"],
-            ["status", "in", ["Pending", "Scheduled"]],
-            ["start_date", ">=", today], # From today onwards
-            ["start_date", "<=", date_14_days_ahead],
-            ["company", "in", company_names] 
-        ],
-        fields=["company", "start_date", "status"],
-        limit=0
-    )
-    
-    # print(f"5. Total Past Tasks Fetched: {len(past_tasks)}")
-    # print(f"5. Total Upcoming Tasks Fetched: {len(upcoming_tasks)}")
-
+    # --- 4. Get Meeting Activity per Company (CRM Company Activity summary) ---
+    activity_by_company = get_company_activity(company_names)
 
     # --- 5. Process and Group the Report Data ---
+    # Windows are applied on the summarised dates: last completed meeting within
+    # the past 7 days, next pending/scheduled meeting within the next 14 days.
+    today_date = getdate(today)
+    last_meeting_by_company = {}
+    next_meeting_by_company = {}
+    for company_name, activity in activity_by_company.items():
+        last_completed = activity.last_completed_meeting_date
+        if last_completed and getdate(date_7_days_ago) <= getdate(last_completed) <= today_date:
+            last_meeting_by_company[company_name] = frappe._dict(start_date=getdate(last_completed))
+
+        next_scheduled = activity.next_scheduled_meeting_date
+        if next_scheduled and today_date <= getdate(next_scheduled) <= getdate(date_14_days_ahead):
+            next_meeting_by_company[company_name] = frappe._dict(start_date=getdate(next_scheduled))
+
     grouped_report_data = {} 
+    assigned_emails = {c.assigned_sales for c in assigned_companies}
     
     for email, full_name in user_map.items():
-        if email in [c.assigned_sales for c in assigned_companies]:
+        if email in assigned_emails:
              grouped_report_data[email] = {
                 "user_full_name": full_name,
                 "companies": []
@@ -112,48 +98,11 @@ def get_company_exception_report():
         if assigned_email not in grouped_report_data:
              continue 
 
-        # Filter pre-queried tasks relevant to this specific Company
-        company_past_tasks = [t for t in past_tasks if t.company == company_doc_name]
-        company_upcoming_tasks = [t for t in upcoming_tasks if t.company == company_doc_name]
-        
-        # print(f"\n--- DEBUG: PROCESSING COMPANY: {company_display_name} (Assigned to: {user_map.get(assigned_email, assigned_email)}) ---")
-        
-        # --- DEBUG PRINT ---
-        all_company_tasks = company_past_tasks + company_upcoming_tasks
-        if all_company_tasks:
-            # print(f"6. Tasks for Company '{company_doc_name}' ({len(all_company_tasks)} found):")
-            for t in all_company_tasks:
-                # Use strftime for clean printing
-                formatted_date = t.start_date.strftime("%Y-%m-%d")
-                # print(f"   - [Status: {t.status}, Date: {formatted_date}]")
-        else:
-            print(f"6. Tasks for Company '{company_doc_name}' (0 found).")
-        # -------------------
-        
         # --- Last Meeting Check (Past 7 days, Completed) ---
-        last_meeting = None
-        completed_tasks = company_past_tasks # Already filtered by date and status in query 4a.
-        
-        if completed_tasks:
-            # Sort using the date object
-            completed_tasks.sort(key=lambda x: x.start_date, reverse=True)
-            last_meeting = completed_tasks[0]
-            # print(f"7. Last Meeting Found: YES on {last_meeting.start_date}")
-        else:
-            print("7. Last Meeting Found: NO")
-            
+        last_meeting = last_meeting_by_company.get(company_doc_name)
+
         # --- Next Meeting Check (Next 14 days, Pending/Scheduled) ---
-        next_meeting = None
-        upcoming_tasks_filtered = company_upcoming_tasks # Already filtered by date and status in query 4b.
-        
-        if upcoming_tasks_filtered:
-            # Sort using the date object
-            upcoming_tasks_filtered.sort(key=lambda x: x.start_date, reverse=False)
-            next_meeting = upcoming_tasks_filtered[0]
-            # print(f"8. Next Meeting Found: YES on {next_meeting.start_date}")
-        else:
-            print("8. Next Meeting Found: NO")
-            
+        next_meeting = next_meeting_by_company.get(company_doc_name)
         
         # --- Assemble Company Row ---
         company_row = {
@@ -1,14 +1,66 @@
 import frappe
-from frappe.utils import nowdate, getdate, add_days
+from frappe.utils import nowdate, getdate, add_days, cint, date_diff, get_datetime, get_last_day
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_sales_daily_rollup.crm_sales_daily_rollup import (
+    compute_daily_sales_counts,
+    get_sales_rollups,
+)
+from nirmaan_crm.nirmaan_crm.permissions import get_policy_user_field
+from nirmaan_crm.utils.encoding import is_columnar, to_columnar
+
+# --- Fields to fetch for CRM Task ---
+COMMON_TASK_FIELDS = [
+    "name", "task_profile", "status", "type", "start_date",
+    "company", "company.company_name","company.priority","company.last_meeting",
+    "contact", "contact.first_name", "contact.last_name",
+    "boq", "remarks"
+]
+
+# --- Fields to fetch for CRM Company (TAC) ---
+COMMON_COMPANY_FIELDS = ["name", "company_name", "priority", "last_meeting","assigned_sales", "creation"]
+
+# --- Fields to fetch for CRM BOQ ---
+COMMON_BOQ_FIELDS = [
+    "name", "boq_name", "creation", "company", "boq_status",
+]
+
+GRANULARITIES = ("day", "week", "month")
+
+METRICS = ("IPM", "UMC", "TAC", "BOQR")
+
+# Doctypes counted by CRM Sales Daily Rollup
+ROLLUP_SOURCE_DOCTYPES = ("CRM Task", "CRM BOQ", "CRM Company")
+
+MAX_DETAIL_PAGE_LENGTH = 200
 
 @frappe.whitelist(allow_guest=False)
-def get_sales_performance_metrics():
+def get_sales_performance_metrics(date_from=None, date_to=None, granularity=None, include_details=0, summary_only=0, format=None):
     """
     Fetches sales performance metrics for sales users with 'Nirmaan Sales User Profile' role.
     Includes:
     - IPM (In Person Meeting) & UMC (Unique Company Meetings) lists for 3 periods.
     - BOQR (BOQ Received) lists for 3 periods.
     - TAC (Total Assigned Companies - Cumulative CREATED) lists for 3 periods.
+
+    Each source table (CRM Task, CRM Company, CRM BOQ) is queried once for all
+    sales users over the widest date range; rows are then bucketed into
+    (user, period) in memory, so the query count does not depend on team size.
+
+    Custom ranges: when date_from/date_to are given, counts are answered from the
+    CRM Sales Daily Rollup table instead (computed live, over the records the
+    session user may read, when a permission policy restricts them), split by
+    `granularity` (day/week/month, or a single bucket when omitted):
+        [{"user_name", "full_name", "email",
+          "periods": [{"date_from", "date_to", "IPM", "UMC", "TAC", "BOQR"}, ...]}]
+    Detail rows are only fetched (per period, under "details") when
+    include_details is set.
+
+    summary_only: Returns the default three-period report with counts instead of
+    row lists (e.g. "IPM_this_week": 4). Rows for one cell are then loaded on
+    demand through get_sales_performance_details.
+
+    format: 'columnar' encodes each row list as {"fields", "rows", "dictionaries"}
+    (see nirmaan_crm.utils.encoding).
     """
     try:
         print("--- Starting get_sales_performance_metrics ---")
@@ -24,7 +76,10 @@ def get_sales_performance_metrics():
             print("No sales users with 'Nirmaan Sales User Profile' found.")
             return {"message": []} 
 
-        performance_data = []
+        if date_from or date_to:
+            return _encode_metric_lists(
+                _get_rollup_metrics(sales_users, date_from, date_to, granularity, cint(include_details)), format
+            )
 
         # Define date ranges
         today = getdate(nowdate())
@@ -35,257 +90,410 @@ def get_sales_performance_metrics():
         last_30_days_start = add_days(today, -29)
         last_30_days_end = today
 
-        print(f"TodayFCD: {today} -{last_30_days_end}")
-        
-        this_week_date_from_str = this_week_start
-        this_week_date_to_str = this_week_end
-        last_week_date_from_str = last_week_start
-        last_week_date_to_str = last_week_end
-        last_30_days_date_from_str = last_30_days_start
-        last_30_days_date_to_str = last_30_days_end
-
         print(f"Today: {today}")
         print(f"This Week: {this_week_start} to {this_week_end}")
         print(f"Last Week: {last_week_start} to {last_week_end}")
         print(f"Last 30 Days: {last_30_days_start} to {last_30_days_end}")
 
-        # Helper function to add date_from/date_to to each item dictionary
-        # Modifying to accept optional date_from (for TAC)
-        def add_date_range_to_items(items, date_from, date_to):
-            modified_items = []
-            for item in items:
-                modified_item = item.copy() 
-                if date_from: # Only add date_from if provided
-                    modified_item["date_from"] = date_from
-                modified_item["date_to"] = date_to
-                modified_items.append(modified_item)
-            return modified_items
-
-        for user in sales_users:
-            user_name = user.name
-            user_full_name = user.full_name
-            user_email = user.email
-            print(f"\nProcessing sales user: {user_full_name} ({user_name}), Email: {user_email}")
-
-            user_metrics = {
-                "user_name": user_name,
-                "full_name": user_full_name,
-                "email": user_email,
-                "IPM_this_week": [],
-                "IPM_last_week": [],
-                "IPM_last_30_days": [],
-                "UMC_this_week": [],    # Unique Meeting Tasks per Company
-                "UMC_last_week": [],    # Unique Meeting Tasks per Company
-                "UMC_last_30_days": [], # Unique Meeting Tasks per Company
-                # --- NEW TAC METRICS ---
-                "TAC_this_week": [],    # Total Assigned Companies CREATED up to end of this week (Active/Non-Hold)
-                "TAC_last_week": [],    # Total Assigned Companies CREATED up to end of last week (Active/Non-Hold)
-                "TAC_last_30_days": [], # Total Assigned Companies CREATED up to end of last 30 days (Active/Non-Hold)
-                # --- END NEW TAC METRICS ---
-                "BOQR_this_week": [],
-                "BOQR_last_week": [],
-                "BOQR_last_30_days": [],
-            }
-
-            # --- Fields to fetch for CRM Task ---
-            common_task_fields = [
-                "name", "task_profile", "status", "type", "start_date",
-                "company", "company.company_name","company.priority","company.last_meeting",
-                "contact", "contact.first_name", "contact.last_name",
-                "boq", "remarks"
+        # (suffix, date_from, date_to) for every reported period
+        periods = [
+            ("this_week", this_week_start, this_week_end),
+            ("last_week", last_week_start, last_week_end),
+            ("last_30_days", last_30_days_start, last_30_days_end),
+        ]
+        user_emails = [user.email for user in sales_users]
+
+        if cint(summary_only):
+            # Permission-filtered like get_sales_performance_details, so counts match the drill-downs
+            counts = compute_daily_sales_counts(
+                min(p[1] for p in periods), max(p[2] for p in periods), user_emails, apply_permissions=True
+            )
+            performance_data = [
+                _build_user_metrics(user, _summarise_counts(counts, user.email, periods))
+                for user in sales_users
             ]
+            print("--- Finished summarising all sales users ---")
+            return performance_data
 
-            # --- IPM and UMC: This Week (Now Unique Per Company) ---
-            this_week_meetings_raw = frappe.get_list(
-                "CRM Task",
-                filters=[
-                    ["status", "=", "Completed"],
-                    ["start_date", ">=", this_week_start],
-                    ["start_date", "<=", this_week_end],
-                    ["type", "=", "In Person Meeting"],
-                    ["assigned_sales", "=", user_email],
-                    ["company", "is", "set"] # Filter by assigned_sales & ensure Company is linked
-                ],
-                order_by="start_date desc",
-                fields=common_task_fields,
+        performance_data = [
+            _build_user_metrics(user, metrics)
+            for user, metrics in zip(
+                sales_users, _get_metrics_by_user(user_emails, periods)
             )
-            # IPM retains both date_from and date_to
-            user_metrics["IPM_this_week"] = add_date_range_to_items(this_week_meetings_raw, this_week_date_from_str, this_week_date_to_str)
-            
-            # Prepare Unique Meeting Tasks (UMC) for this week - UNIQUE PER COMPANY
-            unique_companies_this_week = set()
-            umc_tasks_this_week = []
-            for meeting in user_metrics["IPM_this_week"]:
-                company_id = meeting.get("company")
-                if company_id and company_id not in unique_companies_this_week:
-                    unique_companies_this_week.add(company_id)
-                    umc_tasks_this_week.append(meeting)
-            user_metrics["UMC_this_week"] = umc_tasks_this_week
-
-            print(f"  This Week In Person Meetings: {len(this_week_meetings_raw)} (UMC - Unique Company: {len(user_metrics['UMC_this_week'])})")
-
-            # --- IPM and UMC: Last Week (Now Unique Per Company) ---
-            last_week_meetings_raw = frappe.get_list(
-                "CRM Task",
-                filters=[
-                    ["status", "=", "Completed"],
-                    ["start_date", ">=", last_week_start],
-                    ["start_date", "<=", last_week_end],
-                    ["type", "=", "In Person Meeting"],
-                    ["assigned_sales", "=", user_email],
-                    ["company", "is", "set"]
-                ],
-                order_by="start_date desc",
-                fields=common_task_fields,
+        ]
+
+        print("--- Finished processing all sales users ---")
+        return _encode_metric_lists(performance_data, format)
+    
+    except Exception as e:
+        print(f"An error occurred in get_sales_performance_metrics: {e}")
+        frappe.throw(f"An unexpected error occurred: {e}")
+
+
+@frappe.whitelist(allow_guest=False)
+def get_sales_performance_details(
+    email, metric, date_from=None, date_to=None, start=0, page_length=20, format=None
+):
+    """
+    Drill-down for one (user, metric, period) cell of the performance report.
+
+    Args:
+        email: Sales user email (assigned_sales)
+        metric: IPM, UMC, TAC or BOQR
+        date_from: Period start (ignored for TAC, which is cumulative)
+        date_to: Period end
+        start, page_length: Offset pagination
+        format: 'columnar' encodes "rows" with to_columnar
+
+    Returns:
+        {"rows": [...], "total": n, "start": start, "page_length": page_length}
+        Rows have the same fields (including date_from/date_to) as the full report.
+    """
+    if metric not in METRICS:
+        frappe.throw(f"metric must be one of: {', '.join(METRICS)}.")
+    if not email or not date_to or (metric != "TAC" and not date_from):
+        frappe.throw("email, date_to and (except for TAC) date_from are required.")
+
+    start = max(cint(start), 0)
+    page_length = min(max(cint(page_length), 1), MAX_DETAIL_PAGE_LENGTH)
+    date_to = getdate(date_to)
+    date_from = getdate(date_from) if date_from and metric != "TAC" else None
+    day_after = add_days(date_to, 1)
+
+    if metric in ("IPM", "UMC"):
+        filters = [
+            ["status", "=", "Completed"],
+            ["start_date", ">=", date_from],
+            ["start_date", "<=", date_to],
+            ["type", "=", "In Person Meeting"],
+            ["assigned_sales", "=", email],
+            ["company", "is", "set"],
+        ]
+        if metric == "IPM":
+            rows = frappe.get_list(
+                "CRM Task", filters=filters, fields=COMMON_TASK_FIELDS, order_by="start_date desc",
+                limit_start=start, limit_page_length=page_length,
             )
-            # IPM retains both date_from and date_to
-            user_metrics["IPM_last_week"] = add_date_range_to_items(last_week_meetings_raw, last_week_date_from_str, last_week_date_to_str)
-            
-            unique_companies_last_week = set()
-            umc_tasks_last_week = []
-            for meeting in user_metrics["IPM_last_week"]:
-                company_id = meeting.get("company")
-                if company_id and company_id not in unique_companies_last_week:
-                    unique_companies_last_week.add(company_id)
-                    umc_tasks_last_week.append(meeting)
-            user_metrics["UMC_last_week"] = umc_tasks_last_week
-            
-            print(f"  Last Week In Person Meetings: {len(last_week_meetings_raw)} (UMC - Unique Company: {len(user_metrics['UMC_last_week'])})")
-
-            # --- IPM and UMC: Last 30 Days (Now Unique Per Company) ---
-            last_30_days_meetings_raw = frappe.get_list(
-                "CRM Task",
-                filters=[
-                    ["status", "=", "Completed"],
-                    ["start_date", ">=", last_30_days_start],
-                    ["start_date", "<=", last_30_days_end],
-                    ["type", "=", "In Person Meeting"],
-                    ["assigned_sales", "=", user_email],
-                    ["company", "is", "set"]
-                ],
-                order_by="start_date desc",
-                fields=common_task_fields,
+            total = _count_rows("CRM Task", filters)
+        else:
+            # One (latest) meeting per company, as in the report
+            meetings = frappe.get_list(
+                "CRM Task", filters=filters, fields=COMMON_TASK_FIELDS, order_by="start_date desc", limit=0,
             )
-            # IPM retains both date_from and date_to
-            user_metrics["IPM_last_30_days"] = add_date_range_to_items(last_30_days_meetings_raw, last_30_days_date_from_str, last_30_days_date_to_str)
-            
-            unique_companies_last_30_days = set()
-            umc_tasks_last_30_days = []
-            for meeting in user_metrics["IPM_last_30_days"]:
-                company_id = meeting.get("company")
-                if company_id and company_id not in unique_companies_last_30_days:
-                    unique_companies_last_30_days.add(company_id)
-                    umc_tasks_last_30_days.append(meeting)
-            user_metrics["UMC_last_30_days"] = umc_tasks_last_30_days
-            
-            print(f"  Last 30 Days In Person Meetings: {len(last_30_days_meetings_raw)} (UMC - Unique Company: {len(user_metrics['UMC_last_30_days'])})")
+            seen = set()
+            unique_meetings = []
+            for meeting in meetings:
+                if meeting.company not in seen:
+                    seen.add(meeting.company)
+                    unique_meetings.append(meeting)
+            rows = unique_meetings[start : start + page_length]
+            total = len(unique_meetings)
+    elif metric == "TAC":
+        filters = [
+            ["assigned_sales", "=", email],
+            ["priority", "not in", ["Hold", ""]],
+            ["creation", "<=", day_after],
+        ]
+        rows = frappe.get_list(
+            "CRM Company", filters=filters, fields=COMMON_COMPANY_FIELDS, order_by="creation desc",
+            limit_start=start, limit_page_length=page_length,
+        )
+        total = _count_rows("CRM Company", filters)
+    else:
+        filters = [
+            ["creation", ">=", date_from],
+            ["creation", "<=", day_after],
+            ["assigned_sales", "=", email],
+        ]
+        rows = frappe.get_list(
+            "CRM BOQ", filters=filters, fields=COMMON_BOQ_FIELDS, order_by="creation desc",
+            limit_start=start, limit_page_length=page_length,
+        )
+        total = _count_rows("CRM BOQ", filters)
+
+    rows = _add_date_range_to_items(rows, date_from, date_to)
+    return {
+        "rows": to_columnar(rows) if is_columnar(format) else rows,
+        "total": total,
+        "start": start,
+        "page_length": page_length,
+    }
+
+
+def _count_rows(doctype, filters):
+    return frappe.get_list(doctype, filters=filters, fields=["count(name) as total"])[0].total
+
+
+def _summarise_counts(counts, email, periods):
+    """Folds per-day counts into IPM/UMC/TAC/BOQR counts for each period."""
+    metrics = {}
+    for suffix, date_from, date_to in periods:
+        meetings, boqs, met_companies = 0, 0, set()
+        for day_offset in range(date_diff(date_to, date_from) + 1):
+            day_counts = counts[(email, add_days(date_from, day_offset))]
+            meetings += day_counts["in_person_meetings"]
+            boqs += day_counts["boqs_received"]
+            met_companies.update(day_counts["met_companies"])
+
+        metrics[f"IPM_{suffix}"] = meetings
+        metrics[f"UMC_{suffix}"] = len(met_companies)
+        # TAC is cumulative up to the period end
+        metrics[f"TAC_{suffix}"] = counts[(email, date_to)]["assigned_companies"]
+        metrics[f"BOQR_{suffix}"] = boqs
+    return _order_metric_keys(metrics, periods)
+
+
+def _get_rollup_metrics(sales_users, date_from, date_to, granularity, include_details):
+    """Answers arbitrary ranges from the daily counts (see _get_daily_rows)."""
+    if not date_from or not date_to:
+        frappe.throw("Both date_from and date_to are required.")
+    date_from, date_to = getdate(date_from), getdate(date_to)
+    if date_from > date_to:
+        frappe.throw("date_from must be on or before date_to.")
+    if granularity and granularity not in GRANULARITIES:
+        frappe.throw(f"granularity must be one of: {', '.join(GRANULARITIES)}.")
+
+    buckets = _split_range(date_from, date_to, granularity)
+    user_emails = [user.email for user in sales_users]
+
+    rollups_by_user = {}
+    for row in _get_daily_rows(user_emails, date_from, date_to):
+        rollups_by_user.setdefault(row.sales_user, []).append(row)
+
+    details_by_user = None
+    if include_details:
+        detail_periods = [(str(index), bucket_from, bucket_to) for index, (bucket_from, bucket_to) in enumerate(buckets)]
+        details_by_user = _get_metrics_by_user(user_emails, detail_periods)
+
+    result = []
+    for user_index, user in enumerate(sales_users):
+        rows = rollups_by_user.get(user.email, [])
+        row_index = 0
+        assigned_companies = 0
+        periods = []
+        for bucket_index, (bucket_from, bucket_to) in enumerate(buckets):
+            meetings, boqs, met_companies = 0, 0, set()
+            # Rows are ordered by date and buckets are contiguous, so walk them once
+            while row_index < len(rows) and getdate(rows[row_index].date) <= bucket_to:
+                row = rows[row_index]
+                meetings += row.in_person_meetings
+                boqs += row.boqs_received
+                met_companies.update(row.met_companies)
+                # TAC is cumulative: keep the latest value up to the bucket end
+                assigned_companies = row.assigned_companies
+                row_index += 1
+
+            period = {
+                "date_from": bucket_from,
+                "date_to": bucket_to,
+                "IPM": meetings,
+                "UMC": len(met_companies),
+                "TAC": assigned_companies,
+                "BOQR": boqs,
+            }
+            if details_by_user is not None:
+                period["details"] = {
+                    metric: details_by_user[user_index][f"{metric}_{bucket_index}"]
+                    for metric in METRICS
+                }
+            periods.append(period)
 
+        result.append(_build_user_metrics(user, {"periods": periods}))
+    return result
 
-            # =========================================================
-            #             *** NEW TAC (CUMULATIVE) METRICS ***
-            # =========================================================
-            common_company_fields = ["name", "company_name", "priority", "last_meeting","assigned_sales", "creation"] 
-            
-            # Helper for fetching TAC (Cumulative Active Assigned Companies up to end_date)
-            def fetch_cumulative_tac(end_date):
-                next_day_start = add_days(getdate(end_date), 1) 
-
-                companies = frappe.get_list(
-                    "CRM Company",
-                    filters=[
-                        ["assigned_sales", "=", user_email],
-                        ["priority", "not in", ["Hold",""]], # Active/Non-Hold
-                        # Only filter by <= end_date for cumulative total
-                        ["creation", "<=", next_day_start], 
-                    ],
-                    fields=common_company_fields,
-                    order_by="creation desc"
-                )
-                return companies
-
-            # 1. TAC: This Week (Cumulative up to Sunday)
-            this_week_tac_raw = fetch_cumulative_tac(this_week_end)
-            # date_from is passed as None/Falsy so it is skipped by add_date_range_to_items
-            user_metrics["TAC_this_week"] = add_date_range_to_items(this_week_tac_raw, None, this_week_date_to_str) 
-            print(f"  TAC This Week (Cumulative): {len(this_week_tac_raw)} documents")
-
-            # 2. TAC: Last Week (Cumulative up to previous Sunday)
-            last_week_tac_raw = fetch_cumulative_tac(last_week_end)
-            # date_from is passed as None/Falsy so it is skipped by add_date_range_to_items
-            user_metrics["TAC_last_week"] = add_date_range_to_items(last_week_tac_raw, None, last_week_date_to_str)
-            print(f"  TAC Last Week (Cumulative): {len(last_week_tac_raw)} documents")
-
-            # 3. TAC: Last 30 Days (Cumulative up to Today)
-            last_30_days_tac_raw = fetch_cumulative_tac(last_30_days_end)
-            # date_from is passed as None/Falsy so it is skipped by add_date_range_to_items
-            user_metrics["TAC_last_30_days"] = add_date_range_to_items(last_30_days_tac_raw, None, last_30_days_date_to_str)
-            print(f"  TAC Last 30 Days (Cumulative): {len(last_30_days_tac_raw)} documents - {last_30_days_end}")
-            # =========================================================
-            #                  *** END NEW TAC METRICS ***
-            # =========================================================
-
-            # --- Fields to fetch for CRM BOQ ---
-            common_boq_fields = [
-                "name", "boq_name", "creation", "company", "boq_status",
-            ]
 
-            # BOQR: This Week
-            this_week_boq_end_limit = add_days(this_week_end, 1)
-
-            this_week_boqs = frappe.get_list(
-                "CRM BOQ",
-                filters=[
-                    ["creation", ">=", this_week_start],
-                    ["creation", "<=", this_week_boq_end_limit],
-                    ["assigned_sales", "=", user_email]
-                ],
-                order_by="creation desc",
-                fields=common_boq_fields,
+def _get_daily_rows(user_emails, date_from, date_to):
+    """
+    Per (user, day) count rows ordered by date. The rollups count every record, so
+    they only answer for readers no CRM Permission Policy restricts on the source
+    doctypes; anyone else gets the same rows computed live over the records they
+    may read, like the summary_only counts and the drill-downs.
+    """
+    if all(get_policy_user_field(doctype) is None for doctype in ROLLUP_SOURCE_DOCTYPES):
+        return get_sales_rollups(user_emails, date_from, date_to)
+
+    counts = compute_daily_sales_counts(date_from, date_to, user_emails, apply_permissions=True)
+    # Keys are generated day by day, so the rows are already ordered by date
+    return [frappe._dict(row, sales_user=user, date=day) for (user, day), row in counts.items()]
+
+
+def _split_range(date_from, date_to, granularity):
+    """Splits [date_from, date_to] into contiguous (start, end) buckets, clipped to the range."""
+    if not granularity:
+        return [(date_from, date_to)]
+
+    buckets = []
+    bucket_start = date_from
+    while bucket_start <= date_to:
+        if granularity == "day":
+            bucket_end = bucket_start
+        elif granularity == "week":
+            # Weeks run Monday to Sunday, as in the default report
+            bucket_end = add_days(bucket_start, 6 - bucket_start.weekday())
+        else:
+            bucket_end = getdate(get_last_day(bucket_start))
+        bucket_end = min(bucket_end, date_to)
+        buckets.append((bucket_start, bucket_end))
+        bucket_start = add_days(bucket_end, 1)
+    return buckets
+
+
+def _encode_metric_lists(performance_data, format):
+    """With format=columnar, encodes every row list (per metric, and per period details) with to_columnar."""
+    if not is_columnar(format):
+        return performance_data
+
+    for user_metrics in performance_data:
+        for key, value in user_metrics.items():
+            if key != "periods" and isinstance(value, list):
+                user_metrics[key] = to_columnar(value)
+        for period in user_metrics.get("periods", []):
+            details = period.get("details") or {}
+            for metric, rows in details.items():
+                details[metric] = to_columnar(rows)
+    return performance_data
+
+
+def _build_user_metrics(user, metrics):
+    user_metrics = {
+        "user_name": user.name,
+        "full_name": user.full_name,
+        "email": user.email,
+    }
+    user_metrics.update(metrics)
+    return user_metrics
+
+
+def _get_metrics_by_user(user_emails, periods):
+    """
+    Returns one metrics dict per email in `user_emails` (same order), with keys
+    IPM_/UMC_/TAC_/BOQR_<period> for every period in `periods`.
+
+    Fetches each source table once for all users across the widest range, then
+    buckets rows into (user, period).
+    """
+    range_start = min(date_from for _, date_from, _ in periods)
+    range_end = max(date_to for _, _, date_to in periods)
+
+    # --- IPM: completed In Person Meetings for all users in one query ---
+    meetings = frappe.get_list(
+        "CRM Task",
+        filters=[
+            ["status", "=", "Completed"],
+            ["start_date", ">=", range_start],
+            ["start_date", "<=", range_end],
+            ["type", "=", "In Person Meeting"],
+            ["assigned_sales", "in", user_emails],
+            ["company", "is", "set"] # Filter by assigned_sales & ensure Company is linked
+        ],
+        order_by="start_date desc",
+        fields=COMMON_TASK_FIELDS + ["assigned_sales"],
+        limit=0,
+    )
+
+    # --- TAC: Cumulative Active Assigned Companies created up to the latest period end ---
+    companies = frappe.get_list(
+        "CRM Company",
+        filters=[
+            ["assigned_sales", "in", user_emails],
+            ["priority", "not in", ["Hold",""]], # Active/Non-Hold
+            ["creation", "<=", add_days(getdate(range_end), 1)],
+        ],
+        fields=COMMON_COMPANY_FIELDS,
+        order_by="creation desc",
+        limit=0,
+    )
+
+    # --- BOQR: BOQs received across the widest range ---
+    boqs = frappe.get_list(
+        "CRM BOQ",
+        filters=[
+            ["creation", ">=", range_start],
+            ["creation", "<=", add_days(getdate(range_end), 1)],
+            ["assigned_sales", "in", user_emails]
+        ],
+        order_by="creation desc",
+        fields=COMMON_BOQ_FIELDS + ["assigned_sales"],
+        limit=0,
+    )
+
+    # The assigned_sales helper column is only needed for bucketing
+    meetings_by_user = _pop_group_by(meetings, "assigned_sales")
+    boqs_by_user = _pop_group_by(boqs, "assigned_sales", keep=False)
+    companies_by_user = _pop_group_by(companies, "assigned_sales", keep=True)
+
+    metrics_by_user = []
+    for email in user_emails:
+        user_meetings = meetings_by_user.get(email, [])
+        user_companies = companies_by_user.get(email, [])
+        user_boqs = boqs_by_user.get(email, [])
+
+        metrics = {}
+        for suffix, date_from, date_to in periods:
+            date_from_dt = get_datetime(date_from)
+            # Dates are compared against the start of the day after date_to, as in the original per-period filters
+            date_to_limit = get_datetime(add_days(getdate(date_to), 1))
+
+            # IPM retains both date_from and date_to
+            ipm = _add_date_range_to_items(
+                [m for m in user_meetings if date_from <= m.start_date <= date_to], date_from, date_to
             )
-            # BOQR retains both date_from and date_to
-            user_metrics["BOQR_this_week"] = add_date_range_to_items(this_week_boqs, this_week_date_from_str, this_week_date_to_str)
-            print(f"  This Week BOQ Received: {len(this_week_boqs)} documents")
-
-            # BOQR: Last Week
-            last_week_boq_end_limit = add_days(last_week_end, 1)
-            last_week_boqs = frappe.get_list(
-                "CRM BOQ",
-                filters=[
-                    ["creation", ">=", last_week_start],
-                    ["creation", "<=", last_week_boq_end_limit],
-                    ["assigned_sales", "=", user_email]
-                ],
-                order_by="creation desc",
-                fields=common_boq_fields,
+            metrics[f"IPM_{suffix}"] = ipm
+
+            # Unique Meeting Tasks (UMC) - UNIQUE PER COMPANY, derived in the same pass
+            unique_companies = set()
+            umc = []
+            for meeting in ipm:
+                company_id = meeting.get("company")
+                if company_id and company_id not in unique_companies:
+                    unique_companies.add(company_id)
+                    umc.append(meeting)
+            metrics[f"UMC_{suffix}"] = umc
+
+            # TAC: date_from is passed as None/Falsy so it is skipped
+            metrics[f"TAC_{suffix}"] = _add_date_range_to_items(
+                [c for c in user_companies if c.creation <= date_to_limit], None, date_to
             )
+
             # BOQR retains both date_from and date_to
-            user_metrics["BOQR_last_week"] = add_date_range_to_items(last_week_boqs, last_week_date_from_str, last_week_date_to_str)
-            print(f"  Last Week BOQ Received: {len(last_week_boqs)} documents")
-
-            # BOQR: Last 30 Days
-            last_30_days_boq_end_limit = add_days(last_30_days_end, 1)
-            last_30_days_boqs = frappe.get_list(
-                "CRM BOQ",
-                filters=[
-                    ["creation", ">=", last_30_days_start],
-                    ["creation", "<=", last_30_days_boq_end_limit],
-                    ["assigned_sales", "=", user_email]
-                ],
-                order_by="creation desc",
-                fields=common_boq_fields,
+            metrics[f"BOQR_{suffix}"] = _add_date_range_to_items(
+                [b for b in user_boqs if date_from_dt <= b.creation <= date_to_limit], date_from, date_to
             )
-            # BOQR retains both date_from and date_to
-            user_metrics["BOQR_last_30_days"] = add_date_range_to_items(last_30_days_boqs, last_30_days_date_from_str, last_30_days_date_to_str)
-            print(f"  Last 30 Days BOQ Received: {len(last_30_days_boqs)} documents")
-
-            performance_data.append(user_metrics)
 
-        print("--- Finished processing all sales users ---")
-        return performance_data
-    
-    except Exception as e:
-        print(f"An error occurred in get_sales_performance_metrics: {e}")
-        frappe.throw(f"An unexpected error occurred: {e}")
+        metrics_by_user.append(_order_metric_keys(metrics, periods))
+    return metrics_by_user
+
+
+def _pop_group_by(rows, key, keep=False):
+    """Groups rows by `key` in one pass, removing `key` from each row unless `keep` is set."""
+    grouped = {}
+    for row in rows:
+        value = row.pop(key, None) if not keep else row.get(key)
+        if value:
+            grouped.setdefault(value, []).append(row)
+    return grouped
+
+
+def _order_metric_keys(metrics, periods):
+    """Keeps the IPM, UMC, TAC, BOQR key order of the original response."""
+    return {
+        f"{metric}_{suffix}": metrics[f"{metric}_{suffix}"]
+        for metric in METRICS
+        for suffix, _, _ in periods
+    }
+
+
+# Helper function to add date_from/date_to to each item dictionary
+# Modifying to accept optional date_from (for TAC)
+def _add_date_range_to_items(items, date_from, date_to):
+    modified_items = []
+    for item in items:
+        modified_item = item.copy() 
+        if date_from: # Only add date_from if provided
+            modified_item["date_from"] = date_from
+        modified_item["date_to"] = date_to
+        modified_items.append(modified_item)
+    return modified_items
 
 
 # # your_custom_app/your_custom_app/api/sales_reports.py
@@ -0,0 +1,103 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import nowdate
+
+from nirmaan_crm.api.users.get_sales_performance import (
+	get_sales_performance_details,
+	get_sales_performance_metrics,
+)
+from nirmaan_crm.tests.utils import count_queries
+
+
+class TestGetSalesPerformanceMetrics(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+
+	def make_sales_users(self, count, prefix):
+		for i in range(count):
+			email = f"{prefix.lower()}{i}@perf.test"
+			frappe.get_doc(
+				{
+					"doctype": "CRM Users",
+					"first_name": f"{prefix} {i}",
+					"email": email,
+					"nirmaan_role_name": "Nirmaan Sales User Profile",
+				}
+			).insert(ignore_permissions=True)
+			company = frappe.get_doc(
+				{
+					"doctype": "CRM Company",
+					"company_name": f"{prefix} Perf Company {i}",
+					"assigned_sales": email,
+					"priority": "Meet In 2 Weeks",
+				}
+			).insert(ignore_permissions=True)
+			for _ in range(2):
+				frappe.get_doc(
+					{
+						"doctype": "CRM Task",
+						"company": company.name,
+						"type": "In Person Meeting",
+						"status": "Completed",
+						"start_date": nowdate(),
+						"assigned_sales": email,
+					}
+				).insert(ignore_permissions=True)
+			frappe.get_doc(
+				{
+					"doctype": "CRM BOQ",
+					"boq_name": f"{prefix} Perf BOQ {i}",
+					"company": company.name,
+					"city": "Pune",
+					"assigned_sales": email,
+				}
+			).insert(ignore_permissions=True)
+
+	def test_query_count_is_independent_of_team_size(self):
+		self.make_sales_users(2, "Small")
+		with count_queries() as small_run:
+			small_result = get_sales_performance_metrics()
+
+		self.make_sales_users(8, "Large")
+		with count_queries() as large_run:
+			large_result = get_sales_performance_metrics()
+
+		self.assertGreater(len(large_result), len(small_result))
+		self.assertEqual(len(small_run), len(large_run))
+
+	def test_metrics_are_bucketed_per_user(self):
+		self.make_sales_users(1, "Bucket")
+		metrics = next(row for row in get_sales_performance_metrics() if row["email"] == "bucket0@perf.test")
+
+		self.assertEqual(len(metrics["IPM_last_30_days"]), 2)
+		self.assertEqual(len(metrics["UMC_last_30_days"]), 1)
+		self.assertEqual(len(metrics["TAC_last_30_days"]), 1)
+		self.assertEqual(len(metrics["BOQR_last_30_days"]), 1)
+		self.assertNotIn("date_from", metrics["TAC_last_30_days"][0])
+		self.assertNotIn("assigned_sales", metrics["IPM_last_30_days"][0])
+
+	def test_summary_counts_match_full_lists(self):
+		self.make_sales_users(1, "Summary")
+		full = next(row for row in get_sales_performance_metrics() if row["email"] == "summary0@perf.test")
+		summary = next(
+			row for row in get_sales_performance_metrics(summary_only=1) if row["email"] == "summary0@perf.test"
+		)
+
+		self.assertEqual(list(summary), list(full))
+		for key, value in full.items():
+			if isinstance(value, list):
+				self.assertEqual(summary[key], len(value), key)
+
+	def test_details_are_paginated_per_cell(self):
+		self.make_sales_users(1, "Details")
+		page = get_sales_performance_details(
+			"details0@perf.test", "IPM", date_from=nowdate(), date_to=nowdate(), page_length=1
+		)
+		self.assertEqual(page["total"], 2)
+		self.assertEqual(len(page["rows"]), 1)
+
+		umc = get_sales_performance_details("details0@perf.test", "UMC", date_from=nowdate(), date_to=nowdate())
+		self.assertEqual(umc["total"], 1)
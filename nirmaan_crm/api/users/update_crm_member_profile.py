@@ -1,5 +1,7 @@
 import frappe
 
+from nirmaan_crm.utils.roles import clear_role_profile_cache
+
 
 ALLOWED_ROLE_PROFILES = {
     "Nirmaan Sales User Profile",
@@ -66,6 +68,7 @@ def update_crm_member_profile(
         crm_user_doc.mobile_no = mobile_no
         crm_user_doc.nirmaan_role_name = role_profile_name
         crm_user_doc.save(ignore_permissions=True)
+        clear_role_profile_cache(crm_user_doc.name)
 
     return {
         "status": "success",
@@ -107,8 +107,8 @@ app_license = "mit"
 # }
 #
 permission_query_conditions = {
-    # "CRM Company": "nirmaan_crm.nirmaan_crm.permissions.get_company_permission_query_conditions",
-    # "CRM Contacts": "nirmaan_crm.nirmaan_crm.permissions.get_contact_permission_query_conditions",
+    "CRM Company": "nirmaan_crm.nirmaan_crm.permissions.get_company_permission_query_conditions",
+    "CRM Contacts": "nirmaan_crm.nirmaan_crm.permissions.get_contact_permission_query_conditions",
     "CRM Task": "nirmaan_crm.nirmaan_crm.permissions.get_task_permission_query_conditions",
     "CRM BOQ": "nirmaan_crm.nirmaan_crm.permissions.get_boq_permission_query_conditions",
 }
@@ -155,7 +155,62 @@ doc_events={
         # "on_trash": "nirmaan_crm.integrations.controllers.user_permission.on_trash"
     },
     "CRM Task": {
-		"on_update": "nirmaan_crm.integrations.controllers.last_meeting_on.on_meeting_update",
+		"on_update": [
+			"nirmaan_crm.integrations.controllers.last_meeting_on.on_meeting_update",
+			"nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity.on_task_change",
+			"nirmaan_crm.api.get_sales_tasks.clear_task_facets_cache",
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+		],
+		"after_delete": [
+			"nirmaan_crm.integrations.controllers.last_meeting_on.on_meeting_delete",
+			"nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity.on_task_change",
+			"nirmaan_crm.api.get_sales_tasks.clear_task_facets_cache",
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+		],
+		"after_rename": "nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_rename",
+  },
+    "CRM BOQ": {
+		"on_update": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity.on_boq_change",
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+		],
+		"after_delete": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity.on_boq_change",
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+		],
+		"after_rename": "nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_rename",
+  },
+    "CRM Company": {
+		"on_trash": "nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity.on_company_trash",
+		"on_update": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+			"nirmaan_crm.api.typeahead.bump_typeahead_version",
+		],
+		"after_delete": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+			"nirmaan_crm.api.typeahead.bump_typeahead_version",
+		],
+		"after_rename": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_rename",
+			"nirmaan_crm.api.typeahead.bump_typeahead_version",
+		],
+  },
+    "CRM Settings": {
+		"on_update": "nirmaan_crm.utils.settings.clear_crm_settings_cache",
+  },
+    "CRM Contacts": {
+		"on_update": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+			"nirmaan_crm.api.typeahead.bump_typeahead_version",
+		],
+		"after_delete": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_change",
+			"nirmaan_crm.api.typeahead.bump_typeahead_version",
+		],
+		"after_rename": [
+			"nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index.on_search_source_rename",
+			"nirmaan_crm.api.typeahead.bump_typeahead_version",
+		],
   }
 }
 
@@ -180,6 +235,18 @@ doc_events={
 # 	],
 # }
 
+scheduler_events = {
+	"hourly": [
+		"nirmaan_crm.nirmaan_crm.doctype.crm_sales_daily_rollup.crm_sales_daily_rollup.refresh_recent_sales_rollups",
+	],
+	"daily": [
+		"nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity.rebuild_company_activity",
+	],
+	"weekly": [
+		"nirmaan_crm.nirmaan_crm.doctype.crm_sales_daily_rollup.crm_sales_daily_rollup.backfill_sales_rollups",
+	],
+}
+
 # Testing
 # -------
 
@@ -1,42 +1,115 @@
 import frappe
-from frappe.model.document import Document
+from frappe.utils import getdate, now_datetime
+
+MEETING_TYPE = "In Person Meeting"
+
+# Task link field -> doctype whose last_meeting it maintains
+LAST_MEETING_TARGETS = {
+    "company": "CRM Company",
+    "contact": "CRM Contacts",
+}
+
 
 def on_meeting_update(doc, method):
     """
     This function is triggered by the 'on_update' hook for the CRM Task doctype.
-    If a task's status is changed to 'Completed', it updates the 'last_meeting'
-    date on the linked Contact and Company documents.
+    When a completed In Person Meeting appears, changes date or links, or stops
+    being completed, the 'last_meeting' date of the linked Contact and Company
+    is updated in a background job enqueued after the task's commit, so
+    completing a task does not wait on (or save) the linked documents.
     """
-    doc_before_save = doc.get_doc_before_save()
-    if not doc_before_save or doc.type != "In Person Meeting":
+    # New tasks (e.g. a meeting logged as completed) have no previous version
+    doc_before_save = doc.get_doc_before_save() or frappe._dict()
+
+    was_meeting = _is_completed_meeting(doc_before_save)
+    is_meeting = _is_completed_meeting(doc)
+    if not was_meeting and not is_meeting:
+        return
+
+    advance, recompute = [], []
+    for link_field, doctype in LAST_MEETING_TARGETS.items():
+        old_link, new_link = doc_before_save.get(link_field), doc.get(link_field)
+        old_date, new_date = doc_before_save.get("start_date"), doc.start_date
+
+        if is_meeting and new_link and new_date:
+            if was_meeting and old_link == new_link and getdate(old_date) > getdate(new_date):
+                # Rescheduled to an earlier date: this task may no longer be the latest
+                recompute.append((doctype, new_link))
+            else:
+                advance.append((doctype, new_link, str(getdate(new_date))))
+
+        if was_meeting and old_link and (not is_meeting or old_link != new_link):
+            # Completion reverted, or the meeting moved to another contact / company
+            recompute.append((doctype, old_link))
+
+    _enqueue_last_meeting_update(doc.name, advance, recompute)
+
+
+def on_meeting_delete(doc, method):
+    """after_delete of CRM Task: a deleted completed meeting no longer counts."""
+    if not _is_completed_meeting(doc):
+        return
+
+    recompute = [
+        (doctype, doc.get(link_field))
+        for link_field, doctype in LAST_MEETING_TARGETS.items()
+        if doc.get(link_field)
+    ]
+    _enqueue_last_meeting_update(doc.name, [], recompute)
+
+
+def update_last_meeting(advance=None, recompute=None):
+    """
+    Background job of on_meeting_update / on_meeting_delete.
+
+    Args:
+        advance: (doctype, name, date) - moves last_meeting forward to date, never back
+        recompute: (doctype, name) - resets last_meeting to the latest completed meeting
+    """
+    now = now_datetime()
+    for doctype, name, date in advance or []:
+        # Conditional single-row update (GREATEST semantics): no document load, save or hooks
+        frappe.db.sql(
+            f"""
+            UPDATE `tab{doctype}`
+            SET last_meeting = %(date)s, modified = %(now)s
+            WHERE name = %(name)s AND (last_meeting IS NULL OR last_meeting < %(date)s)
+            """,
+            {"date": date, "now": now, "name": name},
+        )
+
+    link_fields = {doctype: link_field for link_field, doctype in LAST_MEETING_TARGETS.items()}
+    for doctype, name in recompute or []:
+        # One statement, so a meeting completed concurrently cannot be lost between
+        # reading the latest date and writing it
+        frappe.db.sql(
+            f"""
+            UPDATE `tab{doctype}`
+            SET last_meeting = (
+                SELECT MAX(start_date)
+                FROM `tabCRM Task`
+                WHERE `{link_fields[doctype]}` = %(name)s AND type = %(type)s AND status = 'Completed'
+            ), modified = %(now)s
+            WHERE name = %(name)s
+            """,
+            {"name": name, "type": MEETING_TYPE, "now": now},
+        )
+
+
+def _is_completed_meeting(doc):
+    return doc.get("type") == MEETING_TYPE and doc.get("status") == "Completed"
+
+
+def _enqueue_last_meeting_update(task_name, advance, recompute):
+    if not advance and not recompute:
         return
 
-    if doc.status == "Completed" and doc_before_save.status != "Completed":
-        
-        # --- USE f-string print FOR DEBUGGING ---
-        print(f"--- Task Completed Hook ---")
-        print(f"Task '{doc.name}' status changed to Completed. Attempting to update last_meeting.")
-        if doc.company:
-            try:
-                company = frappe.get_doc("CRM Company", doc.company)
-                company.last_meeting = doc.start_date
-                company.save(ignore_permissions=True)
-                
-                print(f"Successfully updated last_meeting for Company '{company.name}'.")
-
-            except Exception:
-                # For production, it's better to log the full error
-                print(f"ERROR: Failed to update Company '{doc.company}' for Task '{doc.name}'.")
-                frappe.log_error(frappe.get_traceback(), "Task Completed Hook Error")
-
-        if doc.contact:
-            try:
-                contact = frappe.get_doc("CRM Contacts", doc.contact)
-                contact.last_meeting = doc.start_date
-                contact.save(ignore_permissions=True)
-                
-                print(f"Successfully updated last_meeting for Contact '{contact.name}'.")
-
-            except Exception:
-                print(f"ERROR: Failed to update Contact '{doc.contact}' for Task '{doc.name}'.")
-                frappe.log_error(frappe.get_traceback(), "Task Completed Hook Error")
\ No newline at end of file
+    print(f"--- Task Meeting Hook --- Task '{task_name}': advance {advance}, recompute {recompute}")
+    frappe.enqueue(
+        "nirmaan_crm.integrations.controllers.last_meeting_on.update_last_meeting",
+        queue="short",
+        enqueue_after_commit=True,
+        now=frappe.flags.in_test,
+        advance=advance,
+        recompute=recompute,
+    )
@@ -4,7 +4,29 @@
 import frappe
 import json
 from frappe.model.document import Document
-from frappe.utils import cint
+from frappe.utils import cint, now_datetime
+
+from nirmaan_crm.utils.roles import get_role_profile
+
+# Fields that decide which Project Estimation rows a BOQ has
+ESTIMATION_SYNC_FIELDS = ["boq_type", "create_bcs"]
+
+# Columns written by the bulk insert of CRMBOQ._sync_project_estimations
+PROJECT_ESTIMATION_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"title",
+	"parent_project",
+	"document_type",
+	"package_name",
+	"deadline",
+	"assigned_to",
+	"status",
+]
+
 
 class CRMBOQ(Document):
 	def validate(self):
@@ -21,8 +43,7 @@ class CRMBOQ(Document):
 		if user == "Administrator":
 			pass
 		else:
-			user_doc = frappe.get_doc("CRM Users", user)
-			role_profile = (user_doc.nirmaan_role_name or "").strip().lower()
+			role_profile = get_role_profile(user).strip().lower()
 			if role_profile in ["nirmaan sales user profile", "nirmaan sales user"]:
 				self.assigned_sales = self.owner
 			elif role_profile in [
@@ -35,48 +56,100 @@ class CRMBOQ(Document):
 				pass
 
 	def on_update(self):
-		packages = self._get_selected_packages()
-		
-		# Cleanup tasks for removed packages first
-		self._cleanup_removed_package_tasks(packages)
-
-		if not packages:
-			return
-
-		should_create_bcs = cint(getattr(self, "create_bcs", 0)) == 1
-
-		for package_name in packages:
-			# Route to the package's specific lead, if configured in CRM BOQ Package.
-			# If the package is custom (not found) or has no lead configured, it remains unassigned.
-			package_lead = frappe.db.get_value("CRM BOQ Package", package_name, "assigned_lead")
-			assigned_to = package_lead if package_lead else None
-
-			# BOQ estimation rows are always created for package-based projects.
-			self._create_project_estimation_if_missing(package_name, "BOQ", assigned_to)
+		# Remarks / status edits leave the estimations alone
+		if any(self.has_value_changed(field) for field in ESTIMATION_SYNC_FIELDS):
+			self._sync_project_estimations()
 
-			# BCS rows are created only when explicitly enabled from project create/edit flow.
-			if should_create_bcs:
-				self._create_project_estimation_if_missing(package_name, "BCS", assigned_to)
+		if self.has_value_changed("boq_submission_date"):
+			self._update_estimation_deadlines()
 
 	def on_trash(self):
 		"""Cleanup all associated tasks when the project is deleted."""
 		frappe.db.delete("CRM Project Estimation", {"parent_project": self.name})
 
-	def _cleanup_removed_package_tasks(self, current_packages):
-		"""Deletes all Project Estimation (BOQ/BCS) tasks for packages that are no longer selected."""
-		if self.is_new():
-			return
+	def _sync_project_estimations(self):
+		"""
+		Brings the Project Estimation (BOQ/BCS) rows in line with the selected packages:
+		one query for the existing rows and one for the package leads, then a single
+		bulk insert of the missing rows and a single delete of the rows whose package
+		is no longer selected.
+		"""
+		packages = self._get_selected_packages()
 
-		existing_tasks = frappe.get_all(
+		existing_rows = frappe.get_all(
 			"CRM Project Estimation",
 			filters={"parent_project": self.name},
-			fields=["name", "package_name"]
+			fields=["name", "package_name", "document_type"],
+		)
+		existing = {(row.package_name, row.document_type) for row in existing_rows}
+
+		removed = [row.name for row in existing_rows if row.package_name not in packages]
+		if removed:
+			frappe.db.delete("CRM Project Estimation", {"name": ["in", removed]})
+
+		# BOQ estimation rows are always created for package-based projects.
+		# BCS rows are created only when explicitly enabled from project create/edit flow.
+		document_types = ["BOQ", "BCS"] if cint(getattr(self, "create_bcs", 0)) == 1 else ["BOQ"]
+		missing = [
+			(package_name, document_type)
+			for package_name in packages
+			for document_type in document_types
+			if (package_name, document_type) not in existing
+		]
+		if missing:
+			self._insert_project_estimations(missing)
+
+	def _insert_project_estimations(self, missing):
+		# Route to the package's specific lead, if configured in CRM BOQ Package.
+		# If the package is custom (not found) or has no lead configured, it remains unassigned.
+		package_leads = dict(
+			frappe.get_all(
+				"CRM BOQ Package",
+				filters={"name": ["in", list({package_name for package_name, _ in missing})]},
+				fields=["name", "assigned_lead"],
+				as_list=True,
+			)
+		)
+
+		now = now_datetime()
+		user = frappe.session.user
+		values = []
+		for package_name, document_type in missing:
+			# CRM Project Estimation is named by its title
+			title = f"{self.name} - {package_name} {document_type}"
+			values.append(
+				(
+					title,
+					now,
+					now,
+					user,
+					user,
+					title,
+					self.name,
+					document_type,
+					package_name,
+					getattr(self, "boq_submission_date", None),
+					package_leads.get(package_name) or None,
+					"New",
+				)
+			)
+		frappe.db.bulk_insert("CRM Project Estimation", PROJECT_ESTIMATION_FIELDS, values)
+
+	def _update_estimation_deadlines(self):
+		"""Moves the deadline of existing estimations that still follow the BOQ submission date."""
+		doc_before_save = self.get_doc_before_save()
+		if not doc_before_save:
+			return
+
+		previous_date = doc_before_save.get("boq_submission_date")
+		# Estimations whose deadline was set on its own are left as they are
+		deadline_filter = ["is", "not set"] if not previous_date else ["=", previous_date]
+		frappe.db.set_value(
+			"CRM Project Estimation",
+			{"parent_project": self.name, "deadline": deadline_filter},
+			"deadline",
+			self.boq_submission_date,
 		)
-		
-		for task in existing_tasks:
-			# If the package_name of the task is not in the current selection, delete it
-			if task.package_name not in current_packages:
-				frappe.delete_doc("CRM Project Estimation", task.name, ignore_permissions=True)
 
 	def _get_selected_packages(self):
 		raw_packages = getattr(self, "boq_type", None)
@@ -103,44 +176,21 @@ class CRMBOQ(Document):
 
 		return normalized_packages
 
-	def _create_project_estimation_if_missing(self, package_name, document_type, assigned_to=None):
-		if frappe.db.exists(
-			"CRM Project Estimation",
-			{
-				"parent_project": self.name,
-				"document_type": document_type,
-				"package_name": package_name,
-			},
-		):
-			return
-
-		doc = frappe.get_doc(
-			{
-				"doctype": "CRM Project Estimation",
-				"title": f"{self.name} - {package_name} {document_type}",
-				"parent_project": self.name,
-				"document_type": document_type,
-				"package_name": package_name,
-				"deadline": getattr(self, "boq_submission_date", None),
-				"assigned_to": assigned_to,
-				"status": "New",
-			}
-		)
-		doc.insert(ignore_permissions=True)
-
 	def _lock_create_bcs_once_enabled(self):
-		if self.is_new():
+		if self.is_new() or cint(self.create_bcs) == 1:
 			return
 
-		existing_toggle_value = cint(
-			frappe.db.get_value(self.doctype, self.name, "create_bcs") or 0
-		)
-		has_existing_bcs_rows = bool(
-			frappe.db.exists(
-				"CRM Project Estimation",
-				{"parent_project": self.name, "document_type": "BCS"},
+		doc_before_save = self.get_doc_before_save()
+		if doc_before_save:
+			existing_toggle_value = cint(doc_before_save.get("create_bcs"))
+		else:
+			existing_toggle_value = cint(
+				frappe.db.get_value(self.doctype, self.name, "create_bcs") or 0
 			)
-		)
 
-		if existing_toggle_value == 1 or has_existing_bcs_rows:
+		# BCS rows can exist with the toggle off on older projects
+		if existing_toggle_value == 1 or frappe.db.exists(
+			"CRM Project Estimation",
+			{"parent_project": self.name, "document_type": "BCS"},
+		):
 			self.create_bcs = 1
@@ -1,9 +1,101 @@
 # Copyright (c) 2025, Abhishek Kumar and Contributors
 # See license.txt
 
-# import frappe
+import json
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from nirmaan_crm.tests.utils import count_queries
+
+PACKAGES = [f"Sync Package {i}" for i in range(10)]
+
 
 class TestCRMBOQ(FrappeTestCase):
-	pass
+	def setUp(self):
+		frappe.set_user("Administrator")
+		for package_name in PACKAGES[:3]:
+			if not frappe.db.exists("CRM BOQ Package", package_name):
+				frappe.get_doc({"doctype": "CRM BOQ Package", "package_name": package_name}).insert(
+					ignore_permissions=True
+				)
+
+	def get_estimations(self, boq):
+		return {
+			(row.package_name, row.document_type)
+			for row in frappe.get_all(
+				"CRM Project Estimation",
+				filters={"parent_project": boq.name},
+				fields=["package_name", "document_type"],
+			)
+		}
+
+	def test_estimations_follow_selected_packages(self):
+		boq = frappe.get_doc(
+			{
+				"doctype": "CRM BOQ",
+				"boq_name": "Estimation Sync BOQ",
+				"city": "Pune",
+				"boq_type": json.dumps(PACKAGES),
+				"create_bcs": 1,
+				"boq_submission_date": "2026-11-30",
+			}
+		).insert(ignore_permissions=True)
+
+		expected = {(package, document_type) for package in PACKAGES for document_type in ("BOQ", "BCS")}
+		self.assertEqual(self.get_estimations(boq), expected)
+		self.assertEqual(
+			frappe.db.get_value(
+				"CRM Project Estimation",
+				{"parent_project": boq.name, "package_name": PACKAGES[0], "document_type": "BOQ"},
+				["title", "deadline"],
+			),
+			(f"{boq.name} - {PACKAGES[0]} BOQ", frappe.utils.getdate("2026-11-30")),
+		)
+
+		boq.boq_type = json.dumps(PACKAGES[:4] + ["Sync Package New"])
+		with count_queries() as queries:
+			boq._sync_project_estimations()
+		self.assertLessEqual(len(queries), 4)
+
+		expected = {
+			(package, document_type)
+			for package in PACKAGES[:4] + ["Sync Package New"]
+			for document_type in ("BOQ", "BCS")
+		}
+		self.assertEqual(self.get_estimations(boq), expected)
+
+	def test_sync_skipped_when_packages_unchanged(self):
+		boq = frappe.get_doc(
+			{
+				"doctype": "CRM BOQ",
+				"boq_name": "Estimation Skip BOQ",
+				"city": "Pune",
+				"boq_type": json.dumps(PACKAGES[:2]),
+				"boq_submission_date": "2026-11-30",
+			}
+		).insert(ignore_permissions=True)
+
+		boq.remarks = "Client asked for a revised layout"
+		with count_queries() as queries:
+			boq.save(ignore_permissions=True)
+		self.assertFalse([query for query in queries if query and "Project Estimation" in query])
+
+		# A deadline changed on one estimation is kept; the others follow the BOQ
+		custom = frappe.get_doc(
+			"CRM Project Estimation", {"parent_project": boq.name, "package_name": PACKAGES[1]}
+		)
+		custom.db_set("deadline", "2026-12-15")
+
+		boq.boq_submission_date = "2026-12-05"
+		boq.save(ignore_permissions=True)
+		deadlines = dict(
+			frappe.get_all(
+				"CRM Project Estimation",
+				filters={"parent_project": boq.name},
+				fields=["package_name", "deadline"],
+				as_list=True,
+			)
+		)
+		self.assertEqual(str(deadlines[PACKAGES[0]]), "2026-12-05")
+		self.assertEqual(str(deadlines[PACKAGES[1]]), "2026-12-15")
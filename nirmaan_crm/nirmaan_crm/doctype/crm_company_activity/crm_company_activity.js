@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Abhishek Kumar and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("CRM Company Activity", {
+// 	refresh(frm) {
+
+// 	},
+// });
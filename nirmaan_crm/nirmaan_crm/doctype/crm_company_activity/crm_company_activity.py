@@ -0,0 +1,389 @@
+# Copyright (c) 2026, Abhishek Kumar and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, getdate, now_datetime, nowdate
+
+from nirmaan_crm.nirmaan_crm.permissions import get_policy_user_field
+from nirmaan_crm.utils.grouping import group_rows_by
+from nirmaan_crm.utils.queries import get_top_rows_per_group
+
+BOQ_HOVER_FIELDS = [
+	"name",
+	"boq_name",
+	"boq_status",
+	"boq_sub_status",
+	"boq_value",
+	"boq_submission_date",
+	"remarks",
+	"creation",
+]
+
+# Stored on the BOQ / remark rows so get_company_activity can apply the reader's
+# CRM Permission Policy; stripped before the rows are returned
+ASSIGNMENT_FIELDS = ["assigned_sales", "assigned_estimations"]
+
+INACTIVE_BOQ_STATUSES = ["Won", "Lost", "Dropped"]
+
+MEETING_TYPE = "In Person Meeting"
+
+# Meeting fields added by get_company_activity for the reader (see get_company_meetings)
+EMPTY_MEETINGS = {
+	"next_meeting_date": None,
+	"next_meeting_id": None,
+	"next_scheduled_meeting_date": None,
+	"last_completed_meeting_date": None,
+}
+
+REBUILD_CHUNK_SIZE = 500
+
+
+class CRMCompanyActivity(Document):
+	"""
+	One row per CRM Company holding its derived task remarks / BOQ activity.
+	Maintained from CRM Task / CRM BOQ doc events and rebuilt nightly.
+	Rows cover every rep's records, so only System Manager / Nirmaan Admin User
+	may read the doctype; APIs read it through get_company_activity. Meeting
+	dates depend on the reader's task permissions and are not stored here.
+	"""
+
+	pass
+
+
+def build_company_activity(company_names):
+	"""
+	Computes activity summary rows for `company_names` with a fixed number of queries.
+
+	Returns:
+		dict: {company: row_dict} with one entry per company in `company_names`.
+	"""
+	company_names = list(company_names)
+	if not company_names:
+		return {}
+
+	today = nowdate()
+	thirty_days_ago = add_days(today, -30)
+	in_companies = ["company", "in", company_names]
+
+	completed_tasks = get_top_rows_per_group(
+		"CRM Task",
+		partition_by="company",
+		order_by="modified desc",
+		limit_per_group=3,
+		filters=[["status", "=", "Completed"], in_companies],
+		fields=["remarks", "modified", "assigned_sales"],
+		ignore_permissions=True,
+	)
+
+	active_boq_counts = frappe.get_all(
+		"CRM BOQ",
+		filters=[["boq_status", "not in", INACTIVE_BOQ_STATUSES], in_companies],
+		fields=["company", "count(name) as count"],
+		group_by="company",
+	)
+	hot_boq_counts = frappe.get_all(
+		"CRM BOQ",
+		filters=[["deal_status", "=", "Hot"], in_companies],
+		fields=["company", "count(name) as count"],
+		group_by="company",
+	)
+	active_boqs = get_top_rows_per_group(
+		"CRM BOQ",
+		partition_by="company",
+		order_by="modified desc",
+		limit_per_group=5,
+		filters=[["boq_status", "not in", INACTIVE_BOQ_STATUSES], in_companies],
+		fields=BOQ_HOVER_FIELDS + ASSIGNMENT_FIELDS,
+		ignore_permissions=True,
+	)
+	hot_boqs = get_top_rows_per_group(
+		"CRM BOQ",
+		partition_by="company",
+		order_by="modified desc",
+		limit_per_group=5,
+		filters=[["deal_status", "=", "Hot"], in_companies],
+		fields=BOQ_HOVER_FIELDS + ASSIGNMENT_FIELDS,
+		ignore_permissions=True,
+	)
+	recent_boqs = frappe.get_all(
+		"CRM BOQ",
+		filters=[["creation", ">=", thirty_days_ago], in_companies],
+		fields=BOQ_HOVER_FIELDS + ASSIGNMENT_FIELDS + ["company"],
+		order_by="modified desc",
+	)
+
+	active_count_by_company = {row.company: row.count for row in active_boq_counts}
+	hot_count_by_company = {row.company: row.count for row in hot_boq_counts}
+	completed_tasks_by_company = group_rows_by(completed_tasks, "company")
+	active_boqs_by_company = group_rows_by(active_boqs, "company")
+	hot_boqs_by_company = group_rows_by(hot_boqs, "company")
+	recent_boqs_by_company = group_rows_by(recent_boqs, "company")
+
+	def boq_rows(rows):
+		return [{field: row.get(field) for field in BOQ_HOVER_FIELDS + ASSIGNMENT_FIELDS} for row in rows]
+
+	activity = {}
+	for company in company_names:
+		activity[company] = {
+			"company": company,
+			"last_three_remarks": [
+				{
+					"remarks": task.remarks,
+					"modified": task.modified.strftime("%Y-%m-%d") if task.modified else None,
+					"assigned_sales": task.assigned_sales,
+				}
+				for task in completed_tasks_by_company.get(company, [])
+				if task.remarks
+			],
+			"active_boq_count": active_count_by_company.get(company, 0),
+			"hot_boq_count": hot_count_by_company.get(company, 0),
+			"active_boqs": boq_rows(active_boqs_by_company.get(company, [])),
+			"hot_boqs": boq_rows(hot_boqs_by_company.get(company, [])),
+			"recent_boqs": boq_rows(recent_boqs_by_company.get(company, [])),
+		}
+	return activity
+
+
+def refresh_company_activity(company_names):
+	"""Recomputes and replaces the summary rows of the given companies."""
+	company_names = {name for name in company_names if name}
+	if not company_names:
+		return
+
+	# Lock the companies (in name order, so concurrent refreshes cannot deadlock) so two
+	# refreshes of one company run one after the other instead of racing between the
+	# delete and the insert of its summary row
+	existing_companies = frappe.get_all(
+		"CRM Company",
+		filters={"name": ["in", list(company_names)]},
+		pluck="name",
+		order_by="name asc",
+		for_update=True,
+	)
+	activity = build_company_activity(existing_companies)
+
+	frappe.db.delete("CRM Company Activity", {"company": ["in", list(company_names)]})
+	if not activity:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"owner",
+		"modified_by",
+		"refreshed_on",
+		"company",
+		"last_three_remarks",
+		"active_boq_count",
+		"hot_boq_count",
+		"active_boqs",
+		"hot_boqs",
+		"recent_boqs",
+	]
+	values = []
+	for row in activity.values():
+		values.append(
+			(
+				row["company"],
+				now,
+				now,
+				user,
+				user,
+				now,
+				row["company"],
+				frappe.as_json(row["last_three_remarks"]),
+				row["active_boq_count"],
+				row["hot_boq_count"],
+				frappe.as_json(row["active_boqs"]),
+				frappe.as_json(row["hot_boqs"]),
+				frappe.as_json(row["recent_boqs"]),
+			)
+		)
+	frappe.db.bulk_insert("CRM Company Activity", fields, values)
+
+
+def get_company_activity(company_names, user=None):
+	"""
+	Returns {company: activity_row} for `company_names` from the summary table.
+	JSON columns are parsed; companies without a summary row yet are computed on the fly.
+	BOQ lists and task remarks are limited to the records `user` (default: session
+	user) may see under the CRM BOQ / CRM Task permission policies, and the meeting
+	fields come from get_company_meetings for that user.
+	"""
+	user = user or frappe.session.user
+	company_names = list(company_names)
+	if not company_names:
+		return {}
+
+	rows = frappe.get_all(
+		"CRM Company Activity",
+		filters={"company": ["in", company_names]},
+		fields=[
+			"company",
+			"last_three_remarks",
+			"active_boq_count",
+			"hot_boq_count",
+			"active_boqs",
+			"hot_boqs",
+			"recent_boqs",
+		],
+	)
+	activity = {}
+	for row in rows:
+		for field in ("last_three_remarks", "active_boqs", "hot_boqs", "recent_boqs"):
+			row[field] = frappe.parse_json(row[field] or "[]")
+		activity[row.company] = row
+
+	missing = [name for name in company_names if name not in activity]
+	if missing:
+		activity.update({name: frappe._dict(row) for name, row in build_company_activity(missing).items()})
+
+	boq_user_field = get_policy_user_field("CRM BOQ", user)
+	task_user_field = get_policy_user_field("CRM Task", user)
+	for row in activity.values():
+		for field in ("active_boqs", "hot_boqs", "recent_boqs"):
+			row[field] = _visible_rows(row[field], boq_user_field, user)
+		row["last_three_remarks"] = _visible_rows(row["last_three_remarks"], task_user_field, user)
+
+	meetings = get_company_meetings(company_names, user)
+	for company, row in activity.items():
+		row.update(meetings.get(company, EMPTY_MEETINGS))
+	return activity
+
+
+def get_company_meetings(company_names, user=None):
+	"""
+	Returns {company: {next_meeting_date, next_meeting_id, next_scheduled_meeting_date,
+	last_completed_meeting_date}} for the companies with meetings, in two queries.
+	Read through frappe.get_list, so only the meetings `user` may see count.
+	"""
+	company_names = list(company_names)
+	if not company_names:
+		return {}
+
+	today = nowdate()
+	in_companies = ["company", "in", company_names]
+	upcoming = frappe.get_list(
+		"CRM Task",
+		filters=get_upcoming_meeting_filters(today) + [in_companies],
+		fields=["name", "company", "start_date", "status"],
+		order_by="start_date asc, name asc",
+		limit=0,
+		user=user,
+	)
+	last_completed = frappe.get_list(
+		"CRM Task",
+		filters=[
+			["type", "=", MEETING_TYPE],
+			["status", "=", "Completed"],
+			["start_date", "<=", today],
+			in_companies,
+		],
+		fields=["company", "max(start_date) as start_date"],
+		group_by="company",
+		order_by="",
+		limit=0,
+		user=user,
+	)
+
+	meetings = {}
+	for row in upcoming:
+		company = meetings.setdefault(row.company, dict(EMPTY_MEETINGS))
+		if not company["next_meeting_id"]:
+			company["next_meeting_date"] = row.start_date
+			company["next_meeting_id"] = row.name
+		if row.status in ("Pending", "Scheduled") and not company["next_scheduled_meeting_date"]:
+			company["next_scheduled_meeting_date"] = row.start_date
+	for row in last_completed:
+		meetings.setdefault(row.company, dict(EMPTY_MEETINGS))["last_completed_meeting_date"] = row.start_date
+	return meetings
+
+
+def get_upcoming_meeting_filters(today=None):
+	"""Filters of the meetings that can be a company's next meeting."""
+	return [
+		["type", "=", MEETING_TYPE],
+		["status", "not in", ["Completed", "Incomplete"]],
+		["start_date", ">=", today or nowdate()],
+	]
+
+
+def _visible_rows(rows, user_field, user):
+	"""Rows whose `user_field` is `user` (all rows when no field applies), without the assignment columns."""
+	return [
+		{field: value for field, value in row.items() if field not in ASSIGNMENT_FIELDS}
+		for row in rows
+		if not user_field or row.get(user_field) == user
+	]
+
+
+def on_task_change(doc, method=None):
+	"""
+	CRM Task on_update / after_delete: refresh the summary of the linked company in
+	a background job after commit. Only completed tasks feed the summary (last
+	three remarks, by modified), so other task saves are skipped.
+	"""
+	doc_before_save = doc.get_doc_before_save() if method == "on_update" else None
+	versions = [doc] + ([doc_before_save] if doc_before_save else [])
+	if not any(version.get("status") == "Completed" for version in versions):
+		return
+	_enqueue_company_activity_refresh({version.get("company") for version in versions})
+
+
+def on_boq_change(doc, method=None):
+	"""
+	CRM BOQ on_update / after_delete: refresh the summary of the linked company in
+	a background job after commit, when the BOQ is (or was) in one of its lists.
+	"""
+	doc_before_save = doc.get_doc_before_save() if method == "on_update" else None
+	versions = [doc] + ([doc_before_save] if doc_before_save else [])
+	if not any(_is_summarised_boq(version) for version in versions):
+		return
+	_enqueue_company_activity_refresh({version.get("company") for version in versions})
+
+
+def _is_summarised_boq(doc):
+	"""Whether the BOQ counts towards, or is listed in, its company's summary row."""
+	return (
+		doc.get("boq_status") not in INACTIVE_BOQ_STATUSES
+		or doc.get("deal_status") == "Hot"
+		or getdate(doc.get("creation") or nowdate()) >= getdate(add_days(nowdate(), -30))
+	)
+
+
+def _enqueue_company_activity_refresh(company_names):
+	company_names = sorted(name for name in company_names if name)
+	if not company_names:
+		return
+
+	frappe.enqueue(
+		"nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity.refresh_company_activity",
+		queue="short",
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+		company_names=company_names,
+	)
+
+
+def on_company_trash(doc, method=None):
+	"""CRM Company on_trash: drop the summary row so it does not block the delete."""
+	frappe.db.delete("CRM Company Activity", {"company": doc.name})
+
+
+def rebuild_company_activity():
+	"""Daily scheduler job: rebuilds every summary row to repair drift and roll date windows."""
+	company_names = frappe.get_all("CRM Company", pluck="name", order_by="name asc")
+	for start in range(0, len(company_names), REBUILD_CHUNK_SIZE):
+		refresh_company_activity(company_names[start : start + REBUILD_CHUNK_SIZE])
+		frappe.db.commit()
+
+	# Drop rows of companies that no longer exist
+	if company_names:
+		frappe.db.delete("CRM Company Activity", {"company": ["not in", company_names]})
+	else:
+		frappe.db.delete("CRM Company Activity")
+	frappe.db.commit()
@@ -0,0 +1,140 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, nowdate
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity import (
+	get_company_activity,
+	rebuild_company_activity,
+)
+
+
+class TestCRMCompanyActivity(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.company = frappe.get_doc(
+			{"doctype": "CRM Company", "company_name": "Activity Test Company", "company_city": "Pune"}
+		).insert(ignore_permissions=True)
+
+	def get_activity(self):
+		return frappe.get_doc("CRM Company Activity", {"company": self.company.name})
+
+	def get_meetings(self, user="Administrator"):
+		return get_company_activity([self.company.name], user=user)[self.company.name]
+
+	def test_meetings_follow_task_events(self):
+		task = frappe.get_doc(
+			{
+				"doctype": "CRM Task",
+				"company": self.company.name,
+				"type": "In Person Meeting",
+				"status": "Scheduled",
+				"start_date": add_days(nowdate(), 3),
+			}
+		).insert(ignore_permissions=True)
+
+		activity = self.get_meetings()
+		self.assertEqual(activity.next_meeting_id, task.name)
+		self.assertEqual(getdate(activity.next_scheduled_meeting_date), getdate(add_days(nowdate(), 3)))
+
+		task.status = "Completed"
+		task.start_date = nowdate()
+		task.remarks = "Closed the meeting"
+		task.save(ignore_permissions=True)
+
+		activity = self.get_meetings()
+		self.assertIsNone(activity.next_meeting_id)
+		self.assertEqual(getdate(activity.last_completed_meeting_date), getdate(nowdate()))
+		self.assertEqual([r["remarks"] for r in self.get_activity().last_three_remarks], ["Closed the meeting"])
+
+		task.delete(ignore_permissions=True)
+		self.assertIsNone(self.get_meetings().last_completed_meeting_date)
+		self.assertEqual(self.get_activity().last_three_remarks, [])
+
+	def test_meetings_are_limited_to_the_readers_tasks(self):
+		email = "activity.meetings@crm.test"
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": "Activity Meetings",
+				"email": email,
+				"nirmaan_role_name": "Nirmaan Sales User Profile",
+			}
+		).insert(ignore_permissions=True)
+		frappe.local.request_cache.clear()
+		other_meeting = frappe.get_doc(
+			{
+				"doctype": "CRM Task",
+				"company": self.company.name,
+				"type": "In Person Meeting",
+				"status": "Scheduled",
+				"start_date": add_days(nowdate(), 1),
+				"assigned_sales": "other.sales@crm.test",
+			}
+		).insert(ignore_permissions=True)
+		own_meeting = frappe.get_doc(
+			{
+				"doctype": "CRM Task",
+				"company": self.company.name,
+				"type": "In Person Meeting",
+				"status": "Scheduled",
+				"start_date": add_days(nowdate(), 5),
+				"assigned_sales": email,
+			}
+		).insert(ignore_permissions=True)
+
+		self.assertEqual(self.get_meetings(user=email).next_meeting_id, own_meeting.name)
+		self.assertEqual(self.get_meetings().next_meeting_id, other_meeting.name)
+
+	def test_boq_events_update_counts(self):
+		frappe.get_doc(
+			{
+				"doctype": "CRM BOQ",
+				"boq_name": "Activity Test BOQ",
+				"company": self.company.name,
+				"city": "Pune",
+				"boq_status": "New",
+				"deal_status": "Hot",
+			}
+		).insert(ignore_permissions=True)
+
+		activity = self.get_activity()
+		self.assertEqual(activity.active_boq_count, 1)
+		self.assertEqual(activity.hot_boq_count, 1)
+
+	def test_rebuild_repairs_drift(self):
+		frappe.db.delete("CRM Company Activity", {"company": self.company.name})
+		rebuild_company_activity()
+		self.assertTrue(frappe.db.exists("CRM Company Activity", {"company": self.company.name}))
+
+	def test_boqs_are_limited_to_the_readers_policy(self):
+		email = "activity.sales@crm.test"
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": "Activity Sales",
+				"email": email,
+				"nirmaan_role_name": "Nirmaan Sales User Profile",
+			}
+		).insert(ignore_permissions=True)
+		frappe.local.request_cache.clear()
+		for boq_name, assigned_sales in (("Own BOQ", email), ("Other BOQ", "other.sales@crm.test")):
+			frappe.get_doc(
+				{
+					"doctype": "CRM BOQ",
+					"boq_name": boq_name,
+					"company": self.company.name,
+					"city": "Pune",
+					"boq_status": "New",
+					"assigned_sales": assigned_sales,
+				}
+			).insert(ignore_permissions=True)
+
+		activity = get_company_activity([self.company.name], user=email)[self.company.name]
+		self.assertEqual([boq["boq_name"] for boq in activity.active_boqs], ["Own BOQ"])
+		self.assertNotIn("assigned_sales", activity.active_boqs[0])
+
+		activity = get_company_activity([self.company.name], user="Administrator")[self.company.name]
+		self.assertEqual(len(activity.active_boqs), 2)
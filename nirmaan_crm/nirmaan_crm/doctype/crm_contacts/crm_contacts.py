@@ -4,6 +4,10 @@
 import frappe
 from frappe.model.document import Document
 
+from nirmaan_crm.utils.normalize import normalize_email, normalize_mobile
+from nirmaan_crm.utils.phonetic import phonetic_key
+from nirmaan_crm.utils.roles import get_role_profile
+
 
 class CRMContacts(Document):
 	def before_insert(self):
@@ -11,10 +15,15 @@ class CRMContacts(Document):
 		if user == "Administrator":
 			pass
 		else:
-			user_doc = frappe.get_doc("CRM Users", user)
-			role_profile = user_doc.nirmaan_role_name
+			role_profile = get_role_profile(user)
 			if role_profile == "Nirmaan Sales User Profile":
 				self.assigned_sales = self.owner
 			else:
 				pass
-		
+
+	def validate(self):
+		# Used by the fuzzy mode of global_search
+		self.search_phonetic_key = phonetic_key(self.first_name, self.last_name)
+		# Indexed lookup columns for phone / email search terms
+		self.mobile_normalized = normalize_mobile(self.mobile)
+		self.email_normalized = normalize_email(self.email)
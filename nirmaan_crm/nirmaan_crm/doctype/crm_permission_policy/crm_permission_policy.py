@@ -0,0 +1,90 @@
+# Copyright (c) 2026, Abhishek Kumar and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils.caching import request_cache
+
+# Used for a doctype until it has at least one CRM Permission Policy row.
+# {doctype: {role profile ("" = any other profile): user field ("" = no restriction)}}
+DEFAULT_POLICIES = {
+	"CRM Task": {
+		"Nirmaan Sales User Profile": "assigned_sales",
+		"Nirmaan Estimations User Profile": "assigned_sales",
+		"Nirmaan Estimations Lead Profile": "assigned_sales",
+	},
+	"CRM BOQ": {
+		"": "assigned_sales",
+	},
+}
+
+POLICY_CACHE_KEY = "crm_permission_policies"
+POLICY_CACHE_TTL = 600
+
+
+class CRMPermissionPolicy(Document):
+	"""
+	Which records a role profile sees in a doctype: rows where `user_field`
+	equals the user's email. Read by nirmaan_crm.permissions.
+	"""
+
+	def validate(self):
+		self.role_profile = self.role_profile or ""
+		self.user_field = (self.user_field or "").strip()
+
+		if frappe.db.exists(
+			"CRM Permission Policy",
+			{
+				"document_type": self.document_type,
+				"role_profile": self.role_profile,
+				"name": ["!=", self.name],
+			},
+		):
+			frappe.throw(
+				f"A policy for {self.document_type} / {self.role_profile or 'other role profiles'} already exists."
+			)
+
+		if self.user_field and not frappe.get_meta(self.document_type).has_field(self.user_field):
+			frappe.throw(f"{self.document_type} has no field {self.user_field}.")
+
+	def on_update(self):
+		if self.user_field:
+			add_policy_index(self.document_type, self.user_field)
+		clear_permission_policy_cache()
+
+	def on_trash(self):
+		clear_permission_policy_cache()
+
+
+@request_cache
+def get_permission_policies():
+	"""
+	{doctype: {role profile: user field}} from the policy table, falling back to
+	DEFAULT_POLICIES per doctype. Cached in redis (for POLICY_CACHE_TTL) and
+	memoized per request.
+	"""
+	policies = frappe.cache().get_value(POLICY_CACHE_KEY)
+	if policies is None:
+		policies = {doctype: dict(rules) for doctype, rules in DEFAULT_POLICIES.items()}
+		table_policies = {}
+		for row in frappe.get_all(
+			"CRM Permission Policy", fields=["document_type", "role_profile", "user_field"]
+		):
+			table_policies.setdefault(row.document_type, {})[row.role_profile or ""] = row.user_field or ""
+		policies.update(table_policies)
+		frappe.cache().set_value(POLICY_CACHE_KEY, policies, expires_in_sec=POLICY_CACHE_TTL)
+	return policies
+
+
+def clear_permission_policy_cache():
+	"""Drops the cached policies once the transaction commits, so no worker re-caches the old rows."""
+	frappe.db.after_commit.add(lambda: frappe.cache().delete_value(POLICY_CACHE_KEY))
+
+
+def add_policy_index(doctype, user_field):
+	"""(user_field, modified) index, so a restricted list view is an index range scan in list order."""
+	frappe.db.add_index(doctype, [user_field, "modified"], get_policy_index_name(doctype, user_field))
+
+
+def get_policy_index_name(doctype, user_field):
+	return f"{frappe.scrub(doctype)}_{user_field}_modified"
@@ -0,0 +1,65 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_crm.nirmaan_crm.permissions import get_policy_condition
+from nirmaan_crm.tests.utils import count_queries
+
+
+class TestCRMPermissionPolicy(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.email = "policy.o'sales@crm.test"
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": "Policy Sales",
+				"email": self.email,
+				"nirmaan_role_name": "Nirmaan Sales User Profile",
+			}
+		).insert(ignore_permissions=True)
+		frappe.local.request_cache.clear()
+
+	def test_default_policies(self):
+		condition = get_policy_condition("CRM Task", self.email)
+		self.assertEqual(condition, f"`tabCRM Task`.`assigned_sales` = {frappe.db.escape(self.email)}")
+		self.assertIsNone(get_policy_condition("CRM Company", self.email))
+		self.assertIsNone(get_policy_condition("CRM Task", "Administrator"))
+
+	def test_users_without_profile_fail_closed(self):
+		email = "no.profile@crm.test"
+		self.assertEqual(get_policy_condition("CRM Task", email), "1=0")
+		self.assertEqual(get_policy_condition("CRM BOQ", email), f"`tabCRM BOQ`.`assigned_sales` = {frappe.db.escape(email)}")
+		self.assertIsNone(get_policy_condition("CRM Company", email))
+
+	def test_condition_is_cached(self):
+		get_policy_condition("CRM BOQ", self.email)
+		frappe.local.request_cache.clear()
+		with count_queries() as queries:
+			get_policy_condition("CRM BOQ", self.email)
+		self.assertEqual(queries, [])
+
+	def test_table_policy_replaces_defaults(self):
+		frappe.get_doc(
+			{
+				"doctype": "CRM Permission Policy",
+				"document_type": "CRM Company",
+				"role_profile": "Nirmaan Sales User Profile",
+				"user_field": "assigned_sales",
+			}
+		).insert(ignore_permissions=True)
+		frappe.db.after_commit.run()
+		frappe.local.request_cache.clear()
+		condition = get_policy_condition("CRM Company", self.email)
+		self.assertIn("`tabCRM Company`.`assigned_sales`", condition)
+
+		# The condition is valid SQL with the quote in the email escaped
+		frappe.db.sql(f"SELECT name FROM `tabCRM Company` WHERE {condition} LIMIT 1")
+
+	def test_unknown_field_is_rejected(self):
+		policy = frappe.get_doc(
+			{"doctype": "CRM Permission Policy", "document_type": "CRM Task", "user_field": "no_such_field"}
+		)
+		self.assertRaises(frappe.ValidationError, policy.insert, ignore_permissions=True)
@@ -0,0 +1,228 @@
+# Copyright (c) 2026, Abhishek Kumar and contributors
+# For license information, please see license.txt
+
+from bisect import bisect_right
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, date_diff, get_datetime, getdate, now_datetime, nowdate
+
+# Trailing window recomputed by the hourly job; covers the default "last 30 days" report.
+RECENT_ROLLUP_DAYS = 35
+
+BACKFILL_CHUNK_DAYS = 90
+
+
+class CRMSalesDailyRollup(Document):
+	"""
+	Per sales user, per day counts behind the sales performance report:
+	in-person meetings, unique companies met, BOQs received and cumulative
+	active assigned companies. Written by refresh_sales_rollups only.
+	"""
+
+	pass
+
+
+def compute_daily_sales_counts(date_from, date_to, user_emails=None, apply_permissions=False):
+	"""
+	Computes per (sales user, day) counts for days in [date_from, date_to] with
+	three grouped/narrow queries.
+
+	The rollup job counts every record; with apply_permissions the queries go
+	through frappe.get_list, so live reports count only what the session user
+	may read, like their drill-down lists.
+
+	Returns:
+		dict: {(user, day): {"in_person_meetings", "met_companies", "boqs_received", "assigned_companies"}}
+		with an entry for every day and every user (sales users plus anyone with activity,
+		or exactly `user_emails` when given).
+	"""
+	date_from, date_to = getdate(date_from), getdate(date_to)
+	if date_from > date_to:
+		return {}
+
+	day_after = add_days(date_to, 1)
+	get_rows = frappe.get_list if apply_permissions else frappe.get_all
+	user_filter = [["assigned_sales", "in", user_emails]] if user_emails else [["assigned_sales", "is", "set"]]
+
+	meetings = get_rows(
+		"CRM Task",
+		filters=[
+			["status", "=", "Completed"],
+			["type", "=", "In Person Meeting"],
+			["start_date", ">=", date_from],
+			["start_date", "<=", date_to],
+			["company", "is", "set"],
+		]
+		+ user_filter,
+		fields=["assigned_sales", "start_date", "company", "count(name) as meetings"],
+		group_by="assigned_sales, start_date, company",
+		limit=0,
+	)
+	boqs = get_rows(
+		"CRM BOQ",
+		filters=[
+			["creation", ">=", date_from],
+			["creation", "<", day_after],
+		]
+		+ user_filter,
+		fields=["assigned_sales", "creation"],
+		limit=0,
+	)
+	companies = get_rows(
+		"CRM Company",
+		filters=[
+			["priority", "not in", ["Hold", ""]],  # Active/Non-Hold
+			["creation", "<=", day_after],
+		]
+		+ user_filter,
+		fields=["assigned_sales", "creation"],
+		order_by="creation asc",
+		limit=0,
+	)
+
+	# (user, day) -> {"meetings": n, "companies": [...]}
+	meetings_by_day = {}
+	for row in meetings:
+		bucket = meetings_by_day.setdefault((row.assigned_sales, getdate(row.start_date)), {"meetings": 0, "companies": []})
+		bucket["meetings"] += row.meetings
+		bucket["companies"].append(row.company)
+
+	boqs_by_day = {}
+	for row in boqs:
+		key = (row.assigned_sales, getdate(row.creation))
+		boqs_by_day[key] = boqs_by_day.get(key, 0) + 1
+
+	company_creations_by_user = {}
+	for row in companies:
+		company_creations_by_user.setdefault(row.assigned_sales, []).append(get_datetime(row.creation))
+
+	if user_emails:
+		users = set(user_emails)
+	else:
+		users = set(
+			frappe.get_all("CRM Users", filters={"nirmaan_role_name": "Nirmaan Sales User Profile"}, pluck="email")
+		)
+		users |= {user for user, _ in meetings_by_day} | {user for user, _ in boqs_by_day}
+		users |= set(company_creations_by_user)
+
+	counts = {}
+	for day_offset in range(date_diff(date_to, date_from) + 1):
+		day = add_days(date_from, day_offset)
+		# TAC semantics: companies created up to the start of the next day
+		tac_limit = get_datetime(add_days(day, 1))
+		for user in sorted(users):
+			met = meetings_by_day.get((user, day), {"meetings": 0, "companies": []})
+			counts[(user, day)] = {
+				"in_person_meetings": met["meetings"],
+				"met_companies": sorted(met["companies"]),
+				"boqs_received": boqs_by_day.get((user, day), 0),
+				"assigned_companies": bisect_right(company_creations_by_user.get(user, []), tac_limit),
+			}
+	return counts
+
+
+def refresh_sales_rollups(date_from, date_to):
+	"""Recomputes and replaces all rollup rows for days in [date_from, date_to]."""
+	date_from, date_to = getdate(date_from), getdate(date_to)
+	if date_from > date_to:
+		return
+
+	counts = compute_daily_sales_counts(date_from, date_to)
+
+	now = now_datetime()
+	session_user = frappe.session.user
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"owner",
+		"modified_by",
+		"sales_user",
+		"date",
+		"refreshed_on",
+		"in_person_meetings",
+		"unique_companies_met",
+		"met_companies",
+		"boqs_received",
+		"assigned_companies",
+	]
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			now,
+			now,
+			session_user,
+			session_user,
+			user,
+			day,
+			now,
+			row["in_person_meetings"],
+			len(row["met_companies"]),
+			frappe.as_json(row["met_companies"]),
+			row["boqs_received"],
+			row["assigned_companies"],
+		)
+		for (user, day), row in counts.items()
+	]
+
+	frappe.db.delete("CRM Sales Daily Rollup", {"date": ["between", [date_from, date_to]]})
+	if values:
+		frappe.db.bulk_insert("CRM Sales Daily Rollup", fields, values)
+
+
+def refresh_recent_sales_rollups():
+	"""Hourly scheduler job: keeps the trailing RECENT_ROLLUP_DAYS days (including today) current."""
+	today = getdate(nowdate())
+	refresh_sales_rollups(add_days(today, -RECENT_ROLLUP_DAYS), today)
+	frappe.db.commit()
+
+
+def backfill_sales_rollups():
+	"""
+	Rebuilds rollups from the earliest task/BOQ/company record up to today, in chunks.
+
+	Also the weekly scheduler job: edits to older records (a back-dated task, a
+	company reassigned or put on hold, which changes every past TAC) fall outside
+	the hourly RECENT_ROLLUP_DAYS window, so historical days are recomputed here.
+	"""
+	earliest_dates = [
+		frappe.db.get_value("CRM Task", {"start_date": ["is", "set"]}, "min(start_date)"),
+		frappe.db.get_value("CRM BOQ", {}, "min(creation)"),
+		frappe.db.get_value("CRM Company", {}, "min(creation)"),
+	]
+	earliest_dates = [getdate(d) for d in earliest_dates if d]
+	if not earliest_dates:
+		return
+
+	today = getdate(nowdate())
+	chunk_start = min(earliest_dates)
+	while chunk_start <= today:
+		chunk_end = min(add_days(chunk_start, BACKFILL_CHUNK_DAYS - 1), today)
+		refresh_sales_rollups(chunk_start, chunk_end)
+		frappe.db.commit()
+		chunk_start = add_days(chunk_end, 1)
+
+
+def get_sales_rollups(user_emails, date_from, date_to):
+	"""Returns rollup rows for `user_emails` in [date_from, date_to], ordered by date."""
+	rows = frappe.get_all(
+		"CRM Sales Daily Rollup",
+		filters=[
+			["sales_user", "in", user_emails],
+			["date", ">=", date_from],
+			["date", "<=", date_to],
+		],
+		fields=[
+			"sales_user",
+			"date",
+			"in_person_meetings",
+			"met_companies",
+			"boqs_received",
+			"assigned_companies",
+		],
+		order_by="date asc",
+	)
+	for row in rows:
+		row.met_companies = frappe.parse_json(row.met_companies or "[]")
+	return rows
@@ -0,0 +1,119 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, nowdate
+
+from nirmaan_crm.api.users.get_sales_performance import get_sales_performance_metrics
+from nirmaan_crm.nirmaan_crm.doctype.crm_sales_daily_rollup.crm_sales_daily_rollup import (
+	refresh_sales_rollups,
+)
+
+SALES_USER = "rollup-user@rollup.test"
+OTHER_SALES_USER = "rollup-other@rollup.test"
+
+
+class TestCRMSalesDailyRollup(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": "Rollup",
+				"email": SALES_USER,
+				"nirmaan_role_name": "Nirmaan Sales User Profile",
+			}
+		).insert(ignore_permissions=True)
+		self.company = frappe.get_doc(
+			{
+				"doctype": "CRM Company",
+				"company_name": "Rollup Company",
+				"assigned_sales": SALES_USER,
+				"priority": "Meet In 2 Weeks",
+			}
+		).insert(ignore_permissions=True)
+		for start_date in (nowdate(), nowdate(), add_days(nowdate(), -1)):
+			frappe.get_doc(
+				{
+					"doctype": "CRM Task",
+					"company": self.company.name,
+					"type": "In Person Meeting",
+					"status": "Completed",
+					"start_date": start_date,
+					"assigned_sales": SALES_USER,
+				}
+			).insert(ignore_permissions=True)
+		refresh_sales_rollups(add_days(nowdate(), -1), nowdate())
+
+	def test_daily_counts(self):
+		row = frappe.get_doc("CRM Sales Daily Rollup", {"sales_user": SALES_USER, "date": nowdate()})
+		self.assertEqual(row.in_person_meetings, 2)
+		self.assertEqual(row.unique_companies_met, 1)
+		self.assertEqual(row.assigned_companies, 1)
+
+	def test_range_answered_from_rollups(self):
+		result = get_sales_performance_metrics(date_from=add_days(nowdate(), -1), date_to=nowdate(), granularity="day")
+		periods = next(row for row in result if row["email"] == SALES_USER)["periods"]
+
+		self.assertEqual([p["IPM"] for p in periods], [1, 2])
+		self.assertNotIn("details", periods[0])
+
+		result = get_sales_performance_metrics(date_from=add_days(nowdate(), -1), date_to=nowdate())
+		period = next(row for row in result if row["email"] == SALES_USER)["periods"][0]
+		self.assertEqual(period["IPM"], 3)
+		# Unique companies are not summed across days
+		self.assertEqual(period["UMC"], 1)
+		self.assertEqual(getdate(period["date_to"]), getdate(nowdate()))
+
+	def test_details_on_request(self):
+		result = get_sales_performance_metrics(
+			date_from=add_days(nowdate(), -1), date_to=nowdate(), include_details=1
+		)
+		period = next(row for row in result if row["email"] == SALES_USER)["periods"][0]
+		self.assertEqual(len(period["details"]["IPM"]), 3)
+
+	def test_range_is_limited_to_the_readers_records(self):
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": "Rollup Other",
+				"email": OTHER_SALES_USER,
+				"nirmaan_role_name": "Nirmaan Sales User Profile",
+			}
+		).insert(ignore_permissions=True)
+		frappe.get_doc(
+			{
+				"doctype": "CRM Task",
+				"company": self.company.name,
+				"type": "In Person Meeting",
+				"status": "Completed",
+				"start_date": nowdate(),
+				"assigned_sales": OTHER_SALES_USER,
+			}
+		).insert(ignore_permissions=True)
+		frappe.get_doc(
+			{
+				"doctype": "User",
+				"email": SALES_USER,
+				"first_name": "Rollup",
+				"send_welcome_email": 0,
+				"role_profile_name": "Nirmaan Sales User Profile",
+				"roles": [{"role": "Nirmaan Sales User"}],
+			}
+		).insert(ignore_permissions=True)
+		refresh_sales_rollups(nowdate(), nowdate())
+		frappe.local.request_cache.clear()
+
+		def ipm_by_user():
+			result = get_sales_performance_metrics(date_from=nowdate(), date_to=nowdate())
+			return {row["email"]: row["periods"][0]["IPM"] for row in result}
+
+		# Unrestricted readers get the rollups, which count every record
+		self.assertEqual(ipm_by_user()[OTHER_SALES_USER], 1)
+
+		# A sales user's policy limits tasks to their own, so the rollups do not apply
+		frappe.set_user(SALES_USER)
+		counts = ipm_by_user()
+		self.assertEqual(counts[SALES_USER], 2)
+		self.assertEqual(counts.get(OTHER_SALES_USER, 0), 0)
@@ -0,0 +1,275 @@
+# Copyright (c) 2026, Abhishek Kumar and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now_datetime
+
+from nirmaan_crm.utils.queries import escape_like
+
+# Per searchable doctype: fields read from the source row, fields that make up
+# the searchable text, and the frontend path of a result.
+SEARCH_SOURCES = {
+	"CRM Contacts": {
+		"fields": ["name", "first_name", "last_name", "email", "mobile", "assigned_sales", "modified"],
+		"search_fields": ["first_name", "last_name", "email", "mobile"],
+		"path": "/contacts/contact?id={}",
+	},
+	"CRM Company": {
+		"fields": ["name", "company_name", "company_nick", "company_city", "assigned_sales", "modified"],
+		"search_fields": ["company_name", "company_nick", "company_city"],
+		"path": "/companies/company?id={}",
+	},
+	"CRM BOQ": {
+		"fields": [
+			"name",
+			"boq_name",
+			"boq_type",
+			"city",
+			"boq_status",
+			"assigned_sales",
+			"assigned_estimations",
+			"modified",
+		],
+		"search_fields": ["name", "boq_name", "boq_type", "city", "boq_status"],
+		"path": "/boqs/boq?id={}",
+	},
+	"CRM Task": {
+		"fields": ["name", "type", "status", "company", "boq", "assigned_sales", "modified"],
+		"search_fields": ["name", "type"],
+		"path": "/tasks/task?id={}",
+	},
+}
+
+INDEX_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"ref_doctype",
+	"ref_name",
+	"title",
+	"search_text",
+	"assigned_sales",
+	"assigned_estimations",
+	"ref_modified",
+]
+
+REBUILD_CHUNK_SIZE = 2000
+
+# Redis key bumped whenever a searchable record changes; cached search results embed it
+SEARCH_VERSION_KEY = "crm_search_version"
+
+
+class CRMSearchIndex(Document):
+	"""
+	One row per searchable CRM Contacts / Company / BOQ / Task record with its
+	display title, searchable text and assignment. Maintained from doc events;
+	queried by global_search through search_index.
+	"""
+
+	pass
+
+
+def get_title(doctype, row):
+	"""Display text of a search result, as global_search has always shown it."""
+	if doctype == "CRM Contacts":
+		full_name = f"{row.get('first_name') or ''} {row.get('last_name') or ''}".strip()
+		return f"{full_name} ({row.get('mobile') or row.get('email') or 'N/A'})"
+	if doctype == "CRM Company":
+		return f"{row.get('company_name')} ({row.get('company_city') or 'N/A'})"
+	if doctype == "CRM BOQ":
+		return f"{row.get('boq_name')} ({row.get('boq_status') or 'N/A'})"
+	return f"{row.get('type')} - {row.get('boq') or row.get('company') or 'N/A'} ({row.get('status') or 'N/A'})"
+
+
+def get_result_path(doctype, name):
+	return SEARCH_SOURCES[doctype]["path"].format(name)
+
+
+def refresh_search_index(doctype, names):
+	"""Recomputes and replaces the index rows of `names` (deleted records just lose their row)."""
+	names = [name for name in names if name]
+	if not names:
+		return
+
+	source = SEARCH_SOURCES[doctype]
+	rows = frappe.get_all(doctype, filters={"name": ["in", names]}, fields=source["fields"])
+
+	frappe.db.delete("CRM Search Index", {"ref_doctype": doctype, "ref_name": ["in", names]})
+	if rows:
+		frappe.db.bulk_insert("CRM Search Index", INDEX_FIELDS, _index_values(doctype, rows))
+
+
+def on_search_source_change(doc, method=None):
+	"""on_update / after_delete of the searchable doctypes."""
+	refresh_search_index(doc.doctype, [doc.name])
+	# After commit, so a search racing this write cannot cache stale rows under the new version
+	frappe.db.after_commit.add(bump_search_version)
+
+
+def on_search_source_rename(doc, method=None, old=None, new=None, merge=False):
+	"""after_rename of the searchable doctypes: drop the old row, index the new name."""
+	refresh_search_index(doc.doctype, [old, new])
+	frappe.db.after_commit.add(bump_search_version)
+
+
+def get_search_version():
+	"""Current search data version; changes on every write to a searchable record."""
+	version = frappe.cache().get_value(SEARCH_VERSION_KEY)
+	if version is None:
+		version = bump_search_version()
+	return version
+
+
+def bump_search_version():
+	version = frappe.generate_hash(length=10)
+	frappe.cache().set_value(SEARCH_VERSION_KEY, version)
+	return version
+
+
+def rebuild_search_index():
+	"""Rebuilds every index row (patch / manual repair)."""
+	for doctype, source in SEARCH_SOURCES.items():
+		frappe.db.delete("CRM Search Index", {"ref_doctype": doctype})
+		start = 0
+		while True:
+			rows = frappe.get_all(
+				doctype,
+				fields=source["fields"],
+				order_by="name asc",
+				limit_start=start,
+				limit_page_length=REBUILD_CHUNK_SIZE,
+			)
+			if not rows:
+				break
+			frappe.db.bulk_insert("CRM Search Index", INDEX_FIELDS, _index_values(doctype, rows))
+			frappe.db.commit()
+			start += REBUILD_CHUNK_SIZE
+	bump_search_version()
+
+
+def setup_search_index_columns():
+	"""
+	Postgres only: adds the generated tsvector column and the GIN (full text and
+	trigram) indexes search_index relies on. Safe to run repeatedly.
+	"""
+	if frappe.db.db_type != "postgres":
+		return
+
+	frappe.db.sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+	frappe.db.sql(
+		"""
+		ALTER TABLE `tabCRM Search Index`
+		ADD COLUMN IF NOT EXISTS search_vector tsvector
+		GENERATED ALWAYS AS (to_tsvector('simple', coalesce(search_text, ''))) STORED
+		"""
+	)
+	frappe.db.sql(
+		"CREATE INDEX IF NOT EXISTS crm_search_index_vector ON `tabCRM Search Index` USING gin (search_vector)"
+	)
+	frappe.db.sql(
+		"""
+		CREATE INDEX IF NOT EXISTS crm_search_index_text_trgm
+		ON `tabCRM Search Index` USING gin (search_text gin_trgm_ops)
+		"""
+	)
+	frappe.db.sql(
+		"CREATE INDEX IF NOT EXISTS crm_search_index_ref ON `tabCRM Search Index` (ref_doctype, ref_name)"
+	)
+
+
+def search_index(search_term, scopes, limit=20):
+	"""
+	Searches the index with one ranked query.
+
+	Args:
+		search_term: Raw user input
+		scopes: list of (doctype, {field: value}) pairs; a row matches a scope when it
+			belongs to that doctype and every given field (assigned_sales /
+			assigned_estimations) equals the value. Empty dict = no restriction.
+		limit: Max rows
+
+	Returns:
+		list[frappe._dict]: ref_doctype, ref_name, title, score - most relevant first.
+		On Postgres the score combines full text rank (prefix match per word) and
+		trigram word similarity; elsewhere rows are only ordered by recency.
+	"""
+	if not scopes:
+		return []
+
+	values = {"pattern": f"%{escape_like(search_term.strip())}%", "term": search_term.strip(), "limit": limit}
+	scope_conditions = []
+	for index, (doctype, assignment) in enumerate(scopes):
+		conditions = [f"ref_doctype = %(scope_{index})s"]
+		values[f"scope_{index}"] = doctype
+		for field, value in (assignment or {}).items():
+			if field not in ("assigned_sales", "assigned_estimations"):
+				frappe.throw(f"Unsupported search scope field: {field}")
+			conditions.append(f"{field} = %(scope_{index}_{field})s")
+			values[f"scope_{index}_{field}"] = value
+		scope_conditions.append(f"({' AND '.join(conditions)})")
+	scope_condition = " OR ".join(scope_conditions)
+
+	words = re.findall(r"\w+", search_term.lower())
+	if frappe.db.db_type == "postgres" and words:
+		# Every word as a prefix: "ravi kum" -> ravi:* & kum:*
+		values["tsquery"] = " & ".join(f"{word}:*" for word in words)
+		return frappe.db.sql(
+			f"""
+			SELECT ref_doctype, ref_name, title,
+				ts_rank(search_vector, to_tsquery('simple', %(tsquery)s))
+					+ word_similarity(%(term)s, search_text) AS score
+			FROM `tabCRM Search Index`
+			WHERE ({scope_condition})
+				AND (
+					search_vector @@ to_tsquery('simple', %(tsquery)s)
+					OR search_text ILIKE %(pattern)s
+				)
+			ORDER BY score DESC, ref_modified DESC
+			LIMIT %(limit)s
+			""",
+			values,
+			as_dict=True,
+		)
+
+	return frappe.db.sql(
+		f"""
+		SELECT ref_doctype, ref_name, title, 0 AS score
+		FROM `tabCRM Search Index`
+		WHERE ({scope_condition}) AND search_text LIKE %(pattern)s
+		ORDER BY ref_modified DESC
+		LIMIT %(limit)s
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+def _index_values(doctype, rows):
+	source = SEARCH_SOURCES[doctype]
+	now = now_datetime()
+	user = frappe.session.user
+	values = []
+	for row in rows:
+		search_text = " ".join(str(row.get(field)) for field in source["search_fields"] if row.get(field))
+		values.append(
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				user,
+				user,
+				doctype,
+				row.name,
+				get_title(doctype, row),
+				search_text,
+				row.get("assigned_sales"),
+				row.get("assigned_estimations"),
+				row.get("modified"),
+			)
+		)
+	return values
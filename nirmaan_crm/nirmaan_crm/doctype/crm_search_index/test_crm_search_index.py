@@ -0,0 +1,47 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index import search_index
+
+
+class TestCRMSearchIndex(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.company = frappe.get_doc(
+			{
+				"doctype": "CRM Company",
+				"company_name": "Searchable Interiors",
+				"company_city": "Pune",
+				"assigned_sales": "indexed.sales@nirmaan.test",
+			}
+		).insert(ignore_permissions=True)
+
+	def get_row(self):
+		return frappe.db.get_value(
+			"CRM Search Index",
+			{"ref_doctype": "CRM Company", "ref_name": self.company.name},
+			["title", "search_text", "assigned_sales"],
+			as_dict=True,
+		)
+
+	def test_doc_events_maintain_row(self):
+		row = self.get_row()
+		self.assertEqual(row.title, "Searchable Interiors (Pune)")
+		self.assertEqual(row.assigned_sales, "indexed.sales@nirmaan.test")
+
+		self.company.company_city = "Mumbai"
+		self.company.save(ignore_permissions=True)
+		self.assertIn("Mumbai", self.get_row().search_text)
+
+		self.company.delete(ignore_permissions=True)
+		self.assertIsNone(self.get_row())
+
+	def test_search_respects_scopes(self):
+		matches = search_index("searchable", [("CRM Company", {"assigned_sales": "indexed.sales@nirmaan.test"})])
+		self.assertIn(self.company.name, [row.ref_name for row in matches])
+
+		matches = search_index("searchable", [("CRM Company", {"assigned_sales": "someone.else@nirmaan.test"})])
+		self.assertNotIn(self.company.name, [row.ref_name for row in matches])
@@ -4,6 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
+from nirmaan_crm.utils.roles import get_role_profile
+
 
 class CRMTask(Document):
 	def before_insert(self):
@@ -11,8 +13,7 @@ class CRMTask(Document):
 		if user == "Administrator":
 			pass
 		else:
-			user_doc = frappe.get_doc("CRM Users", user)
-			role_profile = user_doc.nirmaan_role_name
+			role_profile = get_role_profile(user)
 			if role_profile == "Nirmaan Sales User Profile" or role_profile in ["Nirmaan Estimations User Profile", "Nirmaan Estimations Lead Profile"]:
 				self.assigned_sales = self.owner
 			else:
@@ -1,9 +1,61 @@
 # Copyright (c) 2025, Abhishek Kumar and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, nowdate
 
 
 class TestCRMTask(FrappeTestCase):
-	pass
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.company = frappe.get_doc(
+			{"doctype": "CRM Company", "company_name": "Last Meeting Interiors"}
+		).insert(ignore_permissions=True)
+
+	def make_meeting(self, days_ago, status="Scheduled"):
+		return frappe.get_doc(
+			{
+				"doctype": "CRM Task",
+				"type": "In Person Meeting",
+				"status": status,
+				"company": self.company.name,
+				"start_date": add_days(nowdate(), -days_ago),
+			}
+		).insert(ignore_permissions=True)
+
+	def last_meeting(self):
+		value = frappe.db.get_value("CRM Company", self.company.name, "last_meeting")
+		return value and getdate(value)
+
+	def set_status(self, task, status):
+		task.reload()
+		task.status = status
+		task.save(ignore_permissions=True)
+
+	def test_completion_only_moves_last_meeting_forward(self):
+		recent = self.make_meeting(2)
+		older = self.make_meeting(10)
+
+		self.set_status(recent, "Completed")
+		self.assertEqual(self.last_meeting(), getdate(add_days(nowdate(), -2)))
+
+		self.set_status(older, "Completed")
+		self.assertEqual(self.last_meeting(), getdate(add_days(nowdate(), -2)))
+
+	def test_reversal_and_reschedule_recompute(self):
+		recent = self.make_meeting(2, status="Completed")
+		self.make_meeting(10, status="Completed")
+		self.assertEqual(self.last_meeting(), getdate(add_days(nowdate(), -2)))
+
+		recent.reload()
+		recent.start_date = add_days(nowdate(), -20)
+		recent.save(ignore_permissions=True)
+		self.assertEqual(self.last_meeting(), getdate(add_days(nowdate(), -10)))
+
+		self.set_status(recent, "Incomplete")
+		self.assertEqual(self.last_meeting(), getdate(add_days(nowdate(), -10)))
+
+		for name in frappe.get_all("CRM Task", filters={"company": self.company.name}, pluck="name"):
+			frappe.delete_doc("CRM Task", name, ignore_permissions=True)
+		self.assertIsNone(self.last_meeting())
@@ -4,10 +4,18 @@
 import frappe
 from frappe.model.document import Document
 
+from nirmaan_crm.utils.roles import clear_role_profile_cache
+
 
 class CRMUsers(Document):
 	def validate(self):
 		self.set_full_name()
+
+	def on_update(self):
+		clear_role_profile_cache(self.name)
+
+	def on_trash(self):
+		clear_role_profile_cache(self.name)
 	
 	def autoname(self):
 		"""set name as Email Address"""
@@ -48,6 +56,8 @@ def on_user_update(doc, method=None):
 		profile.mobile_no = doc.mobile_no
 		profile.nirmaan_role_name = doc.role_profile_name
 		profile.save(ignore_permissions=True)
+	# Role profile cached by get_role_profile (permission hooks, before_insert)
+	clear_role_profile_cache(doc.email)
 
 # Creating infinite loop if enabled with nirmaan users controller on_trash function
 def delete_user_profile(doc, method=None):
@@ -1,9 +1,52 @@
 # Copyright (c) 2025, Abhishek Kumar and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from nirmaan_crm.nirmaan_crm.permissions import get_task_permission_query_conditions
+from nirmaan_crm.tests.utils import count_queries
+from nirmaan_crm.utils.roles import get_role_profile
+
 
 class TestCRMUsers(FrappeTestCase):
-	pass
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.email = "role.cache@crm.test"
+		frappe.get_doc(
+			{
+				"doctype": "CRM Users",
+				"first_name": "Role Cache",
+				"email": self.email,
+				"nirmaan_role_name": "Nirmaan Sales User Profile",
+			}
+		).insert(ignore_permissions=True)
+		frappe.local.request_cache.clear()
+
+	def test_role_profile_is_cached(self):
+		self.assertEqual(get_role_profile(self.email), "Nirmaan Sales User Profile")
+
+		frappe.local.request_cache.clear()
+		with count_queries() as queries:
+			condition = get_task_permission_query_conditions(self.email)
+		self.assertEqual(queries, [])
+		self.assertIn(self.email, condition)
+
+	def test_profile_update_clears_cache(self):
+		get_role_profile(self.email)
+
+		profile = frappe.get_doc("CRM Users", self.email)
+		profile.nirmaan_role_name = "Nirmaan Admin User Profile"
+		profile.save(ignore_permissions=True)
+
+		# Cleared only once the change is committed
+		frappe.local.request_cache.clear()
+		self.assertEqual(get_role_profile(self.email), "Nirmaan Sales User Profile")
+
+		frappe.db.after_commit.run()
+		frappe.local.request_cache.clear()
+		self.assertEqual(get_role_profile(self.email), "Nirmaan Admin User Profile")
+		self.assertIsNone(get_task_permission_query_conditions(self.email))
+
+	def test_missing_user_raises(self):
+		self.assertRaises(frappe.DoesNotExistError, get_role_profile, "missing.user@crm.test")
@@ -2,78 +2,73 @@
 
 import frappe
 
-def get_company_permission_query_conditions(user):
-    """
-    Applies record-level permissions based on the 'owner' field.
-    - Admins can see all documents.
-    - Sales Users can only see documents they own.
-    - Estimation Users can see all BOQs but are restricted on other doctypes.
-    """
-    if not user:
-        user = frappe.session.user
+from nirmaan_crm.nirmaan_crm.doctype.crm_permission_policy.crm_permission_policy import get_permission_policies
+from nirmaan_crm.utils.roles import get_role_profile
 
-    # Nirmaan Admin User has unrestricted access
-    if "System Manager" in frappe.get_roles(user):
-        return None  # Returning None or an empty string means no conditions are applied
+# get_policy_user_field result for users who may see no record of the doctype
+NO_RECORDS = "__no_records__"
 
-    # General condition for Sales Users
-    return f"`tabCRM Company`.assigned_sales = '{user}'"
 
-def get_contact_permission_query_conditions(user):
+def get_policy_condition(doctype, user=None):
     """
-    Applies record-level permissions based on the 'owner' field.
-    - Admins can see all documents.
-    - Sales Users can only see documents they own.
-    - Estimation Users can see all BOQs but are restricted on other doctypes.
+    Record-level condition of `doctype` for `user` from the CRM Permission Policy
+    table (see get_policy_user_field).
     """
-    if not user:
-        user = frappe.session.user
-
-    # Nirmaan Admin User has unrestricted access
-    if "System Manager" in frappe.get_roles(user):
+    user_field = get_policy_user_field(doctype, user)
+    if not user_field:
         return None  # Returning None or an empty string means no conditions are applied
+    if user_field == NO_RECORDS:
+        return "1=0"
 
-    # General condition for Sales Users
-    return f"`tabCRM Contacts`.assigned_sales = '{user}'"
+    # Plain column equality (no IFNULL wrapping) so the (user_field, modified) index applies
+    return f"`tab{doctype}`.`{user_field}` = {frappe.db.escape(user or frappe.session.user)}"
 
 
-def get_boq_permission_query_conditions(user):
+def get_policy_user_field(doctype, user=None):
     """
-    Special permission for BOQs.
-    - Admins and Estimation Users can see all BOQs.
-    - Sales Users can only see BOQs they own.
+    Column of `doctype` that must equal `user` for the user to see a record, per the
+    CRM Permission Policy table (see DEFAULT_POLICIES there for the built-in rules);
+    None when the user sees all records, NO_RECORDS when they see none.
+    - Administrator and System Managers see all documents.
+    - Otherwise the policy of the user's role profile applies, else the "" (any
+      other profile) policy; a policy with a user field limits the list to rows
+      where that field equals the user, an empty one allows everything.
+    - Users without a CRM Users record fail closed: only a "" policy with a user
+      field applies to them, else they see no records.
+    - Doctypes without a policy are unrestricted.
     """
     if not user:
         user = frappe.session.user
+    if user == "Administrator" or "System Manager" in frappe.get_roles(user):
+        return None
 
-    # Admins and Estimation Users have unrestricted access to BOQs
-    roles = frappe.get_roles(user)
-    if "System Manager" in roles:
+    policies = get_permission_policies().get(doctype)
+    if not policies:
         return None
 
-    # Sales Users are restricted to their own BOQs
-    return f"`tabCRM BOQ`.assigned_sales = '{user}'"
+    try:
+        role_profile = get_role_profile(user)
+    except frappe.DoesNotExistError:
+        return policies.get("") or NO_RECORDS
+
+    return (policies[role_profile] if role_profile in policies else policies.get("")) or None
+
+
+def get_company_permission_query_conditions(user):
+    return get_policy_condition("CRM Company", user)
+
+
+def get_contact_permission_query_conditions(user):
+    return get_policy_condition("CRM Contacts", user)
+
+
+def get_boq_permission_query_conditions(user):
+    return get_policy_condition("CRM BOQ", user)
+
 
 def get_task_permission_query_conditions(user):
-    """
-    Applies record-level permissions based on the 'owner' field.
-    - Admins can see all documents.
-    - Sales Users can only see documents they own.
-    - Estimation Users can see all BOQs but are restricted on other doctypes.
-    """
-    if not user:
-        user = frappe.session.user
-    if user == "Administrator":
-         return None
-    else:
-        user_doc = frappe.get_doc("CRM Users", user)
-        role_profile = user_doc.nirmaan_role_name
-        if role_profile == "Nirmaan Sales User Profile" or role_profile in ["Nirmaan Estimations User Profile", "Nirmaan Estimations Lead Profile"]:
-             return f"`tabCRM Task`.assigned_sales = '{user}'"
-        else:
-             return None
-             
-    
+    return get_policy_condition("CRM Task", user)
+
 
     # # Nirmaan Admin User has unrestricted access
     # if "System Manager" in frappe.get_roles(user):
@@ -0,0 +1,45 @@
+import frappe
+
+# Composite indexes for the filters the endpoints run on every request.
+# Column order follows the access pattern: equality columns first, the range /
+# sort column (start_date, creation) last.
+FILTER_INDEXES = {
+    "CRM Task": {
+        # Company activity / last meeting: company + type + status, start_date range
+        "crm_task_company_type_status_date": ["company", "type", "status", "start_date"],
+        # Sales performance: assigned_sales + type + status, start_date range
+        "crm_task_sales_type_status_date": ["assigned_sales", "type", "status", "start_date"],
+        # get_sales_tasks: task_profile (+ status filter), start_date sort
+        "crm_task_profile_status_date": ["task_profile", "status", "start_date"],
+    },
+    "CRM BOQ": {
+        # Active BOQs per company, deal status of a company's BOQs
+        "crm_boq_company_status": ["company", "boq_status", "deal_status"],
+        # Sales performance: BOQs received per salesperson, creation range
+        "crm_boq_sales_creation": ["assigned_sales", "creation"],
+    },
+    "CRM Company": {
+        # Sales performance / company lists: assigned_sales + priority, creation range
+        "crm_company_sales_priority": ["assigned_sales", "priority", "creation"],
+        "crm_company_last_meeting": ["last_meeting"],
+    },
+    "CRM Project Estimation": {
+        # Estimation sync of CRM BOQ: (parent_project, document_type, package_name) lookups
+        "crm_project_estimation_parent": ["parent_project", "document_type", "package_name"],
+    },
+}
+
+
+def execute():
+    for doctype, indexes in FILTER_INDEXES.items():
+        for index_name, fields in indexes.items():
+            if not all(frappe.db.has_column(doctype, field) for field in fields):
+                print(f"Skipping index {index_name}: {doctype} lacks one of {fields}")
+                continue
+            frappe.db.add_index(doctype, fields, index_name)
+
+    if frappe.db.db_type == "postgres":
+        # Fresh statistics so the planner picks the new indexes right away
+        for doctype in FILTER_INDEXES:
+            frappe.db.sql(f"ANALYZE `tab{doctype}`")
+    frappe.db.commit()
@@ -0,0 +1,17 @@
+import frappe
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_permission_policy.crm_permission_policy import (
+    POLICY_CACHE_KEY,
+    add_policy_index,
+    get_permission_policies,
+)
+
+
+def execute():
+    """(user_field, modified) indexes for every permission policy column (new policies add their own on save)."""
+    frappe.cache().delete_value(POLICY_CACHE_KEY)
+    for doctype, rules in get_permission_policies().items():
+        for user_field in set(filter(None, rules.values())):
+            if frappe.db.has_column(doctype, user_field):
+                add_policy_index(doctype, user_field)
+    frappe.db.commit()
@@ -0,0 +1,39 @@
+import frappe
+
+# Columns matched with ILIKE '%term%' by api/global_search.py
+TRIGRAM_SEARCH_FIELDS = {
+    "CRM Contacts": ["first_name", "last_name", "email", "mobile"],
+    "CRM Company": ["company_name", "company_nick", "company_city"],
+    "CRM BOQ": ["name", "boq_name", "boq_type", "city", "boq_status"],
+    "CRM Task": ["name", "type"],
+}
+
+
+def execute():
+    """Installs pg_trgm and GIN trigram indexes so infix (I)LIKE searches can use an index."""
+    if frappe.db.db_type != "postgres":
+        return
+
+    try:
+        frappe.db.sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except Exception as e:
+        # pg_trgm is a trusted extension on Postgres 13+, but the site user may still lack CREATE
+        print(f"Could not install pg_trgm, skipping trigram indexes: {e}")
+        frappe.db.rollback()
+        return
+
+    for doctype, fields in TRIGRAM_SEARCH_FIELDS.items():
+        for field in fields:
+            if not frappe.db.has_column(doctype, field):
+                continue
+            frappe.db.sql(
+                f"""
+                CREATE INDEX IF NOT EXISTS `{get_trigram_index_name(doctype, field)}`
+                ON `tab{doctype}` USING gin (`{field}` gin_trgm_ops)
+                """
+            )
+    frappe.db.commit()
+
+
+def get_trigram_index_name(doctype, field):
+    return f"{frappe.scrub(doctype)}_{field}_trgm"
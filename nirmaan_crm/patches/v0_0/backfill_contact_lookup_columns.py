@@ -0,0 +1,44 @@
+import frappe
+
+from nirmaan_crm.utils.normalize import normalize_email, normalize_mobile
+
+# Normalized lookup columns of CRM Contacts and their source fields / normalizers
+LOOKUP_COLUMNS = {
+    "mobile_normalized": ("mobile", normalize_mobile),
+    "email_normalized": ("email", normalize_email),
+}
+
+
+def execute():
+    """
+    Fills CRM Contacts mobile_normalized / email_normalized (set on save from now on)
+    and, on Postgres, adds reverse() indexes for the suffix lookups of global_search.
+    The plain B-tree indexes come from the fields' search_index.
+    """
+    columns = [column for column in LOOKUP_COLUMNS if frappe.db.has_column("CRM Contacts", column)]
+    if not columns:
+        return
+
+    sources = [LOOKUP_COLUMNS[column][0] for column in columns]
+    for row in frappe.get_all("CRM Contacts", fields=["name"] + sources + columns):
+        changes = {}
+        for column in columns:
+            source, normalize = LOOKUP_COLUMNS[column]
+            value = normalize(row.get(source))
+            if value != (row.get(column) or ""):
+                changes[column] = value
+        if changes:
+            frappe.db.set_value("CRM Contacts", row.name, changes, update_modified=False)
+    frappe.db.commit()
+
+    if frappe.db.db_type != "postgres":
+        return
+
+    for column in columns:
+        frappe.db.sql(
+            f"""
+            CREATE INDEX IF NOT EXISTS `crm_contacts_{column}_reverse`
+            ON `tabCRM Contacts` (reverse(`{column}`) text_pattern_ops)
+            """
+        )
+    frappe.db.commit()
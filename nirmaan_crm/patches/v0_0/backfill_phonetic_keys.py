@@ -0,0 +1,44 @@
+import frappe
+
+from nirmaan_crm.patches.v0_0.add_trigram_search_indexes import get_trigram_index_name
+from nirmaan_crm.utils.phonetic import phonetic_key
+
+# search_phonetic_key sources, as set in the controllers' validate
+PHONETIC_KEY_SOURCES = {
+    "CRM Contacts": ["first_name", "last_name"],
+    "CRM Company": ["company_name", "company_nick"],
+}
+
+
+def execute():
+    """Fills search_phonetic_key of existing contacts / companies and indexes it for fuzzy search."""
+    for doctype, fields in PHONETIC_KEY_SOURCES.items():
+        if not frappe.db.has_column(doctype, "search_phonetic_key"):
+            continue
+
+        for row in frappe.get_all(doctype, fields=["name", "search_phonetic_key"] + fields):
+            key = phonetic_key(*(row.get(field) for field in fields))
+            if key != (row.search_phonetic_key or ""):
+                frappe.db.set_value(doctype, row.name, "search_phonetic_key", key, update_modified=False)
+        frappe.db.commit()
+
+    if frappe.db.db_type != "postgres":
+        return
+
+    try:
+        frappe.db.sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except Exception as e:
+        print(f"Could not install pg_trgm, skipping phonetic key indexes: {e}")
+        frappe.db.rollback()
+        return
+
+    for doctype in PHONETIC_KEY_SOURCES:
+        if not frappe.db.has_column(doctype, "search_phonetic_key"):
+            continue
+        frappe.db.sql(
+            f"""
+            CREATE INDEX IF NOT EXISTS `{get_trigram_index_name(doctype, "search_phonetic_key")}`
+            ON `tab{doctype}` USING gin (`search_phonetic_key` gin_trgm_ops)
+            """
+        )
+    frappe.db.commit()
@@ -0,0 +1,8 @@
+from nirmaan_crm.nirmaan_crm.doctype.crm_sales_daily_rollup.crm_sales_daily_rollup import (
+    backfill_sales_rollups,
+)
+
+
+def execute():
+    """Backfill CRM Sales Daily Rollup rows from the earliest CRM activity up to today."""
+    backfill_sales_rollups()
@@ -0,0 +1,10 @@
+import frappe
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_company_activity.crm_company_activity import (
+    rebuild_company_activity,
+)
+
+
+def execute():
+    """Backfill CRM Company Activity summary rows for all existing companies."""
+    rebuild_company_activity()
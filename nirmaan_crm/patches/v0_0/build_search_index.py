@@ -0,0 +1,12 @@
+import frappe
+
+from nirmaan_crm.nirmaan_crm.doctype.crm_search_index.crm_search_index import (
+    rebuild_search_index,
+    setup_search_index_columns,
+)
+
+
+def execute():
+    """Add the full text / trigram columns and indexes, then index all searchable records."""
+    setup_search_index_columns()
+    rebuild_search_index()
@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+
+import frappe
+
+
+@contextmanager
+def count_queries():
+	"""Collects every query sent through frappe.db.sql inside the block."""
+	queries = []
+	orig_sql = frappe.db.__class__.sql
+
+	def _sql_with_count(self, *args, **kwargs):
+		queries.append(args[0] if args else kwargs.get("query"))
+		return orig_sql(self, *args, **kwargs)
+
+	frappe.db.__class__.sql = _sql_with_count
+	try:
+		yield queries
+	finally:
+		frappe.db.__class__.sql = orig_sql
@@ -0,0 +1,112 @@
+# Copyright (c) 2026, Abhishek Kumar and contributors
+# For license information, please see license.txt
+
+# Compact "columnar" encoding for list endpoints (opt-in via format=columnar).
+#
+#   {
+#       "format": "columnar",
+#       "fields": ["name", "status", ...],
+#       "rows": [["TASK-0001", 0, ...], ...],
+#       "dictionaries": {"status": ["Completed", "Scheduled"]}
+#   }
+#
+# Values of dictionary-encoded columns are indexes into dictionaries[field]
+# (None stays None); every other value is sent as is.
+
+COLUMNAR_FORMAT = "columnar"
+
+# A string column is dictionary-encoded when it has at most this many distinct values...
+MAX_DICTIONARY_SIZE = 64
+# ...and they repeat enough to pay for the dictionary
+MIN_REPEATS_PER_VALUE = 2
+
+
+def is_columnar(format):
+    return format == COLUMNAR_FORMAT
+
+
+def to_columnar(rows, dictionary_fields=None):
+    """
+    Encodes a list of dicts as one header plus row arrays.
+
+    Args:
+        rows: list of dicts; the field order follows the first row, keys missing
+            from the first row are appended as they are seen.
+        dictionary_fields: columns to dictionary-encode. By default low-cardinality
+            string columns (e.g. status, type, boq_status) are detected.
+    """
+    fields = []
+    seen_fields = set()
+    for row in rows:
+        for field in row:
+            if field not in seen_fields:
+                seen_fields.add(field)
+                fields.append(field)
+
+    if dictionary_fields is None:
+        dictionary_fields = _detect_dictionary_fields(rows, fields)
+
+    dictionaries = {}
+    indexes = {}
+    for field in dictionary_fields:
+        if field in seen_fields:
+            dictionaries[field] = []
+            indexes[field] = {}
+
+    encoded_rows = []
+    for row in rows:
+        encoded = []
+        for field in fields:
+            value = row.get(field)
+            index = indexes.get(field)
+            if index is not None and value is not None:
+                position = index.get(value)
+                if position is None:
+                    position = index[value] = len(dictionaries[field])
+                    dictionaries[field].append(value)
+                value = position
+            encoded.append(value)
+        encoded_rows.append(encoded)
+
+    return {
+        "format": COLUMNAR_FORMAT,
+        "fields": fields,
+        "rows": encoded_rows,
+        "dictionaries": dictionaries,
+    }
+
+
+def from_columnar(payload):
+    """Decodes a to_columnar payload back into a list of dicts."""
+    fields = payload["fields"]
+    dictionaries = payload.get("dictionaries") or {}
+    decoders = [dictionaries.get(field) for field in fields]
+
+    rows = []
+    for encoded in payload["rows"]:
+        row = {}
+        for field, decoder, value in zip(fields, decoders, encoded):
+            row[field] = decoder[value] if decoder is not None and value is not None else value
+        rows.append(row)
+    return rows
+
+
+def _detect_dictionary_fields(rows, fields):
+    dictionary_fields = []
+    for field in fields:
+        distinct = set()
+        count = 0
+        for row in rows:
+            value = row.get(field)
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                break
+            distinct.add(value)
+            count += 1
+            if len(distinct) > MAX_DICTIONARY_SIZE:
+                break
+        else:
+            if distinct and count >= len(distinct) * MIN_REPEATS_PER_VALUE:
+                dictionary_fields.append(field)
+    return dictionary_fields
@@ -0,0 +1,12 @@
+def group_rows_by(rows, key):
+    """
+    Groups rows into {key_value: [rows...]} in a single pass, keeping input order.
+    Rows without a value for `key` are skipped.
+    """
+    grouped = {}
+    for row in rows:
+        value = row.get(key)
+        if value:
+            grouped.setdefault(value, []).append(row)
+    return grouped
+
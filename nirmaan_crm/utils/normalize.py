@@ -0,0 +1,46 @@
+# Copyright (c) 2026, Abhishek Kumar and contributors
+# For license information, please see license.txt
+
+# Normalized forms of contact mobiles / emails, stored next to the raw values
+# (CRM Contacts mobile_normalized / email_normalized) so lookups can use an index.
+
+import re
+
+_NON_DIGITS = re.compile(r"\D+")
+_PHONE_TERM = re.compile(r"^\+?[\d\s().-]+$")
+_EMAIL_TERM = re.compile(r"^[^@\s]*@[^@\s]*$")
+
+# A search term needs at least this many digits to be treated as a phone number
+# (shorter digit runs are more likely BOQ / task name fragments)
+MIN_PHONE_TERM_DIGITS = 6
+
+
+def normalize_mobile(value):
+    """
+    Digits only, with the Indian country code / trunk prefix dropped, so
+    "+91 98450-12345", "098450 12345" and "9845012345" all become "9845012345".
+    """
+    digits = _NON_DIGITS.sub("", value or "")
+    if len(digits) == 12 and digits.startswith("91"):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith("0"):
+        return digits[1:]
+    return digits
+
+
+def normalize_email(value):
+    return (value or "").strip().lower()
+
+
+def is_phone_term(search_term):
+    term = (search_term or "").strip()
+    return bool(_PHONE_TERM.match(term)) and len(_NON_DIGITS.sub("", term)) >= MIN_PHONE_TERM_DIGITS
+
+
+def is_email_term(search_term):
+    """A full address ("ravi@acme.in") or a domain ("@acme.in")."""
+    term = (search_term or "").strip()
+    if not _EMAIL_TERM.match(term):
+        return False
+    local, _, domain = term.partition("@")
+    return "." in domain and not domain.endswith(".")
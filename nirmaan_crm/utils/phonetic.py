@@ -0,0 +1,87 @@
+# Copyright (c) 2026, Abhishek Kumar and contributors
+# For license information, please see license.txt
+
+import re
+
+# Romanized Indian names are spelled many ways ("Shrivastava" / "Srivastava",
+# "Choudhary" / "Chaudhari", "Laxmi" / "Lakshmi"). Keys fold the common variants
+# together, then drop vowels after the first letter and collapse repeats, so the
+# key is a consonant skeleton: both spellings above become "srvstv" / "kdr" / "lksm".
+_SUBSTITUTIONS = [
+    ("ksh", "ks"),
+    ("x", "ks"),
+    ("shr", "sr"),
+    ("sh", "s"),
+    ("ch", "k"),
+    ("ph", "f"),
+    ("bh", "b"),
+    ("dh", "d"),
+    ("gh", "g"),
+    ("jh", "j"),
+    ("kh", "k"),
+    ("th", "t"),
+    ("q", "k"),
+    ("ck", "k"),
+    ("c", "k"),
+    ("w", "v"),
+    ("z", "j"),
+    ("y", "i"),
+]
+
+_NON_LETTERS = re.compile(r"[^a-z]+")
+_REPEATS = re.compile(r"(.)\1+")
+_VOWELS = re.compile(r"[aeiouh]")
+
+
+def phonetic_word_key(word):
+    """Consonant-skeleton key of one word (see module comment)."""
+    word = _NON_LETTERS.sub("", (word or "").lower())
+    if not word:
+        return ""
+    for source, target in _SUBSTITUTIONS:
+        word = word.replace(source, target)
+    word = _REPEATS.sub(r"\1", word)
+    return _REPEATS.sub(r"\1", word[0] + _VOWELS.sub("", word[1:]))
+
+
+def phonetic_key(*texts):
+    """Space separated word keys of `texts`, e.g. phonetic_key("Rahul", "Shrivastava") -> "rl srvstv"."""
+    keys = []
+    for text in texts:
+        for word in (text or "").split():
+            key = phonetic_word_key(word)
+            if key:
+                keys.append(key)
+    return " ".join(keys)
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def fuzzy_rank(search_term, text):
+    """
+    Sort key for a fuzzy match of `search_term` in `text` (lower is better):
+    summed edit distance of each term word to its closest word in `text`,
+    on phonetic keys first and on the lowercased spelling second.
+    """
+    words = (text or "").lower().split()
+    if not words:
+        return (float("inf"), float("inf"))
+
+    phonetic_distance = 0
+    spelling_distance = 0
+    for term_word in search_term.lower().split():
+        term_key = phonetic_word_key(term_word)
+        phonetic_distance += min(edit_distance(term_key, phonetic_word_key(word)) for word in words)
+        spelling_distance += min(edit_distance(term_word, word) for word in words)
+    return (phonetic_distance, spelling_distance)
@@ -0,0 +1,57 @@
+import re
+from bisect import bisect_left
+
+ALL_PARTITION = "__all__"
+
+_WORD_START = re.compile(r"(?:^|(?<=[\s\-_.,@()/]))\S")
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index over short texts (names, nicks, emails), kept as one
+    sorted key array per partition and searched with bisect.
+
+    Every word start of a text is indexed, so "inte" finds "Searchable Interiors".
+    Each item is added to ALL_PARTITION and to the partitions it is given.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._keys = {}
+        self._values = {}
+
+    def add(self, text, item, partitions=()):
+        """Queues `item` under every word start of `text`; call build() once all items are added."""
+        if not text:
+            return
+        text = str(text).lower()
+        for partition in (ALL_PARTITION, *[p for p in partitions if p]):
+            entries = self._entries.setdefault(partition, [])
+            for match in _WORD_START.finditer(text):
+                entries.append((text[match.start() :], item))
+
+    def build(self):
+        for partition, entries in self._entries.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._keys[partition] = [key for key, _ in entries]
+            self._values[partition] = [item for _, item in entries]
+        self._entries = {}
+        return self
+
+    def search(self, prefix, partition=ALL_PARTITION, limit=10):
+        """Returns up to `limit` distinct items with a word starting with `prefix`, in key order."""
+        prefix = (prefix or "").strip().lower()
+        keys = self._keys.get(partition)
+        if not prefix or not keys:
+            return []
+
+        values = self._values[partition]
+        results, seen = [], set()
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix) and len(results) < limit:
+            item = values[position]
+            if item not in seen:
+                seen.add(item)
+                results.append(item)
+            position += 1
+        return results
@@ -0,0 +1,368 @@
+import frappe
+
+from nirmaan_crm.utils.phonetic import fuzzy_rank, phonetic_word_key
+
+# fuzzy_search_list: candidates fetched per returned row before edit-distance ranking
+FUZZY_CANDIDATES_PER_RESULT = 5
+
+
+def get_top_rows_per_group(
+    doctype, partition_by, order_by, limit_per_group, filters=None, fields=None, ignore_permissions=False
+):
+    """
+    Returns up to `limit_per_group` rows of `doctype` for every distinct value of
+    `partition_by`, in a single query.
+
+    The filtered list is built through frappe.get_list (run=0) so permission query
+    conditions still apply, and is then ranked with
+    ROW_NUMBER() OVER (PARTITION BY ... ORDER BY ...).
+
+    Args:
+        doctype: DocType to query, e.g. "CRM Task"
+        partition_by: Column to group on, e.g. "company"
+        order_by: Ranking order inside a group, e.g. "start_date asc"
+        limit_per_group: Max rows kept per group
+        filters: Regular frappe.get_list filters
+        fields: Plain column names to return
+        ignore_permissions: Skip permission query conditions (background jobs, doc events)
+
+    Returns:
+        list[frappe._dict]: Rows ordered by group, then rank.
+    """
+    fields = list(fields or ["name"])
+    if partition_by not in fields:
+        fields.append(partition_by)
+
+    inner_fields = list(fields)
+    for column in _order_by_columns(order_by):
+        if column not in inner_fields:
+            inner_fields.append(column)
+
+    inner_query = frappe.get_list(
+        doctype,
+        filters=filters or {},
+        fields=inner_fields,
+        order_by="",
+        limit=0,
+        ignore_permissions=ignore_permissions,
+        run=0,
+    )
+    # The inner query is already rendered; keep literal "%" (LIKE patterns) away from param substitution
+    inner_query = inner_query.replace("%", "%%")
+
+    columns = ", ".join(f"ranked.`{field}`" for field in fields)
+    rows = frappe.db.sql(
+        f"""
+        SELECT {columns}
+        FROM (
+            SELECT filtered.*,
+                ROW_NUMBER() OVER (PARTITION BY filtered.`{partition_by}` ORDER BY {_qualify_order_by(order_by)}) AS row_rank
+            FROM ({inner_query}) filtered
+        ) ranked
+        WHERE ranked.row_rank <= %(limit_per_group)s
+        ORDER BY ranked.`{partition_by}`, ranked.row_rank
+        """,
+        {"limit_per_group": limit_per_group},
+        as_dict=True,
+    )
+    return rows
+
+
+def search_list(doctype, search_fields, search_term, filters=None, fields=None, order_by="modified desc", limit=10):
+    """
+    Returns up to `limit` rows of `doctype` where any of `search_fields`
+    contains `search_term` (case-insensitive).
+
+    The permission-filtered list comes from frappe.get_list (run=0) and the match
+    is applied outside it as plain `column ILIKE '%term%'` (no IFNULL wrapping), so
+    Postgres can use the pg_trgm GIN indexes on those columns (see
+    patches/v0_0/add_trigram_search_indexes.py). LIKE wildcards in the term are
+    matched literally.
+
+    Args:
+        doctype: DocType to search, e.g. "CRM Contacts"
+        search_fields: Columns matched against the term (ORed)
+        search_term: Raw user input
+        filters: Regular frappe.get_list filters (ANDed)
+        fields: Plain column names to return
+        order_by: Result order, e.g. "modified desc"
+        limit: Max rows
+    """
+    fields = list(fields or ["name"])
+    inner_query, match_condition = _search_parts(doctype, search_fields, filters, fields + _order_by_columns(order_by))
+
+    columns = ", ".join(f"filtered.`{field}`" for field in fields)
+    return frappe.db.sql(
+        f"""
+        SELECT {columns}
+        FROM ({inner_query}) filtered
+        WHERE {match_condition}
+        ORDER BY {_qualify_order_by(order_by)}
+        LIMIT %(limit)s
+        """,
+        {"pattern": _search_pattern(search_term), "limit": limit},
+        as_dict=True,
+    )
+
+
+def search_branches(branches, search_term, limit=10):
+    """
+    Runs several search_list style searches (one per doctype) as a single
+    UNION ALL statement, so latency follows the slowest branch instead of the sum.
+
+    Args:
+        branches: list of {"doctype", "search_fields", "filters", "fields"} dicts,
+            at most one per doctype
+        search_term: Raw user input
+        limit: Max rows per branch
+
+    Returns:
+        dict: {doctype: rows} - each branch ordered by modified desc, name desc.
+        If the combined statement fails, branches are searched one by one and a
+        failing branch just returns no rows.
+    """
+    if not branches:
+        return {}
+
+    text_type = "text" if frappe.db.db_type == "postgres" else "char"
+    column_count = max(len(branch["fields"]) for branch in branches)
+
+    selects = []
+    for index, branch in enumerate(branches):
+        fields = list(branch["fields"])
+        inner_query, match_condition = _search_parts(
+            branch["doctype"], branch["search_fields"], branch.get("filters"), fields + ["name", "modified"]
+        )
+        # Pad every branch to the same column list; values come back as text
+        columns = [
+            f"CAST(filtered.`{fields[position]}` AS {text_type})" if position < len(fields) else f"CAST(NULL AS {text_type})"
+            for position in range(column_count)
+        ]
+        selects.append(
+            f"""(
+            SELECT {index} AS branch_index, filtered.`name` AS branch_name, filtered.`modified` AS branch_modified,
+                {", ".join(f"{column} AS col_{position}" for position, column in enumerate(columns))}
+            FROM ({inner_query}) filtered
+            WHERE {match_condition}
+            ORDER BY filtered.`modified` DESC, filtered.`name` DESC
+            LIMIT %(limit)s
+            )"""
+        )
+
+    # A failed statement aborts the transaction (Postgres); the savepoint undoes only that statement
+    frappe.db.savepoint("crm_search_branches")
+    try:
+        merged = frappe.db.sql(
+            f"""
+            SELECT * FROM ({" UNION ALL ".join(selects)}) merged
+            ORDER BY branch_index, branch_modified DESC, branch_name DESC
+            """,
+            {"pattern": _search_pattern(search_term), "limit": limit},
+            as_dict=True,
+        )
+        frappe.db.release_savepoint("crm_search_branches")
+    except Exception as e:
+        print(f"Combined search failed, searching doctypes one by one: {e}")
+        frappe.db.rollback(save_point="crm_search_branches")
+        return _search_branches_one_by_one(branches, search_term, limit)
+
+    rows_by_doctype = {branch["doctype"]: [] for branch in branches}
+    for row in merged:
+        branch = branches[row.branch_index]
+        rows_by_doctype[branch["doctype"]].append(
+            frappe._dict({field: row[f"col_{position}"] for position, field in enumerate(branch["fields"])})
+        )
+    return rows_by_doctype
+
+
+def search_page(doctype, search_fields, search_term, filters=None, fields=None, cursor=None, limit=20):
+    """
+    Keyset page of search_list matches ordered by modified desc, name desc.
+
+    Args:
+        cursor: (modified, name) of the last row of the previous page, or None
+        limit: Max rows (pass page size + 1 to detect a next page)
+    """
+    fields = list(fields or ["name"])
+    inner_query, match_condition = _search_parts(doctype, search_fields, filters, fields + ["name", "modified"])
+
+    values = {"pattern": _search_pattern(search_term), "limit": limit}
+    cursor_condition = ""
+    if cursor:
+        cursor_condition = "AND (filtered.`modified`, filtered.`name`) < (%(cursor_modified)s, %(cursor_name)s)"
+        values["cursor_modified"], values["cursor_name"] = cursor
+
+    columns = ", ".join(f"filtered.`{field}`" for field in dict.fromkeys(fields + ["modified"]))
+    return frappe.db.sql(
+        f"""
+        SELECT {columns}
+        FROM ({inner_query}) filtered
+        WHERE ({match_condition}) {cursor_condition}
+        ORDER BY filtered.`modified` DESC, filtered.`name` DESC
+        LIMIT %(limit)s
+        """,
+        values,
+        as_dict=True,
+    )
+
+
+def count_search_matches(doctype, search_fields, search_term, filters=None, max_count=1001):
+    """Counts search_list matches, stopping at `max_count` so huge result sets stay cheap."""
+    inner_query, match_condition = _search_parts(doctype, search_fields, filters, ["name"])
+    return frappe.db.sql(
+        f"""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM ({inner_query}) filtered
+            WHERE {match_condition}
+            LIMIT %(max_count)s
+        ) capped
+        """,
+        {"pattern": _search_pattern(search_term), "max_count": max_count},
+    )[0][0]
+
+
+def fuzzy_search_list(doctype, key_field, search_term, rank_fields, filters=None, fields=None, limit=10):
+    """
+    Fuzzy (spelling-tolerant) search on a precomputed phonetic key column
+    (see nirmaan_crm.utils.phonetic).
+
+    Candidates match every term word's key inside `key_field` (plus, on Postgres,
+    trigram similarity of the whole key); both conditions can use the pg_trgm
+    GIN index on `key_field`. Candidates are then ranked by edit distance of the
+    term to the text of `rank_fields`.
+    """
+    word_keys = [key for key in (phonetic_word_key(word) for word in search_term.split()) if key]
+    if not word_keys:
+        return []
+
+    fields = list(fields or ["name"])
+    inner_query = _permitted_query(doctype, filters, fields + list(rank_fields) + [key_field])
+
+    like = "ILIKE" if frappe.db.db_type == "postgres" else "LIKE"
+    values = {"limit": limit * FUZZY_CANDIDATES_PER_RESULT, "term_key": " ".join(word_keys)}
+    word_conditions = []
+    for index, key in enumerate(word_keys):
+        values[f"key_{index}"] = f"%{escape_like(key)}%"
+        word_conditions.append(f"filtered.`{key_field}` {like} %(key_{index})s")
+    match_condition = " AND ".join(word_conditions)
+    if frappe.db.db_type == "postgres":
+        # pg_trgm similarity operator (escaped for parameter substitution)
+        match_condition = f"({match_condition}) OR filtered.`{key_field}` %% %(term_key)s"
+
+    columns = ", ".join(f"filtered.`{field}`" for field in dict.fromkeys(fields + list(rank_fields)))
+    candidates = frappe.db.sql(
+        f"""
+        SELECT {columns}
+        FROM ({inner_query}) filtered
+        WHERE {match_condition}
+        LIMIT %(limit)s
+        """,
+        values,
+        as_dict=True,
+    )
+    candidates.sort(
+        key=lambda row: fuzzy_rank(search_term, " ".join(str(row.get(field) or "") for field in rank_fields))
+    )
+    return candidates[:limit]
+
+
+def lookup_list(doctype, field, value, suffix=False, filters=None, fields=None, order_by="modified desc", limit=10):
+    """
+    Rows whose (normalized) `field` equals `value`, or ends with it when `suffix`.
+
+    Equality uses the plain B-tree index on `field`; the suffix match is written as
+    a prefix match on reverse(`field`) so a (reverse(field) text_pattern_ops)
+    index can serve it on Postgres.
+    """
+    fields = list(fields or ["name"])
+    inner_query = _permitted_query(doctype, filters, fields + [field] + _order_by_columns(order_by))
+
+    values = {"value": value, "limit": limit}
+    if suffix:
+        values["value"] = f"{escape_like(value[::-1])}%"
+        match_condition = f"reverse(filtered.`{field}`) LIKE %(value)s"
+    else:
+        match_condition = f"filtered.`{field}` = %(value)s"
+
+    columns = ", ".join(f"filtered.`{column}`" for column in fields)
+    return frappe.db.sql(
+        f"""
+        SELECT {columns}
+        FROM ({inner_query}) filtered
+        WHERE {match_condition}
+        ORDER BY {_qualify_order_by(order_by)}
+        LIMIT %(limit)s
+        """,
+        values,
+        as_dict=True,
+    )
+
+
+def _search_branches_one_by_one(branches, search_term, limit):
+    rows_by_doctype = {}
+    for branch in branches:
+        frappe.db.savepoint("crm_search_branch")
+        try:
+            rows_by_doctype[branch["doctype"]] = search_list(
+                branch["doctype"],
+                branch["search_fields"],
+                search_term,
+                filters=branch.get("filters"),
+                fields=branch["fields"],
+                order_by="modified desc, name desc",
+                limit=limit,
+            )
+            frappe.db.release_savepoint("crm_search_branch")
+        except Exception as e:
+            print(f"Error searching {branch['doctype']}: {e}")
+            frappe.db.rollback(save_point="crm_search_branch")
+            rows_by_doctype[branch["doctype"]] = []
+    return rows_by_doctype
+
+
+def _search_parts(doctype, search_fields, filters, extra_fields):
+    """Permission-filtered inner query (get_list, run=0) and the ILIKE match condition on it."""
+    inner_query = _permitted_query(doctype, filters, list(extra_fields) + list(search_fields))
+
+    like = "ILIKE" if frappe.db.db_type == "postgres" else "LIKE"
+    match_condition = " OR ".join(f"filtered.`{field}` {like} %(pattern)s" for field in search_fields)
+    return inner_query, match_condition
+
+
+def _permitted_query(doctype, filters, fields):
+    """frappe.get_list SQL (permission query conditions applied), ready to embed as a subquery."""
+    inner_fields = []
+    for column in fields:
+        if column not in inner_fields:
+            inner_fields.append(column)
+
+    inner_query = frappe.get_list(
+        doctype,
+        filters=filters or {},
+        fields=inner_fields,
+        order_by="",
+        limit=0,
+        run=0,
+    )
+    return inner_query.replace("%", "%%")
+
+
+def _search_pattern(search_term):
+    return f"%{escape_like(search_term.strip())}%"
+
+
+def escape_like(value):
+    """Escapes LIKE/ILIKE wildcards so `value` is matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _order_by_columns(order_by):
+    return [clause.strip().partition(" ")[0] for clause in order_by.split(",")]
+
+
+def _qualify_order_by(order_by):
+    parts = []
+    for clause in order_by.split(","):
+        column, _, direction = clause.strip().partition(" ")
+        parts.append(f"filtered.`{column}` {direction or 'asc'}")
+    return ", ".join(parts)
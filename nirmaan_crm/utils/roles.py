@@ -0,0 +1,45 @@
+import frappe
+from frappe.utils.caching import request_cache
+
+# Redis key prefix: one "crm_user_role_profile:<CRM Users name>" key per user
+ROLE_PROFILE_CACHE_KEY = "crm_user_role_profile"
+
+# Upper bound on how long a cached profile can outlive a change that skipped the clear
+ROLE_PROFILE_CACHE_TTL = 600
+
+
+@request_cache
+def get_role_profile(user):
+    """
+    Returns the nirmaan_role_name of CRM Users `user` ("" when not set).
+
+    Cached in redis for every worker (for ROLE_PROFILE_CACHE_TTL) and memoized per
+    request, so permission query conditions and before_insert hooks do not load the
+    CRM Users document. Raises frappe.DoesNotExistError, like frappe.get_doc did,
+    when `user` has no CRM Users record. Cleared by clear_role_profile_cache when
+    the profile changes.
+    """
+    cache_key = f"{ROLE_PROFILE_CACHE_KEY}:{user}"
+    role_profile = frappe.cache().get_value(cache_key)
+    if role_profile is None:
+        row = frappe.db.get_value("CRM Users", user, ["name", "nirmaan_role_name"], as_dict=True)
+        if not row:
+            frappe.throw(f"CRM Users {user} not found", frappe.DoesNotExistError)
+        role_profile = row.nirmaan_role_name or ""
+        frappe.cache().set_value(cache_key, role_profile, expires_in_sec=ROLE_PROFILE_CACHE_TTL)
+    return role_profile
+
+
+def clear_role_profile_cache(user=None):
+    """
+    Drops the cached role profile of `user` (all users when not given) once the
+    transaction commits; cleared earlier, another worker could cache the old value again.
+    """
+    frappe.db.after_commit.add(lambda: _delete_role_profile_cache(user))
+
+
+def _delete_role_profile_cache(user=None):
+    if user:
+        frappe.cache().delete_value(f"{ROLE_PROFILE_CACHE_KEY}:{user}")
+    else:
+        frappe.cache().delete_keys(ROLE_PROFILE_CACHE_KEY)
@@ -0,0 +1,11 @@
+import frappe
+from frappe.utils.caching import site_cache
+
+# Columns only change on migrate; re-check at this interval so a long-lived worker picks that up
+SCHEMA_CACHE_TTL = 600
+
+
+@site_cache(ttl=SCHEMA_CACHE_TTL)
+def has_column(doctype, column):
+    """frappe.db.has_column, memoized per worker process and site."""
+    return frappe.db.has_column(doctype, column)
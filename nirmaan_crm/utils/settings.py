@@ -0,0 +1,43 @@
+import frappe
+from frappe.utils.caching import request_cache
+
+CRM_SETTINGS_CACHE_KEY = "nirmaan_crm_settings"
+
+# CRM Settings is optional; re-check for the doctype at this interval while it is missing
+MISSING_SETTINGS_TTL = 600
+
+
+@request_cache
+def get_crm_settings():
+    """
+    Returns the CRM Settings values as a frappe._dict ({} when the doctype is not
+    installed on the site).
+
+    Cached in redis for every worker and memoized per request; the redis entry is
+    cleared by clear_crm_settings_cache once a CRM Settings save commits.
+    """
+    settings = frappe.cache().get_value(CRM_SETTINGS_CACHE_KEY)
+    if settings is None:
+        settings = _load_crm_settings()
+        frappe.cache().set_value(
+            CRM_SETTINGS_CACHE_KEY, settings, expires_in_sec=None if settings else MISSING_SETTINGS_TTL
+        )
+    return frappe._dict(settings)
+
+
+def clear_crm_settings_cache(doc=None, method=None):
+    """
+    CRM Settings on_update: drops the cached values once the transaction commits;
+    cleared earlier, another worker could cache the old values again.
+    """
+    frappe.db.after_commit.add(_delete_crm_settings_cache)
+
+
+def _delete_crm_settings_cache():
+    frappe.cache().delete_value(CRM_SETTINGS_CACHE_KEY)
+
+
+def _load_crm_settings():
+    if not frappe.db.exists("DocType", "CRM Settings"):
+        return {}
+    return frappe.get_single("CRM Settings").as_dict(no_default_fields=True)
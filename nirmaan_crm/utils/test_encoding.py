@@ -0,0 +1,89 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import json
+import unittest
+from datetime import date, timedelta
+
+from nirmaan_crm.utils.encoding import from_columnar, to_columnar
+
+STATUSES = ["Scheduled", "Completed", "Incomplete", "Pending"]
+TYPES = ["In Person Meeting", "Call", "Follow-up", "Submit BOQ"]
+
+
+def make_tasks(count):
+	start = date(2026, 1, 1)
+	return [
+		{
+			"name": f"TASK-{i:06d}",
+			"type": TYPES[i % len(TYPES)],
+			"start_date": str(start + timedelta(days=i % 90)),
+			"status": STATUSES[i % len(STATUSES)],
+			"contact": f"CONTACT-{i % 700:05d}",
+			"company": f"COMPANY-{i % 300:05d}",
+			"boq": None,
+			"task_profile": "Sales" if i % 3 else "Estimates",
+			"assigned_sales": f"sales{i % 12}@nirmaan.test",
+			"remarks": f"Discussed requirement {i}",
+			"contact.first_name": f"First {i % 700}",
+			"contact.last_name": f"Last {i % 700}",
+			"company.company_name": f"Company {i % 300}",
+		}
+		for i in range(count)
+	]
+
+
+class CountingRow(dict):
+	"""Row that counts value lookups, for a machine-independent measure of encode cost."""
+
+	lookups = 0
+
+	def get(self, *args):
+		CountingRow.lookups += 1
+		return super().get(*args)
+
+
+def count_encode_lookups(rows):
+	CountingRow.lookups = 0
+	to_columnar([CountingRow(row) for row in rows])
+	return CountingRow.lookups
+
+
+class TestColumnarEncoding(unittest.TestCase):
+	def test_round_trip(self):
+		rows = make_tasks(50)
+		rows[3]["status"] = None
+		rows[7]["extra"] = "only here"
+		encoded = to_columnar(rows)
+
+		self.assertEqual(encoded["fields"][-1], "extra")
+		self.assertIn("status", encoded["dictionaries"])
+		self.assertNotIn("name", encoded["dictionaries"])
+
+		# Keys missing from a row decode as None
+		expected = [{field: row.get(field) for field in encoded["fields"]} for row in rows]
+		self.assertEqual(from_columnar(encoded), expected)
+
+	def test_explicit_dictionary_fields(self):
+		encoded = to_columnar([{"status": "Won", "value": 1}, {"status": "Won", "value": 2}], dictionary_fields=["status"])
+		self.assertEqual(encoded["dictionaries"], {"status": ["Won"]})
+		self.assertEqual(encoded["rows"], [[0, 1], [0, 2]])
+
+	def test_payload_size(self):
+		"""Columnar payload bytes against the list-of-dicts format."""
+		rows = make_tasks(20000)
+
+		dict_bytes = len(json.dumps(rows))
+		columnar_bytes = len(json.dumps(to_columnar(rows)))
+		self.assertLess(columnar_bytes, dict_bytes * 0.6)
+
+	def test_encode_cost(self):
+		"""Value lookups of to_columnar: at most two passes over the cells, linear in the row count."""
+		rows = make_tasks(10000)
+		cells = len(rows) * len(rows[0])
+
+		lookups = count_encode_lookups(rows)
+		# One pass encoding every cell, plus the dictionary detection (at most one more)
+		self.assertGreaterEqual(lookups, cells)
+		self.assertLessEqual(lookups, 2 * cells)
+		self.assertLessEqual(count_encode_lookups(make_tasks(20000)), 2 * lookups)
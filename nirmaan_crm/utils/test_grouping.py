@@ -0,0 +1,15 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import unittest
+
+from nirmaan_crm.utils.grouping import group_rows_by
+
+
+class TestGrouping(unittest.TestCase):
+	def test_group_rows_by_keeps_order_and_skips_empty_keys(self):
+		rows = [{"company": "A", "n": 1}, {"company": None, "n": 2}, {"company": "A", "n": 3}, {"company": "B", "n": 4}]
+		grouped = group_rows_by(rows, "company")
+
+		self.assertEqual(list(grouped), ["A", "B"])
+		self.assertEqual([r["n"] for r in grouped["A"]], [1, 3])
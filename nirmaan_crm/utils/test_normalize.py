@@ -0,0 +1,29 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import unittest
+
+from nirmaan_crm.utils.normalize import is_email_term, is_phone_term, normalize_email, normalize_mobile
+
+
+class TestNormalize(unittest.TestCase):
+	def test_normalize_mobile(self):
+		for value in ["+91 98450-12345", "098450 12345", "9845012345", "(+91) 98450 12345"]:
+			self.assertEqual(normalize_mobile(value), "9845012345", value)
+		self.assertEqual(normalize_mobile("020 2553 1234"), "2025531234")
+		self.assertEqual(normalize_mobile(None), "")
+
+	def test_normalize_email(self):
+		self.assertEqual(normalize_email("  Ravi.Kumar@Acme.IN "), "ravi.kumar@acme.in")
+		self.assertEqual(normalize_email(None), "")
+
+	def test_term_detection(self):
+		self.assertTrue(is_phone_term("+91 98450 12345"))
+		self.assertTrue(is_phone_term("012345"))
+		self.assertFalse(is_phone_term("0012"))
+		self.assertFalse(is_phone_term("BOQ-0012345"))
+
+		self.assertTrue(is_email_term("ravi@acme.in"))
+		self.assertTrue(is_email_term("@acme.in"))
+		self.assertFalse(is_email_term("ravi@"))
+		self.assertFalse(is_email_term("ravi kumar"))
@@ -0,0 +1,31 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import unittest
+
+from nirmaan_crm.utils.phonetic import edit_distance, fuzzy_rank, phonetic_key, phonetic_word_key
+
+
+class TestPhonetic(unittest.TestCase):
+	def test_spelling_variants_share_a_key(self):
+		for first, second in [
+			("Shrivastava", "Srivastava"),
+			("Choudhary", "Chaudhari"),
+			("Laxmi", "Lakshmi"),
+			("Mohammed", "Mohamad"),
+			("Vijay", "Wijay"),
+		]:
+			self.assertEqual(phonetic_word_key(first), phonetic_word_key(second), (first, second))
+
+	def test_phonetic_key(self):
+		self.assertEqual(phonetic_key("Rahul", "Shrivastava"), "rl srvstv")
+		self.assertEqual(phonetic_key(None, "  "), "")
+
+	def test_edit_distance(self):
+		self.assertEqual(edit_distance("kitten", "sitting"), 3)
+		self.assertEqual(edit_distance("", "abc"), 3)
+
+	def test_fuzzy_rank_prefers_closer_spelling(self):
+		names = ["Rohit Sharma", "Rahul Srivastava", "Rahul Shrivastava"]
+		ranked = sorted(names, key=lambda name: fuzzy_rank("rahul shrivastava", name))
+		self.assertEqual(ranked, ["Rahul Shrivastava", "Rahul Srivastava", "Rohit Sharma"])
@@ -0,0 +1,65 @@
+# Copyright (c) 2026, Abhishek Kumar and Contributors
+# See license.txt
+
+import math
+import unittest
+
+from nirmaan_crm.utils.prefix_index import ALL_PARTITION, PrefixIndex
+
+
+class CountingList(list):
+	"""list that counts item reads (bisect and the scan both index into the keys)."""
+
+	def __init__(self, items):
+		super().__init__(items)
+		self.reads = 0
+
+	def __getitem__(self, position):
+		self.reads += 1
+		return super().__getitem__(position)
+
+
+def make_index(companies):
+	index = PrefixIndex()
+	for i in range(companies):
+		index.add(f"Company {i:06d} Interiors", ("CRM Company", f"C{i}"), partitions=[f"sales{i % 20}@nirmaan.test"])
+		index.add(f"ci{i:06d}", ("CRM Company", f"C{i}"), partitions=[f"sales{i % 20}@nirmaan.test"])
+	return index.build()
+
+
+class TestPrefixIndex(unittest.TestCase):
+	def test_matches_word_starts_case_insensitively(self):
+		index = PrefixIndex()
+		index.add("Searchable Interiors", ("CRM Company", "A"))
+		index.add("ravi.kumar@gmail.com", ("CRM Contacts", "B"))
+		index.build()
+
+		self.assertEqual(index.search("INTER"), [("CRM Company", "A")])
+		self.assertEqual(index.search("searchable int"), [("CRM Company", "A")])
+		self.assertEqual(index.search("kumar"), [("CRM Contacts", "B")])
+		self.assertEqual(index.search("teriors"), [])
+
+	def test_partitions_and_distinct_results(self):
+		index = PrefixIndex()
+		index.add("Acme Acme", ("CRM Company", "A"), partitions=["one@nirmaan.test"])
+		index.add("Acme Builders", ("CRM Company", "B"), partitions=["two@nirmaan.test"])
+		index.build()
+
+		self.assertEqual(index.search("acme", ALL_PARTITION), [("CRM Company", "A"), ("CRM Company", "B")])
+		self.assertEqual(index.search("acme", "one@nirmaan.test"), [("CRM Company", "A")])
+		self.assertEqual(index.search("acme", "nobody@nirmaan.test"), [])
+
+	def test_lookup_cost_is_logarithmic(self):
+		"""Key reads per lookup grow with log(keys) + limit, not with the number of companies."""
+		reads = {}
+		for companies in (1000, 100000):
+			index = make_index(companies)
+			keys = CountingList(index._keys[ALL_PARTITION])
+			index._keys[ALL_PARTITION] = keys
+			self.assertEqual(len(index.search("company 000", limit=10)), 10)
+			reads[companies] = keys.reads
+
+		# 100x the keys adds ~log2(100) bisect steps
+		self.assertLessEqual(reads[100000], reads[1000] + math.ceil(math.log2(100)) + 1)
+		self.assertLess(reads[100000], 2 * math.log2(len(keys)) + 2 * 10)
+		self.assertEqual(len(index.search("company 0421", "sales1@nirmaan.test", limit=10)), 5)